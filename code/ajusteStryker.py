@@ -0,0 +1,152 @@
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from amostragemMutacao import DETECTADOS, NAO_DETECTADOS, RELATORIO_STRYKER, alocar, argumentos_stryker, arquivos_fonte, sortear
+from perfilamento import perfilar
+
+DIRETORIO_CONFIGS = "Instrumentos/Codigos/configs_stryker"
+ARQUIVOS_AJUSTE = 8  # Arquivos da amostra em que cada candidato é medido
+CONCORDANCIA_MINIMA = 0.98  # Fração dos mutantes válidos da configuração padrão com o mesmo resultado
+CONFIG_REPOSITORIO = "stryker-config.json"
+CONFIG_AJUSTADA = "stryker-config.ajuste.json"
+COLUNA_CONFIG = "Config Stryker"  # Candidato escolhido, gravado na linha de resultados
+
+# Configurações candidatas (sobrepostas à stryker-config.json do próprio repositório, se houver).
+# Só entram opções que mudam a velocidade, não o que é medido: excluir mutadores, por exemplo, tiraria
+# mutantes de "Total Mutants" e "Mutants Compile Error", que viram variáveis do estudo.
+CANDIDATOS = {
+    'padrao': {},
+    'cobertura_todos': {'coverage-analysis': 'all'},
+    'cobertura_isolada': {'coverage-analysis': 'perTestInIsolation'},
+}
+
+def caminho_registro(repo, diretorio=DIRETORIO_CONFIGS):
+    return Path(diretorio) / f"{repo['Proprietário']}__{repo['Nome']}.json"
+
+def carregar_registro(repo, diretorio=DIRETORIO_CONFIGS):
+    """Configuração escolhida em uma execução anterior, ou None."""
+    caminho = caminho_registro(repo, diretorio)
+    if not caminho.is_file():
+        return None
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def argumentos_config(caminho_sln, config, destino=None):
+    """Grava a configuração sobre a do repositório e devolve os argumentos --config-file (vazio se nada muda)."""
+    if not config:
+        return []
+    caminho_sln = Path(caminho_sln)
+    base = {}
+    if (caminho_sln / CONFIG_REPOSITORIO).is_file():
+        with open(caminho_sln / CONFIG_REPOSITORIO, 'r', encoding='utf-8-sig') as arquivo:
+            base = json.load(arquivo).get('stryker-config', {})
+    destino = Path(destino or caminho_sln / CONFIG_AJUSTADA)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    destino.write_text(json.dumps({'stryker-config': {**base, **config}}, indent=2), encoding='utf-8')
+    return ["--config-file", str(destino.resolve())]
+
+def mutantes_por_local(caminho):
+    """{(arquivo, mutador, linha, coluna): status} do relatório JSON; o id muda entre configurações, o local não."""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        relatorio = json.load(arquivo)
+    mutantes = {}
+    for nome, dados in relatorio.get('files', {}).items():
+        for mutante in dados.get('mutants', []):
+            inicio = mutante.get('location', {}).get('start', {})
+            chave = (nome.replace('\\', '/'), mutante.get('mutatorName'), inicio.get('line'), inicio.get('column'))
+            mutantes[chave] = mutante.get('status')
+    return mutantes
+
+def concordancia(base, candidato):
+    """Fração dos mutantes válidos da base que o candidato classifica igual (detectado ou não)."""
+    validos = [chave for chave, status in base.items() if status in DETECTADOS | NAO_DETECTADOS]
+    if not validos:
+        return 1.0
+    iguais = sum((candidato.get(chave) in DETECTADOS) == (base[chave] in DETECTADOS)
+                 and candidato.get(chave) in DETECTADOS | NAO_DETECTADOS for chave in validos)
+    return iguais / len(validos)
+
+def mesmo_conjunto(base, candidato):
+    """Indica se o candidato gerou os mesmos mutantes da base, com os mesmos não testados (CompileError/Ignored)."""
+    if base.keys() != candidato.keys():
+        return False
+    return all(candidato[chave] == status for chave, status in base.items()
+               if status not in DETECTADOS | NAO_DETECTADOS)
+
+def ajustar(caminho_sln, executar, repo, arquivos=ARQUIVOS_AJUSTE, diretorio=DIRETORIO_CONFIGS, semente=0):
+    """Mede cada candidato na mesma amostra de arquivos e registra o mais rápido com resultados iguais aos do padrão.
+
+    Resultados iguais: os mesmos mutantes (e os mesmos não testados) e ao menos CONCORDANCIA_MINIMA dos válidos
+    classificados igual.
+    `executar(argumentos)` roda o Stryker com os argumentos extras e retorna (métricas, erro). Um registro já
+    existente para o repositório é reaproveitado sem novas medições. Retorna o registro ({'escolhido', 'config', ...}).
+    """
+    registro = carregar_registro(repo, diretorio)
+    if registro is not None and CANDIDATOS.get(registro['escolhido']) != registro['config']:
+        registro = None  # Escolhido entre candidatos que não existem mais (ex.: exclusão de mutadores): medir de novo
+    if registro is not None:
+        print(f"Ajuste do Stryker para {repo['Nome']}: reutilizando '{registro['escolhido']}'")
+        return registro
+
+    caminho_sln = Path(caminho_sln).resolve()
+    estratos = arquivos_fonte(caminho_sln)
+    tamanhos = {h: len(a) for h, a in estratos.items()}
+    amostra = sortear(estratos, {}, alocar(tamanhos, arquivos), random.Random(f"{repo['Nome']}:{semente}"))
+    selecionados = [a for lista in amostra.values() for a in lista]
+    registro = {'escolhido': 'padrao', 'config': {}, 'arquivos': selecionados, 'medicoes': {}}
+    if not selecionados:
+        return registro
+
+    base = None
+    for nome, config in CANDIDATOS.items():
+        saida = caminho_sln / "StrykerOutput" / f"ajuste_{nome}"
+        argumentos = argumentos_stryker(selecionados, saida) + argumentos_config(caminho_sln, config, saida / CONFIG_AJUSTADA)
+        print(f"Ajuste do Stryker para {repo['Nome']}: medindo '{nome}'")
+        inicio = time.monotonic()
+        _, erro = executar(argumentos)
+        segundos = time.monotonic() - inicio
+        relatorio = saida / RELATORIO_STRYKER
+        if erro or not relatorio.is_file():
+            registro['medicoes'][nome] = {'erro': (erro or "relatório JSON não gerado")[:200]}
+            if base is None:
+                return registro  # Sem a referência do padrão não há como validar os demais
+            continue
+
+        mutantes = mutantes_por_local(relatorio)
+        if base is None:
+            base = mutantes
+        validos = sum(status in DETECTADOS | NAO_DETECTADOS for status in base.values())
+        registro['medicoes'][nome] = {'config': config, 'segundos': round(segundos, 2),
+                                      'mutantes_por_s': round(validos / max(segundos, 1e-6), 3),
+                                      'concordancia': round(concordancia(base, mutantes), 4),
+                                      'mesmo_conjunto': mesmo_conjunto(base, mutantes)}
+
+    validas = {nome: m for nome, m in registro['medicoes'].items()
+               if 'erro' not in m and m['concordancia'] >= CONCORDANCIA_MINIMA and m.get('mesmo_conjunto', True)}
+    escolhido = max(validas, key=lambda nome: validas[nome]['mutantes_por_s'])
+    registro.update(escolhido=escolhido, config=validas[escolhido]['config'])
+    caminho = caminho_registro(repo, diretorio)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'w', encoding='utf-8') as arquivo:
+        json.dump(registro, arquivo, indent=2, ensure_ascii=False)
+    print(f"Ajuste do Stryker para {repo['Nome']}: '{escolhido}' ({validas[escolhido]['mutantes_por_s']} mutantes/s)")
+    return registro
+
+def main():
+    parser = argparse.ArgumentParser(description="Lista as configurações do Stryker escolhidas por repositório.")
+    parser.add_argument("--diretorio", default=DIRETORIO_CONFIGS)
+    args = parser.parse_args()
+
+    for caminho in sorted(Path(args.diretorio).glob('*.json')):
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            registro = json.load(arquivo)
+        padrao = registro['medicoes'].get('padrao', {}).get('mutantes_por_s')
+        escolhido = registro['medicoes'].get(registro['escolhido'], {}).get('mutantes_por_s')
+        ganho = f"{escolhido / padrao:.2f}x" if padrao and escolhido else "-"
+        print(f"{caminho.stem:<50} {registro['escolhido']:<25} {ganho}")
+
+if __name__ == "__main__":
+    perfilar(main)()
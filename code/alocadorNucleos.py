@@ -0,0 +1,209 @@
+import argparse
+import csv
+import math
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mutationTestRunnerV2
+from areaTrabalho import ORCAMENTO_MEMORIA_GB, AreaTrabalho
+from mutationTestRunnerV2 import (REPOSITORIOS_PARA_IGNORAR, argumentos_progresso, configurar_progresso,
+                                  filter_untested_repositories, load_repositories, load_tested_repositories,
+                                  process_repository, save_resultes)
+from perfilamento import perfilar
+from progressoCampanha import mutantes_testados
+from registroErros import LIMITE_CAMPO_LEGADO
+
+MUTANTES_PADRAO = 500  # Estimativa para repositórios sem histórico
+MUTANTES_POR_NUCLEO = 250  # Abaixo disso um núcleo a mais quase não reduz o tempo do Stryker
+# Faixa de utilização de CPU considerada saudável; fora dela a capacidade do orçamento é ajustada
+UTILIZACAO_BAIXA = 0.70
+UTILIZACAO_ALTA = 0.95
+FATOR_MINIMO, FATOR_MAXIMO = 0.5, 2.0
+JANELA_MEDICAO = 60  # Segundos mínimos entre dois ajustes
+# Aumento por janela enquanto algum repositório está reservado há mais que uma janela: a carga dele ainda
+# pode mudar de fase (restore -> build -> testes) e a medição cobre só parte da execução
+AUMENTO_NORMAL, AUMENTO_LIMITADO = 1.25, 1.1
+
+def _cpu_sistema():
+    """Jiffies (ocupados, total) somados de todas as CPUs em /proc/stat; None fora do Linux."""
+    try:
+        with open('/proc/stat', 'r', encoding='ascii') as arquivo:
+            campos = [int(valor) for valor in arquivo.readline().split()[1:]]
+    except (OSError, ValueError):
+        return None
+    ocioso = sum(campos[3:5])  # idle + iowait
+    return sum(campos) - ocioso, sum(campos)
+
+def _nucleos_ocupados(anterior, atual):
+    """Núcleos em uso, em média, entre duas amostras de `_cpu_sistema` (ou pela carga média do sistema)."""
+    if anterior is not None and atual is not None and atual[1] > anterior[1]:
+        return (atual[0] - anterior[0]) / (atual[1] - anterior[1]) * (os.cpu_count() or 1)
+    if hasattr(os, 'getloadavg'):
+        return os.getloadavg()[0]
+    return None
+
+def _inteiro(valor):
+    try:
+        return int(float(valor))
+    except (TypeError, ValueError):
+        return None
+
+def carregar_historico(caminhos):
+    """Lê 'Total Mutants' dos CSVs de resultados anteriores: {Nome: total de mutantes}."""
+    historico = {}
+    csv.field_size_limit(LIMITE_CAMPO_LEGADO)
+    for caminho in caminhos:
+        if not os.path.exists(caminho):
+            continue
+        with open(caminho, mode='r', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                total = _inteiro(row.get("Total Mutants"))
+                if total:
+                    historico[row["Nome"]] = total
+    return historico
+
+def estimar_mutantes(repo, historico):
+    """Usa o total de mutantes de uma execução anterior ou, na falta dela, a mediana do histórico."""
+    if repo["Nome"] in historico:
+        return historico[repo["Nome"]]
+    return int(statistics.median(historico.values())) if historico else MUTANTES_PADRAO
+
+class AlocadorNucleos:
+    """Orçamento de núcleos dividido entre os repositórios em execução simultânea.
+
+    Cada repositório recebe núcleos proporcionais ao número estimado de mutantes. A capacidade
+    total é ajustada pela utilização de CPU do sistema medida a cada janela.
+    """
+
+    def __init__(self, total=None, max_por_repo=None, mutantes_por_nucleo=MUTANTES_POR_NUCLEO):
+        self.total = total or os.cpu_count() or 1
+        self.max_por_repo = max_por_repo or self.total
+        self.mutantes_por_nucleo = mutantes_por_nucleo
+        self.fator = 1.0
+        self.em_uso = 0
+        self.utilizacao = None
+        self._cond = threading.Condition()
+        self._reservas = {}  # thread -> início da reserva
+        self._ultima_medicao = (time.monotonic(), _cpu_sistema())
+
+    def capacidade(self):
+        return max(1, round(self.total * self.fator))
+
+    def nucleos_desejados(self, mutantes):
+        desejados = math.ceil(mutantes / self.mutantes_por_nucleo)
+        return max(1, min(desejados, self.max_por_repo, self.capacidade()))
+
+    def reservar(self, mutantes):
+        """Bloqueia até haver núcleos livres e retorna quantos foram reservados."""
+        desejados = self.nucleos_desejados(mutantes)
+        with self._cond:
+            # Aceita até metade do desejado para não deixar núcleos ociosos esperando um repositório grande
+            while self.em_uso and self.capacidade() - self.em_uso < math.ceil(desejados / 2):
+                self._cond.wait()
+            nucleos = max(1, min(desejados, self.capacidade() - self.em_uso))
+            self.em_uso += nucleos
+            self._reservas[threading.get_ident()] = time.monotonic()
+            return nucleos
+
+    def liberar(self, nucleos):
+        """Devolve os núcleos; deve ser chamado pela mesma thread que os reservou."""
+        with self._cond:
+            self.em_uso -= nucleos
+            self._reservas.pop(threading.get_ident(), None)
+            self._ajustar()
+            self._cond.notify_all()
+
+    def _ajustar(self):
+        """Aumenta a capacidade se a CPU ficou ociosa (I/O, restore) e reduz se ficou saturada."""
+        agora, cpu = time.monotonic(), _cpu_sistema()
+        inicio, cpu_inicio = self._ultima_medicao
+        if agora - inicio < JANELA_MEDICAO:
+            return
+        self._ultima_medicao = (agora, cpu)
+        ocupados = _nucleos_ocupados(cpu_inicio, cpu)
+        if ocupados is None:
+            return  # Sem /proc/stat nem carga média (Windows): mantém a capacidade fixa
+        self.utilizacao = ocupados / self.total
+        longas = any(agora - reserva > JANELA_MEDICAO for reserva in self._reservas.values())
+        if self.utilizacao < UTILIZACAO_BAIXA:
+            self.fator = min(FATOR_MAXIMO, self.fator * (AUMENTO_LIMITADO if longas else AUMENTO_NORMAL))
+        elif self.utilizacao > UTILIZACAO_ALTA:
+            self.fator = max(FATOR_MINIMO, self.fator * 0.9)
+        print(f"Utilização de CPU: {self.utilizacao:.0%}; capacidade do orçamento: {self.capacidade()} núcleos")
+
+def executar_campanha(repositorios, base_dir, csv_output, alocador, historico, max_simultaneos=None):
+    """Processa os repositórios em paralelo respeitando o orçamento de núcleos. Retorna mutantes testados por hora."""
+    lock = threading.Lock()
+    testados = 0
+    inicio = time.monotonic()
+
+    def processar(repo):
+        nonlocal testados
+        nucleos = alocador.reservar(estimar_mutantes(repo, historico))
+        print(f"Processando {repo['Nome']} com {nucleos} núcleo(s)...")
+        try:
+            resultado = process_repository(repo, base_dir, nucleos)
+        finally:
+            alocador.liberar(nucleos)
+        with lock:
+            save_resultes(csv_output, [resultado])
+            if mutationTestRunnerV2.ARQUIVO_SAIDAS:
+                mutationTestRunnerV2.ARQUIVO_SAIDAS.resultado(resultado['Nome'], resultado, csv_output)
+            testados += mutantes_testados(resultado)
+            print(mutationTestRunnerV2.PROGRESSO.resumo())
+        return resultado
+
+    # Os maiores primeiro: evita que um repositório grande fique sozinho no fim da campanha
+    ordenados = sorted(repositorios, key=lambda repo: estimar_mutantes(repo, historico), reverse=True)
+    with ThreadPoolExecutor(max_workers=max_simultaneos or alocador.total) as executor:
+        list(executor.map(processar, ordenados))
+
+    horas = (time.monotonic() - inicio) / 3600
+    return testados / horas if horas else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa o pipeline de mutação em paralelo dividindo os núcleos entre os repositórios.")
+    parser.add_argument("--nucleos", type=int, default=os.cpu_count(), help="Orçamento total de núcleos")
+    parser.add_argument("--max-por-repo", type=int, help="Máximo de núcleos para um único repositório")
+    parser.add_argument("--max-simultaneos", type=int, help="Máximo de repositórios ao mesmo tempo (padrão: --nucleos)")
+    parser.add_argument("--mutantes-por-nucleo", type=int, default=MUTANTES_POR_NUCLEO)
+    parser.add_argument("--historico", nargs="*", default=["Instrumentos/Codigos/repositoriosClonadosV1.csv"],
+                        help="CSVs de execuções anteriores usados para estimar o número de mutantes")
+    parser.add_argument("--memoria-gb", type=float, nargs="?", const=ORCAMENTO_MEMORIA_GB,
+                        help="Clona em tmpfs os repositórios que cabem neste orçamento (compartilhado pelos simultâneos)")
+    parser.add_argument("--verificacao-previa", action="store_true",
+                        help="Pula, após um checkout esparso, os repositórios cujo build certamente falharia")
+    args = argumentos_progresso(parser).parse_args()
+    progresso = configurar_progresso(args)
+    mutationTestRunnerV2.VERIFICACAO_PREVIA = mutationTestRunnerV2.VERIFICACAO_PREVIA or args.verificacao_previa
+
+    csv_input = "Instrumentos/Codigos/repositorios.csv"
+    csv_tested = "Instrumentos/Codigos/repositoriosTestados.csv"
+    csv_output = "Instrumentos/Codigos/repositoriosClonados.csv"
+    base_dir = "Instrumentos/Codigos/repositoriosClonados"
+
+    repositorios = load_repositories(csv_input)
+    untested_repos = filter_untested_repositories(repositorios, load_tested_repositories(csv_tested))
+    for repo in untested_repos:
+        if repo["Nome"] in REPOSITORIOS_PARA_IGNORAR:
+            print(f"Pulando repositório {repo['Nome']}...")
+    untested_repos = [repo for repo in untested_repos if repo["Nome"] not in REPOSITORIOS_PARA_IGNORAR]
+    historico = carregar_historico(args.historico + [csv_output])
+    print(f"Repositórios a serem testados: {len(untested_repos)} (histórico de mutantes para {len(historico)})")
+    progresso.iniciar(len(untested_repos))
+
+    alocador = AlocadorNucleos(args.nucleos, args.max_por_repo, args.mutantes_por_nucleo)
+    if args.memoria_gb:
+        mutationTestRunnerV2.AREA_TRABALHO = AreaTrabalho(orcamento_gb=args.memoria_gb)
+    try:
+        por_hora = executar_campanha(untested_repos, base_dir, csv_output, alocador, historico, args.max_simultaneos)
+    finally:
+        if mutationTestRunnerV2.AREA_TRABALHO:
+            mutationTestRunnerV2.AREA_TRABALHO.fechar()
+    print(f"Execução concluída! Mutantes testados por hora: {por_hora:.0f}. Resultados salvos em {csv_output}")
+
+if __name__ == "__main__":
+    perfilar(main)()
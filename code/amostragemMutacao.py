@@ -0,0 +1,253 @@
+import argparse
+import json
+import math
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+from statistics import NormalDist
+
+from perfilamento import perfilar
+from verificacaoPrevia import ler_projeto, projetos_da_solucao
+
+# Largura total desejada do intervalo de confiança da pontuação de mutação (pontos percentuais)
+LARGURA_IC_ALVO = 10.0
+NIVEL_CONFIANCA = 0.95
+ARQUIVOS_INICIAIS = 30
+FRACAO_INICIAL = 0.10
+MINIMO_POR_ESTRATO = 2  # Estimar a variância de um estrato exige pelo menos dois arquivos
+MAX_RODADAS = 5
+FOLGA_TAMANHO = 1.2  # A projeção do tamanho necessário é inflada para evitar rodadas extras
+DIRETORIO_RELATORIOS = "Instrumentos/Codigos/amostragem"
+RELATORIO_STRYKER = Path("reports") / "mutation-report.json"
+
+PASTAS_IGNORADAS = {'bin', 'obj'}
+SUFIXOS_GERADOS = ('.g.cs', '.Designer.cs', 'AssemblyInfo.cs')
+DETECTADOS = {'Killed', 'Timeout'}
+NAO_DETECTADOS = {'Survived', 'NoCoverage'}
+COLUNAS_AMOSTRAGEM = ["Amostragem", "IC Inferior", "IC Superior"]
+
+def arquivos_fonte(caminho_sln):
+    """Arquivos .cs de cada projeto não de testes da solução: {projeto: [caminhos relativos à solução]}."""
+    estratos = {}
+    for csproj in projetos_da_solucao(caminho_sln):
+        if not csproj.is_file() or ler_projeto(csproj, caminho_sln)['teste']:
+            continue
+        arquivos = sorted(arquivo.relative_to(caminho_sln).as_posix() for arquivo in csproj.parent.rglob('*.cs')
+                          if not PASTAS_IGNORADAS.intersection(arquivo.relative_to(csproj.parent).parts)
+                          and not arquivo.name.endswith(SUFIXOS_GERADOS))
+        if arquivos:
+            estratos[csproj.stem] = arquivos
+    return estratos
+
+def alocar(tamanhos, total):
+    """Alocação proporcional de `total` arquivos entre os estratos, com um mínimo por estrato."""
+    alocacao = {h: min(N, MINIMO_POR_ESTRATO) for h, N in tamanhos.items()}
+    soma = sum(tamanhos.values())
+    for h, N in tamanhos.items():
+        alocacao[h] = min(N, max(alocacao[h], math.ceil(total * N / soma)))
+    return alocacao
+
+def sortear(estratos, amostra, alocacao, rng):
+    """Novos arquivos (sem reposição) para levar cada estrato até a alocação pedida."""
+    novos = {}
+    for h, arquivos in estratos.items():
+        restantes = [a for a in arquivos if a not in amostra.get(h, {})]
+        faltam = alocacao[h] - len(amostra.get(h, {}))
+        if faltam > 0 and restantes:
+            novos[h] = rng.sample(restantes, min(faltam, len(restantes)))
+    return novos
+
+def argumentos_stryker(arquivos, saida):
+    """Filtros --mutate para só os arquivos sorteados e relatório JSON no diretório `saida`."""
+    argumentos = []
+    for arquivo in arquivos:
+        argumentos += ["--mutate", f"**/{arquivo}"]
+    return argumentos + ["--reporter", "json", "--reporter", "progress", "--output", str(saida)]
+
+def ler_relatorio_json(caminho):
+    """Mutantes do relatório JSON do Stryker (esquema mutation-testing-elements): [(arquivo, mutador, status)]."""
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        relatorio = json.load(arquivo)
+    return [(nome.replace('\\', '/'), mutante.get('mutatorName', '?'), mutante.get('status', '?'))
+            for nome, dados in relatorio.get('files', {}).items() for mutante in dados.get('mutants', [])]
+
+def _associar(mutantes, arquivos):
+    """Associa cada mutante do relatório ao arquivo sorteado correspondente (o relatório pode usar caminhos absolutos)."""
+    indice, cache = set(arquivos), {}
+    associados = defaultdict(list)
+    for nome, mutador, status in mutantes:
+        if nome not in cache:
+            partes = nome.split('/')
+            cache[nome] = next(('/'.join(partes[i:]) for i in range(len(partes)) if '/'.join(partes[i:]) in indice), None)
+        arquivo = cache[nome]
+        if arquivo is not None:
+            associados[arquivo].append((mutador, status))
+    return associados
+
+def estimar(tamanhos, amostra, nivel=NIVEL_CONFIANCA):
+    """Estimador de razão da pontuação de mutação na amostragem estratificada de arquivos (conglomerados).
+
+    `amostra` é {estrato: {arquivo: [(mutador, status)]}}. Cada arquivo tem d detectados entre m válidos; a
+    pontuação é sum(w*d) / sum(w*m), com w = N_h / n_h, e a variância vem da linearização da razão com
+    correção para população finita. Retorna a pontuação, o IC (em %) e a pontuação ponderada por mutador.
+    """
+    totais = {}
+    for h, arquivos in amostra.items():
+        totais[h] = [(sum(s in DETECTADOS for _, s in m), sum(s in DETECTADOS | NAO_DETECTADOS for _, s in m))
+                     for m in arquivos.values()]
+    detectados = sum(tamanhos[h] / len(t) * sum(d for d, _ in t) for h, t in totais.items() if t)
+    validos = sum(tamanhos[h] / len(t) * sum(m for _, m in t) for h, t in totais.items() if t)
+    if validos == 0:
+        return None
+
+    razao = detectados / validos
+    residuos = {h: [d - razao * m for d, m in t] for h, t in totais.items()}
+    todos = [e for r in residuos.values() for e in r]
+    variancia_geral = _variancia(todos) if len(todos) > 1 else 0.0
+    variancia = 0.0
+    for h, r in residuos.items():
+        N, n = tamanhos[h], len(r)
+        if n == 0 or n == N:
+            continue
+        s2 = _variancia(r) if n > 1 else variancia_geral  # Estrato com um só arquivo usa a variância de todos
+        variancia += N ** 2 * (1 - n / N) * s2 / n
+    erro_padrao = math.sqrt(variancia) / validos
+    z = NormalDist().inv_cdf(0.5 + nivel / 2)
+
+    pesos = defaultdict(lambda: [0.0, 0.0])
+    for h, arquivos in amostra.items():
+        w = tamanhos[h] / len(arquivos)
+        for mutantes in arquivos.values():
+            for mutador, status in mutantes:
+                if status in DETECTADOS | NAO_DETECTADOS:
+                    pesos[mutador][0] += w * (status in DETECTADOS)
+                    pesos[mutador][1] += w
+    return {
+        'pontuacao': 100 * razao,
+        'ic': [100 * max(0.0, razao - z * erro_padrao), 100 * min(1.0, razao + z * erro_padrao)],
+        'erro_padrao': 100 * erro_padrao,
+        'mutadores': {mutador: round(100 * d / m, 2) for mutador, (d, m) in sorted(pesos.items()) if m},
+    }
+
+def _variancia(valores):
+    media = sum(valores) / len(valores)
+    return sum((v - media) ** 2 for v in valores) / (len(valores) - 1)
+
+def formatar_duracao(segundos):
+    """Duração no formato do resumo do Stryker (HH:MM:SS.fff)."""
+    horas, resto = divmod(segundos, 3600)
+    return f"{int(horas):02d}:{int(resto // 60):02d}:{resto % 60:06.3f}"
+
+def estimar_por_amostragem(caminho_sln, executar, nome, largura_alvo=LARGURA_IC_ALVO, nivel=NIVEL_CONFIANCA,
+                           semente=0, max_rodadas=MAX_RODADAS, diretorio_relatorios=DIRETORIO_RELATORIOS):
+    """Sorteia arquivos por projeto, executa o Stryker só neles e amplia a amostra até o IC atingir a largura alvo.
+
+    `executar(arquivos, saida)` roda o Stryker com os filtros de argumentos_stryker e retorna (métricas, erro).
+    Retorna (métricas no formato do CSV de resultados, erro) e grava o detalhamento em diretorio_relatorios.
+    """
+    caminho_sln = Path(caminho_sln).resolve()
+    estratos = arquivos_fonte(caminho_sln)
+    if not estratos:
+        return None, "Amostragem: nenhum arquivo .cs em projetos que não são de testes"
+    tamanhos = {h: len(a) for h, a in estratos.items()}
+    populacao = sum(tamanhos.values())
+    rng = random.Random(f"{nome}:{semente}")
+    amostra, rodadas, estimativa = {}, [], None
+    inicio = time.monotonic()
+
+    alvo = min(populacao, max(ARQUIVOS_INICIAIS, math.ceil(FRACAO_INICIAL * populacao)))
+    for rodada in range(1, max_rodadas + 1):
+        novos = sortear(estratos, amostra, alocar(tamanhos, alvo), rng)
+        arquivos = [a for lista in novos.values() for a in lista]
+        if not arquivos:
+            break
+        saida = caminho_sln / "StrykerOutput" / f"amostra{rodada}"
+        print(f"Amostragem {nome}: rodada {rodada}, {len(arquivos)} novos arquivos")
+        _, erro = executar(arquivos, saida)
+        if erro:
+            return None, erro
+        relatorio = saida / RELATORIO_STRYKER
+        if not relatorio.is_file():
+            return None, f"Amostragem: relatório JSON do Stryker não encontrado em {relatorio}"
+        associados = _associar(ler_relatorio_json(relatorio), arquivos)
+        for h, lista in novos.items():
+            amostra.setdefault(h, {}).update({a: associados.get(a, []) for a in lista})
+
+        estimativa = estimar(tamanhos, amostra, nivel)
+        amostrados = sum(len(a) for a in amostra.values())
+        largura = estimativa['ic'][1] - estimativa['ic'][0] if estimativa else float('inf')
+        rodadas.append({'arquivos': amostrados, 'pontuacao': estimativa and round(estimativa['pontuacao'], 2),
+                        'largura_ic': round(largura, 2)})
+        if largura <= largura_alvo or amostrados == populacao:
+            break
+        if estimativa:
+            # Largura ~ c * sqrt((1 - n/N) / n): estima c com a amostra atual e resolve para a largura alvo
+            c2 = largura ** 2 * amostrados / (1 - amostrados / populacao)
+            projetado = math.ceil(FOLGA_TAMANHO / (largura_alvo ** 2 / c2 + 1 / populacao))
+        else:
+            projetado = 2 * amostrados
+        alvo = min(populacao, max(projetado, amostrados + 1))
+
+    if estimativa is None:
+        return None, "Amostragem: nenhum mutante válido nos arquivos sorteados"
+
+    # As contagens do CSV são estimativas para a solução inteira (expansão N_h/n_h, os pesos da pontuação);
+    # as da amostra ficam no detalhamento
+    contagem, estimada = defaultdict(int), defaultdict(float)
+    for h, arquivos in amostra.items():
+        peso = tamanhos[h] / len(arquivos)
+        for mutantes in arquivos.values():
+            for _, status in mutantes:
+                contagem[status] += 1
+                estimada[status] += peso
+    estimada = {status: round(valor) for status, valor in estimada.items()}
+    amostrados = sum(len(a) for a in amostra.values())
+    metricas = {
+        "Killed": estimada.get('Killed', 0), "Survived": estimada.get('Survived', 0), "Timeout": estimada.get('Timeout', 0),
+        "Time Elapsed": formatar_duracao(time.monotonic() - inicio),
+        "Mutation Score": f"{estimativa['pontuacao']:.2f}",
+        "Total Mutants": sum(estimada.values()),
+        "Mutants Compile Error": estimada.get('CompileError', 0), "Mutants No Coverage": estimada.get('NoCoverage', 0),
+        "Mutants Ignored": estimada.get('Ignored', 0),
+        # Mesma grandeza da execução completa: a coluna vem da linha "total mutants are skipped" do Stryker,
+        # que soma CompileError, Ignored e NoCoverage (o nome da coluna é histórico)
+        "Mutants Tested": sum(estimada.get(s, 0) for s in ('CompileError', 'Ignored', 'NoCoverage')),
+        "Amostragem": f"{amostrados}/{populacao} arquivos",
+        "IC Inferior": f"{estimativa['ic'][0]:.2f}", "IC Superior": f"{estimativa['ic'][1]:.2f}",
+    }
+
+    Path(diretorio_relatorios).mkdir(parents=True, exist_ok=True)
+    detalhes = {'nivel_confianca': nivel, 'largura_alvo': largura_alvo, 'semente': semente,
+                'estratos': {h: {'arquivos': tamanhos[h], 'amostrados': len(amostra.get(h, {}))} for h in tamanhos},
+                'rodadas': rodadas, 'estimativa': estimativa, 'metricas': metricas, 'contagem_amostra': dict(contagem),
+                'amostra': {h: sorted(a) for h, a in amostra.items()}}
+    with open(Path(diretorio_relatorios) / f"{nome}.json", 'w', encoding='utf-8') as arquivo:
+        json.dump(detalhes, arquivo, indent=2, ensure_ascii=False)
+    return metricas, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Estima a pontuação de mutação a partir de relatórios JSON do Stryker.")
+    parser.add_argument("solucao", type=Path, help="Diretório da solução (o mesmo em que o Stryker foi executado)")
+    parser.add_argument("relatorios", nargs="+", type=Path, help="mutation-report.json de cada rodada")
+    parser.add_argument("--nivel", type=float, default=NIVEL_CONFIANCA)
+    args = parser.parse_args()
+
+    estratos = arquivos_fonte(args.solucao.resolve())
+    tamanhos = {h: len(a) for h, a in estratos.items()}
+    todos = {a: h for h, lista in estratos.items() for a in lista}
+    amostra = {}
+    for relatorio in args.relatorios:
+        for arquivo, mutantes in _associar(ler_relatorio_json(relatorio), list(todos)).items():
+            amostra.setdefault(todos[arquivo], {})[arquivo] = mutantes
+    estimativa = estimar(tamanhos, amostra, args.nivel)
+    if estimativa is None:
+        print("Nenhum mutante válido nos relatórios.")
+        return
+    print(f"Pontuação estimada: {estimativa['pontuacao']:.2f}% "
+          f"(IC {args.nivel:.0%}: {estimativa['ic'][0]:.2f}–{estimativa['ic'][1]:.2f})")
+    for mutador, pontuacao in estimativa['mutadores'].items():
+        print(f"  {mutador:<30} {pontuacao:6.2f}%")
+
+if __name__ == "__main__":
+    perfilar(main)()
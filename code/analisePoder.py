@@ -0,0 +1,248 @@
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from carregarDados import carregar_resultados
+from perfilamento import perfilar
+from testesReamostragem import GRUPOS, MAX_ELEMENTOS_BLOCO, METRICAS, cliffs_delta
+
+# Configurações padrão
+TAMANHOS = [10, 15, 20, 30, 40, 60, 80, 100, 150, 200]  # Repositórios por grupo
+EFEITOS = [0.147, 0.33, 0.474]  # Delta de Cliff: limiares de efeito pequeno, médio e grande (Romano et al.)
+N_REPLICAS = 2_000
+N_PERMUTACOES_PODER = 500  # Permutações por réplica no teste de permutação
+PODER_ALVO = 0.80
+ALFA = 0.05
+TAMANHO_BLOCO_REPLICAS = 500
+AMOSTRA_DELTA = 200_000  # Sorteios usados para calcular o delta de Cliff entre duas distribuições ajustadas
+CENARIO_OBSERVADO = 'observado'
+CAMINHO_CANDIDATOS = 'Instrumentos/Codigos/repositorios.csv'
+
+def ajustar_beta(valores, escala):
+    """Parâmetros (a, b) da Beta pelo método dos momentos, com os valores levados para [0, 1] por `escala`."""
+    x = np.clip(np.asarray(valores, dtype=float) / escala, 1e-4, 1 - 1e-4)
+    media, variancia = x.mean(), x.var(ddof=1)
+    variancia = min(max(variancia, 1e-6), media * (1 - media) * 0.999)  # A Beta exige var < m(1-m)
+    concentracao = media * (1 - media) / variancia - 1
+    return float(media * concentracao), float((1 - media) * concentracao)
+
+def delta_distribuicoes(beta_x, beta_y, semente=0, n=AMOSTRA_DELTA):
+    """Delta de Cliff P(X > Y) - P(X < Y) entre duas Betas, por sorteio."""
+    rng = np.random.default_rng(semente)  # Mesma semente em toda chamada: a bisseção vê uma função monótona
+    return float(np.mean(np.sign(rng.beta(*beta_x, size=n) - rng.beta(*beta_y, size=n))))
+
+def alternativa_para_delta(beta, delta, semente=0, iteracoes=40):
+    """Beta com a mesma concentração de `beta` e média deslocada para que delta(alternativa, beta) = `delta`."""
+    a, b = beta
+    concentracao = a + b
+    inferior, superior = 1e-4, 1 - 1e-4
+    for _ in range(iteracoes):  # Bisseção na média: o delta cresce com ela
+        media = (inferior + superior) / 2
+        if delta_distribuicoes((media * concentracao, (1 - media) * concentracao), beta, semente) < delta:
+            inferior = media
+        else:
+            superior = media
+    media = (inferior + superior) / 2
+    return float(media * concentracao), float((1 - media) * concentracao)
+
+def ajustar_distribuicoes(df, metricas=METRICAS, grupos=GRUPOS, coluna_grupo='Arquitetura', candidatos=None):
+    """Ajusta uma Beta por métrica e grupo (e uma para os grupos juntos), com o rendimento de cada grupo.
+
+    O rendimento é a fração dos repositórios minerados do grupo (`candidatos`, o repositorios.csv) que chegou
+    ao fim com a métrica válida, isto é, que sobreviveu ao clone, build e Stryker/Coverlet. Sem `candidatos`
+    a base são as linhas do próprio CSV de resultados.
+    """
+    base = df if candidatos is None else candidatos
+    ajustes = {}
+    for metrica in metricas:
+        dados = {g: df.loc[df[coluna_grupo] == g, metrica].dropna().to_numpy(dtype=float) for g in grupos}
+        if any(len(v) < 3 for v in dados.values()):
+            ajustes[metrica] = {'n': [len(v) for v in dados.values()], 'erro': 'Dados insuficientes'}
+            continue
+        escala = 1.0 if max(v.max() for v in dados.values()) <= 1 else 100.0  # Fração (0-1) ou porcentagem (0-100)
+        ajustes[metrica] = {
+            'escala': escala,
+            'n': [len(dados[g]) for g in grupos],
+            'rendimento': [min(1.0, len(dados[g]) / max(1, int((base[coluna_grupo] == g).sum()))) for g in grupos],
+            'beta': [ajustar_beta(dados[g], escala) for g in grupos],
+            'beta_conjunto': ajustar_beta(np.concatenate(list(dados.values())), escala),
+            'delta_observado': cliffs_delta(dados[grupos[0]], dados[grupos[1]]),
+        }
+    return ajustes
+
+def _postos(amostras):
+    """Postos ao longo do último eixo (sem empates: as amostras são contínuas)."""
+    return np.argsort(np.argsort(amostras, axis=-1), axis=-1) + 1.0
+
+def p_valores_mann_whitney(x, y):
+    """p-valores bilaterais de Mann-Whitney (aproximação normal com correção de continuidade) por réplica."""
+    nx, ny = x.shape[1], y.shape[1]
+    u = _postos(np.concatenate([x, y], axis=1))[:, :nx].sum(axis=1) - nx * (nx + 1) / 2
+    z = (np.abs(u - nx * ny / 2) - 0.5) / math.sqrt(nx * ny * (nx + ny + 1) / 12)
+    return 2 * norm.sf(np.maximum(z, 0))
+
+def p_valores_permutacao(x, y, n_permutacoes, rng):
+    """p-valores do teste de permutação sobre o U, com `n_permutacoes` permutações por réplica."""
+    nx, n = x.shape[1], x.shape[1] + y.shape[1]
+    postos = _postos(np.concatenate([x, y], axis=1))
+    centro = nx * (n - nx) / 2
+    observado = np.abs(postos[:, :nx].sum(axis=1) - nx * (nx + 1) / 2 - centro)
+    indices = np.argsort(rng.random((x.shape[0], n_permutacoes, n)), axis=-1)[..., :nx]
+    u = np.take_along_axis(postos[:, None, :], indices, axis=-1).sum(axis=-1) - nx * (nx + 1) / 2
+    extremos = np.count_nonzero(np.abs(u - centro) >= observado[:, None] - 1e-9, axis=1)
+    return (extremos + 1) / (n_permutacoes + 1)
+
+def _bloco_poder(tarefa):
+    """Rejeições de H0 em um bloco de réplicas simuladas de um cenário (metrica, delta, nx, ny)."""
+    chave, beta_x, beta_y, nx, ny, replicas, teste, n_permutacoes, alfa, semente = tarefa
+    rng = np.random.default_rng(semente)
+    x = rng.beta(*beta_x, size=(replicas, nx))
+    y = rng.beta(*beta_y, size=(replicas, ny))
+    if teste == 'permutacao':
+        p = p_valores_permutacao(x, y, n_permutacoes, rng)
+    else:
+        p = p_valores_mann_whitney(x, y)
+    return chave, int(np.count_nonzero(p < alfa))
+
+def _replicas_por_bloco(n, teste, n_permutacoes):
+    elementos = n * (n_permutacoes if teste == 'permutacao' else 1)
+    return max(1, min(TAMANHO_BLOCO_REPLICAS, MAX_ELEMENTOS_BLOCO // max(1, elementos)))
+
+def simular_poder(ajustes, tamanhos=TAMANHOS, efeitos=EFEITOS, replicas=N_REPLICAS, teste='mann_whitney',
+                  n_permutacoes=N_PERMUTACOES_PODER, alfa=ALFA, proporcao=None, semente=42, workers=None):
+    """Poder por (métrica, cenário, tamanho) simulando amostras das Betas ajustadas.
+
+    Cenários: 'observado' (cada grupo com a sua Beta) e, para cada delta de `efeitos`, a Beta conjunta contra
+    a mesma Beta deslocada até aquele delta. `proporcao` é a fração do segundo grupo (None = grupos iguais;
+    o tamanho da grade vale para o maior grupo). As sementes dos blocos seguem a ordem das tarefas, então o
+    resultado não depende do número de workers.
+    """
+    sementes = np.random.SeedSequence(semente)
+    cenarios, tarefas = {}, []
+    for metrica, ajuste in ajustes.items():
+        if 'erro' in ajuste:
+            continue
+        conjunto = tuple(ajuste['beta_conjunto'])
+        cenarios[(metrica, CENARIO_OBSERVADO)] = (tuple(ajuste['beta'][0]), tuple(ajuste['beta'][1]),
+                                                  delta_distribuicoes(ajuste['beta'][0], ajuste['beta'][1]))
+        for efeito in efeitos:
+            cenarios[(metrica, efeito)] = (alternativa_para_delta(conjunto, efeito), conjunto, efeito)
+
+    for (metrica, cenario), (beta_x, beta_y, _) in cenarios.items():
+        for tamanho in tamanhos:
+            nx, ny = tamanho, tamanho
+            if proporcao is not None:
+                nx, ny = (tamanho, max(3, round(tamanho * proporcao / (1 - proporcao)))) if proporcao < 0.5 else \
+                         (max(3, round(tamanho * (1 - proporcao) / proporcao)), tamanho)
+            bloco = _replicas_por_bloco(nx + ny, teste, n_permutacoes)
+            partes = [min(bloco, replicas - inicio) for inicio in range(0, replicas, bloco)]
+            for parte, filha in zip(partes, sementes.spawn(len(partes))):
+                tarefas.append(((metrica, cenario, nx, ny), beta_x, beta_y, nx, ny, parte, teste, n_permutacoes, alfa, filha))
+
+    rejeicoes = {}
+    if workers == 1:
+        saidas = map(_bloco_poder, tarefas)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        saidas = executor.map(_bloco_poder, tarefas, chunksize=4)
+    for chave, rejeitadas in saidas:
+        rejeicoes[chave] = rejeicoes.get(chave, 0) + rejeitadas
+    if workers != 1:
+        executor.shutdown()
+
+    return [{'metrica': metrica, 'cenario': cenario, 'delta': cenarios[(metrica, cenario)][2], 'n': [nx, ny],
+             'poder': total / replicas} for (metrica, cenario, nx, ny), total in rejeicoes.items()]
+
+def recomendar(resultados, ajustes, poder_alvo=PODER_ALVO):
+    """Para cada métrica e cenário, o menor tamanho da grade com poder >= alvo e quantos repositórios minerar.
+
+    Os repositórios a minerar por grupo descontam os que já temos e dividem o que falta pelo rendimento do grupo.
+    """
+    recomendacoes = []
+    chaves = dict.fromkeys((r['metrica'], r['cenario']) for r in resultados)
+    for metrica, cenario in chaves:
+        linhas = sorted((r for r in resultados if (r['metrica'], r['cenario']) == (metrica, cenario)), key=lambda r: sum(r['n']))
+        suficiente = next((r for r in linhas if r['poder'] >= poder_alvo), None)
+        ajuste = ajustes[metrica]
+        recomendacao = {'metrica': metrica, 'cenario': cenario, 'delta': linhas[0]['delta'],
+                        'n_atual': ajuste['n'], 'rendimento': ajuste['rendimento']}
+        if suficiente is None:
+            recomendacao.update(n_necessario=None, minerar=None, poder=linhas[-1]['poder'])
+        else:
+            faltam = [max(0, alvo - atual) for alvo, atual in zip(suficiente['n'], ajuste['n'])]
+            recomendacao.update(n_necessario=suficiente['n'], poder=suficiente['poder'],
+                                minerar=[math.ceil(f / r) if r else None for f, r in zip(faltam, ajuste['rendimento'])])
+        recomendacoes.append(recomendacao)
+    return recomendacoes
+
+def imprimir(resultados, recomendacoes, grupos=GRUPOS, poder_alvo=PODER_ALVO):
+    print("\n=== PODER SIMULADO ===")
+    chaves = dict.fromkeys((r['metrica'], r['cenario']) for r in resultados)
+    for metrica, cenario in chaves:
+        linhas = [r for r in resultados if (r['metrica'], r['cenario']) == (metrica, cenario)]
+        nome = f"{cenario} (delta={linhas[0]['delta']:.3f})" if cenario == CENARIO_OBSERVADO else f"delta={cenario}"
+        print(f"\n {metrica} — {nome}")
+        print("   " + "  ".join(f"{r['n'][0]}/{r['n'][1]}: {r['poder']:.2f}" for r in linhas))
+
+    print(f"\n=== QUANTOS REPOSITÓRIOS MINERAR (poder >= {poder_alvo:.0%}) ===")
+    for r in recomendacoes:
+        nome = f"observado (delta={r['delta']:.3f})" if r['cenario'] == CENARIO_OBSERVADO else f"delta={r['cenario']}"
+        if r['n_necessario'] is None:
+            print(f" {r['metrica']:<30} {nome:<26} poder máximo da grade {r['poder']:.2f}: aumente --tamanhos")
+            continue
+        minerar = ", ".join(f"{g}: {m}" for g, m in zip(grupos, r['minerar']))
+        print(f" {r['metrica']:<30} {nome:<26} n = {r['n_necessario']} (atual {r['n_atual']}) → minerar {minerar}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise de poder por Monte Carlo: quantos repositórios MVC/MVVM minerar.")
+    parser.add_argument("--csv", type=Path, default=Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv'))
+    parser.add_argument("--candidatos", type=Path, default=Path(CAMINHO_CANDIDATOS),
+                        help="Repositórios minerados, para o rendimento de cada arquitetura")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="Repositórios por grupo simulados")
+    parser.add_argument("--efeitos", type=float, nargs="+", default=EFEITOS, help="Deltas de Cliff simulados")
+    parser.add_argument("--replicas", type=int, default=N_REPLICAS)
+    parser.add_argument("--teste", choices=['mann_whitney', 'permutacao'], default='mann_whitney')
+    parser.add_argument("--permutacoes", type=int, default=N_PERMUTACOES_PODER)
+    parser.add_argument("--alfa", type=float, default=ALFA)
+    parser.add_argument("--poder-alvo", type=float, default=PODER_ALVO)
+    parser.add_argument("--proporcao-observada", action="store_true",
+                        help="Mantém a proporção atual entre os grupos em vez de grupos do mesmo tamanho")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", type=Path, help="Também salva poder e recomendações neste arquivo JSON")
+    args = parser.parse_args()
+
+    candidatos = pd.read_csv(args.candidatos) if args.candidatos.exists() else None
+    if candidatos is None:
+        print(f"🔸 {args.candidatos} não encontrado: rendimento calculado sobre o próprio CSV de resultados")
+    ajustes = ajustar_distribuicoes(carregar_resultados(args.csv), candidatos=candidatos)
+    for metrica, ajuste in ajustes.items():
+        if 'erro' in ajuste:
+            print(f"🔸 {metrica}: {ajuste['erro']} (n = {ajuste['n']})")
+    proporcao = None
+    if args.proporcao_observada:
+        validos = [a for a in ajustes.values() if 'erro' not in a]
+        proporcao = validos[0]['n'][1] / sum(validos[0]['n']) if validos else None
+
+    inicio = time.perf_counter()
+    resultados = simular_poder(ajustes, args.tamanhos, args.efeitos, args.replicas, args.teste, args.permutacoes,
+                               args.alfa, proporcao, args.semente, args.workers)
+    recomendacoes = recomendar(resultados, ajustes, args.poder_alvo)
+    imprimir(resultados, recomendacoes, poder_alvo=args.poder_alvo)
+    print(f"\nTempo total: {time.perf_counter() - inicio:.2f}s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as arquivo:
+            json.dump({'ajustes': ajustes, 'poder': resultados, 'recomendacoes': recomendacoes}, arquivo,
+                      indent=2, ensure_ascii=False, default=str)
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from perfilamento import perfilar
+from preparacaoAntecipada import remover_diretorio
+from progressoCampanha import ARQUIVO_EVENTOS
+
+# Diretório em memória (tmpfs no Linux; no Windows, a letra de um RAM disk via AREA_MEMORIA)
+RAIZ_MEMORIA = os.environ.get("AREA_MEMORIA") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+ORCAMENTO_MEMORIA_GB = 8  # Soma das estimativas dos repositórios colocados em memória ao mesmo tempo
+FOLGA_MEMORIA_GB = 1  # Espaço que sempre fica livre no tmpfs (outros processos também o usam)
+FATOR_EXPANSAO = 4  # Clone + bin/obj + StrykerOutput em relação ao diskUsage informado pelo GitHub
+PREFIXO_AREA = "areaTrabalho-"
+ARQUIVO_ALOCACOES = "Instrumentos/Codigos/area_trabalho.jsonl"
+
+def tamanho_estimado(tamanho_kb):
+    """Bytes esperados do diretório de trabalho a partir da coluna 'Tamanho (KB)' (None se desconhecido)."""
+    try:
+        return int(float(tamanho_kb) * 1024 * FATOR_EXPANSAO)
+    except (TypeError, ValueError):
+        return None
+
+def _processo_ativo(pid):
+    if os.name == 'nt':
+        return True  # os.kill(pid, 0) envia CTRL_C_EVENT no Windows: órfãos ficam para limpeza manual
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # Existe, mas pertence a outro usuário
+    return True
+
+class AreaTrabalho:
+    """Distribui os diretórios de trabalho dos repositórios entre memória (tmpfs) e disco.
+
+    Um repositório vai para a memória quando o seu tamanho estimado cabe no orçamento e no espaço livre do
+    tmpfs; sem estimativa ou sem espaço `reservar` retorna None e o runner usa o seu diretório em disco.
+    Cada processo usa o seu próprio subdiretório (areaTrabalho-<pid>) e cada repositório um diretório só dele,
+    então workers simultâneos não se cruzam.
+    As escolhas vão para `arquivo_alocacoes`, que `relatorio` cruza com os eventos de progresso.
+    """
+
+    def __init__(self, memoria=RAIZ_MEMORIA, orcamento_gb=ORCAMENTO_MEMORIA_GB, arquivo_alocacoes=ARQUIVO_ALOCACOES):
+        self.memoria = Path(memoria) / f"{PREFIXO_AREA}{os.getpid()}" if memoria else None
+        self.orcamento = orcamento_gb * 2 ** 30
+        self.arquivo_alocacoes = arquivo_alocacoes
+        self.reservas = {}  # nome -> (caminho em memória ou None, local, bytes estimados)
+        self._lock = threading.Lock()
+        if self.memoria:
+            self._limpar_orfaos()
+
+    def _limpar_orfaos(self):
+        """Apaga áreas em memória deixadas por processos que terminaram sem limpar (ocupam RAM até o reboot)."""
+        for area in self.memoria.parent.glob(f"{PREFIXO_AREA}*"):
+            pid = area.name[len(PREFIXO_AREA):]
+            if pid.isdigit() and int(pid) != os.getpid() and not _processo_ativo(int(pid)):
+                print(f"Removendo área de trabalho órfã: {area}")
+                remover_diretorio(area)
+
+    def _cabe_na_memoria(self, estimativa):
+        if not self.memoria or estimativa is None:
+            return False
+        reservado = sum(b for _, local, b in self.reservas.values() if local == "memoria")
+        livre = shutil.disk_usage(self.memoria.parent).free - FOLGA_MEMORIA_GB * 2 ** 30
+        return reservado + estimativa <= self.orcamento and estimativa <= livre
+
+    def reservar(self, nome, tamanho_kb=None):
+        """Diretório em memória para o repositório, ou None se ele deve ficar em disco.
+
+        A resposta é a mesma enquanto o repositório não for liberado.
+        """
+        with self._lock:
+            if nome in self.reservas:
+                return self.reservas[nome][0]
+            estimativa = tamanho_estimado(tamanho_kb)
+            local = "memoria" if self._cabe_na_memoria(estimativa) else "disco"
+            caminho = str(self.memoria / nome) if local == "memoria" else None
+            self.reservas[nome] = (caminho, local, estimativa or 0)
+            self._registrar(nome=nome, local=local, estimativa=estimativa)
+            return caminho
+
+    def local(self, nome):
+        return self.reservas[nome][1] if nome in self.reservas else None
+
+    def liberar(self, nome):
+        """Devolve o espaço do repositório ao orçamento, apagando o diretório em memória se ainda existir."""
+        with self._lock:
+            caminho, _, _ = self.reservas.pop(nome, (None, None, 0))
+        if caminho and os.path.exists(caminho):
+            remover_diretorio(caminho)
+
+    def fechar(self):
+        if self.memoria and self.memoria.exists():
+            remover_diretorio(self.memoria)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        self.fechar()
+        return False
+
+    def _registrar(self, **dados):
+        if not self.arquivo_alocacoes:
+            return
+        os.makedirs(os.path.dirname(self.arquivo_alocacoes) or '.', exist_ok=True)
+        with open(self.arquivo_alocacoes, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps({'momento': time.time(), **dados}, ensure_ascii=False) + "\n")
+
+def _ler_jsonl(caminho):
+    if not os.path.exists(caminho):
+        return []
+    registros = []
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                continue
+    return registros
+
+def duracoes_etapas(eventos):
+    """{repositório: {etapa: segundos}} a partir dos eventos 'etapa'/'preparado'/'concluido' do progresso (última execução).
+
+    'preparado' fecha a última etapa antecipada: a espera na fila não conta como etapa.
+    """
+    duracoes, abertas = {}, {}
+    for evento in eventos:
+        nome = evento.get('repositorio')
+        if evento.get('tipo') not in ('etapa', 'preparado', 'concluido') or not nome:
+            continue
+        if nome in abertas:
+            etapa, inicio = abertas.pop(nome)
+            duracoes.setdefault(nome, {})[etapa] = evento['momento'] - inicio
+        if evento['tipo'] == 'etapa':
+            abertas[nome] = (evento['etapa'], evento['momento'])
+    return duracoes
+
+def relatorio(arquivo_alocacoes=ARQUIVO_ALOCACOES, arquivo_eventos=ARQUIVO_EVENTOS):
+    """{etapa: {'memoria'|'disco': (repositórios, mediana s/GB), 'economia': fração}} por etapa.
+
+    As durações são normalizadas pelo tamanho estimado para comparar repositórios de tamanhos diferentes;
+    a economia é 1 - mediana(memória) / mediana(disco).
+    """
+    alocacoes = {a['nome']: a for a in _ler_jsonl(arquivo_alocacoes) if a.get('estimativa')}
+    por_etapa = {}
+    for nome, etapas in duracoes_etapas(_ler_jsonl(arquivo_eventos)).items():
+        if nome not in alocacoes:
+            continue
+        gb = alocacoes[nome]['estimativa'] / 2 ** 30
+        for etapa, segundos in etapas.items():
+            por_etapa.setdefault(etapa, {}).setdefault(alocacoes[nome]['local'], []).append(segundos / gb)
+
+    resultado = {}
+    for etapa, locais in por_etapa.items():
+        resultado[etapa] = {local: (len(valores), statistics.median(valores)) for local, valores in locais.items()}
+        if 'memoria' in locais and 'disco' in locais and resultado[etapa]['disco'][1]:
+            resultado[etapa]['economia'] = 1 - resultado[etapa]['memoria'][1] / resultado[etapa]['disco'][1]
+    return resultado
+
+def medir_io(raiz, arquivos=2000, tamanho_kb=16):
+    """Segundos para gravar, ler e apagar `arquivos` arquivos pequenos (padrão de bin/obj) em `raiz`."""
+    diretorio = Path(raiz) / f"{PREFIXO_AREA}medicao-{os.getpid()}"
+    conteudo = os.urandom(tamanho_kb * 1024)
+    inicio = time.perf_counter()
+    for i in range(arquivos):
+        pasta = diretorio / f"obj{i % 50}"
+        pasta.mkdir(parents=True, exist_ok=True)
+        with open(pasta / f"{i}.dll", 'wb') as arquivo:
+            arquivo.write(conteudo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+    for i in range(arquivos):
+        (diretorio / f"obj{i % 50}" / f"{i}.dll").read_bytes()
+    shutil.rmtree(diretorio)
+    return time.perf_counter() - inicio
+
+def main():
+    parser = argparse.ArgumentParser(description="Diretórios de trabalho em memória (tmpfs): medição e relatório de economia.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_relatorio = sub.add_parser("relatorio", help="Tempo por etapa dos repositórios em memória e em disco")
+    p_relatorio.add_argument("--alocacoes", default=ARQUIVO_ALOCACOES)
+    p_relatorio.add_argument("--eventos", default=ARQUIVO_EVENTOS)
+
+    p_medir = sub.add_parser("medir", help="Compara a escrita/leitura de arquivos pequenos em disco e em memória")
+    p_medir.add_argument("--disco", default="Instrumentos/Codigos")
+    p_medir.add_argument("--memoria", default=RAIZ_MEMORIA)
+    p_medir.add_argument("--arquivos", type=int, default=2000)
+    args = parser.parse_args()
+
+    if args.comando == "medir":
+        tempos = {}
+        for local, raiz in (("disco", args.disco), ("memoria", args.memoria)):
+            if raiz and os.path.isdir(raiz):
+                tempos[local] = medir_io(raiz, args.arquivos)
+                print(f"{local:<8} {raiz:<30} {tempos[local]:.2f}s")
+        if len(tempos) == 2:
+            print(f"Economia de I/O em memória: {1 - tempos['memoria'] / tempos['disco']:.0%}")
+        return
+
+    for etapa, locais in relatorio(args.alocacoes, args.eventos).items():
+        colunas = [f"{local}: {locais[local][1]:.1f} s/GB (n={locais[local][0]})" for local in ("memoria", "disco") if local in locais]
+        economia = f"economia {locais['economia']:.0%}" if 'economia' in locais else "sem comparação"
+        print(f"{etapa:<10} {'  '.join(colunas):<60} {economia}")
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+DIRETORIO_ARQUIVO = "Instrumentos/Codigos/arquivo_saidas"
+INDICE = "indice.jsonl"
+CAMPO_ORIGEM = "_arquivo_saidas"  # Chave da linha de resultado com a origem das etapas (não vai para o CSV)
+
+def arquivos_modificados(raiz, desde):
+    """Arquivos sob `raiz` modificados a partir de `desde` (time.time()): os relatórios gerados pela etapa."""
+    encontrados = []
+    for diretorio, _, arquivos in os.walk(raiz):
+        for arquivo in arquivos:
+            caminho = Path(diretorio) / arquivo
+            try:
+                if caminho.stat().st_mtime >= desde:
+                    encontrados.append(caminho)
+            except OSError:
+                pass
+    return sorted(encontrados)
+
+class ArquivoSaidas:
+    """Guarda stdout/stderr e relatórios de cada etapa comprimidos e endereçados pelo conteúdo (SHA-256).
+
+    Cada conteúdo é gravado uma vez em objetos/<2 primeiros>/<sha>.gz; o índice (JSON lines) liga
+    (sessão, repositório, etapa, parte) aos hashes. Ao final de cada repositório a linha gravada no CSV
+    também entra no índice, para que reprocessarSaidas reconstrua os CSVs sem rodar nada de novo.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_ARQUIVO, ferramenta="stryker"):
+        self.diretorio = Path(diretorio)
+        self.ferramenta = ferramenta
+        self.sessao = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+
+    def _objeto(self, sha):
+        return self.diretorio / "objetos" / sha[:2] / f"{sha}.gz"
+
+    def guardar(self, conteudo):
+        """Grava o conteúdo (texto ou bytes) se ainda não existe e retorna o seu SHA-256."""
+        dados = conteudo.encode('utf-8') if isinstance(conteudo, str) else conteudo
+        sha = hashlib.sha256(dados).hexdigest()
+        destino = self._objeto(sha)
+        if not destino.exists():
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            temporario = destino.with_name(f"{destino.name}.{uuid.uuid4().hex}.tmp")
+            with gzip.open(temporario, 'wb', compresslevel=6) as arquivo:
+                arquivo.write(dados)
+            os.replace(temporario, destino)  # Escritas simultâneas do mesmo conteúdo terminam no mesmo arquivo
+        return sha
+
+    def ler(self, sha):
+        with gzip.open(self._objeto(sha), 'rb') as arquivo:
+            return arquivo.read().decode('utf-8', errors='replace')
+
+    def _indexar(self, registro):
+        with self._lock:
+            self.diretorio.mkdir(parents=True, exist_ok=True)
+            with open(self.diretorio / INDICE, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+    def registrar(self, nome, etapa, codigo=None, segundos=None, parte=None, relatorios=(), raiz=None, **saidas):
+        """Arquiva as saídas de uma etapa (stdout=..., stderr=...) e os relatórios (caminhos relativos a `raiz`).
+
+        Falhas de disco só geram aviso: o arquivo não pode interromper a campanha.
+        """
+        try:
+            registro = {'sessao': self.sessao, 'ferramenta': self.ferramenta, 'nome': nome, 'etapa': etapa,
+                        'parte': parte, 'codigo': codigo, 'segundos': segundos, 'momento': time.time(),
+                        'saidas': {chave: self.guardar(texto) for chave, texto in saidas.items() if texto},
+                        'relatorios': {}}
+            for caminho in relatorios:
+                chave = os.path.relpath(caminho, raiz) if raiz else str(caminho)
+                registro['relatorios'][Path(chave).as_posix()] = self.guardar(Path(caminho).read_bytes())
+            self._indexar(registro)
+        except OSError as e:
+            print(f"Aviso: não foi possível arquivar a etapa {etapa} de {nome}: {e}")
+
+    def origem(self):
+        """Diretório, ferramenta e sessão deste arquivo: liga resultados gravados por outro processo às etapas."""
+        return {'diretorio': str(self.diretorio), 'ferramenta': self.ferramenta, 'sessao': self.sessao}
+
+    def resultado(self, nome, linha, csv, sessao=None):
+        """Registra a linha gravada no CSV de resultados para o repositório.
+
+        `sessao` é a da execução que arquivou as etapas, quando o CSV é gravado em outro processo (coordenador).
+        """
+        try:
+            self._indexar({'sessao': sessao or self.sessao, 'ferramenta': self.ferramenta, 'nome': nome, 'etapa': 'resultado',
+                           'momento': time.time(), 'csv': str(csv), 'linha': linha})
+        except OSError as e:
+            print(f"Aviso: não foi possível arquivar o resultado de {nome}: {e}")
+
+def ler_indice(diretorio=DIRETORIO_ARQUIVO):
+    """Registros do índice na ordem em que foram gravados (linhas incompletas são ignoradas)."""
+    caminho = Path(diretorio) / INDICE
+    if not caminho.exists():
+        return []
+    registros = []
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            try:
+                registros.append(json.loads(linha))
+            except ValueError:
+                continue
+    return registros
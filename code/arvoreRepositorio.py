@@ -0,0 +1,178 @@
+import argparse
+import codecs
+import json
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from perfilamento import perfilar
+
+try:
+    import ijson  # Parser incremental em C, quando instalado
+except ImportError:
+    ijson = None
+
+API_GITHUB = "https://api.github.com"
+SUFIXOS_DOTNET = ('.csproj', '.sln')
+TAMANHO_BLOCO = 64 * 1024
+TRABALHADORES_SUBARVORES = 8
+TENTATIVAS = 3
+TRUNCATED_PATTERN = r'"truncated"\s*:\s*(true|false)'
+
+_DECODER = json.JSONDecoder()
+
+def _itens_ijson(resposta, estado):
+    """Gera (path, type) de cada entrada de 'tree' com o ijson, guardando 'truncated' em estado."""
+    resposta.raw.decode_content = True
+    item = {}
+    for prefixo, evento, valor in ijson.parse(resposta.raw):
+        if prefixo == 'tree.item.path':
+            item['path'] = valor
+        elif prefixo == 'tree.item.type':
+            item['type'] = valor
+        elif prefixo == 'tree.item.sha':
+            item['sha'] = valor
+        elif prefixo == 'tree.item' and evento == 'end_map':
+            yield item
+            item = {}
+        elif prefixo == 'truncated':
+            estado['truncated'] = valor
+
+def _itens_texto(resposta, estado):
+    """Mesmo que _itens_ijson, decodificando um objeto de 'tree' por vez com json.raw_decode."""
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    buffer = ""
+    dentro = None  # None: antes de 'tree'; True: dentro da lista; False: depois dela
+    restante = ""
+    for bloco in resposta.iter_content(TAMANHO_BLOCO):
+        buffer += decodificador.decode(bloco)
+        if dentro is None:
+            inicio = buffer.find('"tree"')
+            colchete = buffer.find('[', inicio) if inicio != -1 else -1
+            if colchete == -1:
+                continue
+            restante = buffer[:inicio]
+            buffer = buffer[colchete + 1:]
+            dentro = True
+        while dentro:
+            buffer = buffer.lstrip(' \t\r\n,')
+            if not buffer:
+                break
+            if buffer[0] == ']':
+                dentro = False
+                buffer = buffer[1:]
+                break
+            try:
+                item, fim = _DECODER.raw_decode(buffer)
+            except json.JSONDecodeError:
+                break  # Objeto incompleto: espera o próximo bloco
+            buffer = buffer[fim:]
+            yield item
+        if dentro is False:
+            restante += buffer
+            buffer = ""
+    if dentro:
+        raise ValueError("Resposta da árvore terminou no meio da lista 'tree'")
+    match = re.search(TRUNCATED_PATTERN, restante + buffer)
+    estado['truncated'] = bool(match) and match.group(1) == 'true'
+
+def _ler_arvore(url, cabecalhos, sufixos):
+    """Lê uma árvore da API em streaming.
+
+    Retorna (arquivos com os sufixos, subdiretórios [(path, sha)], truncated), ou None se a árvore não existe.
+    Só os caminhos de interesse ficam em memória; os subdiretórios só são guardados em listagens não recursivas.
+    """
+    for tentativa in range(TENTATIVAS):
+        try:
+            with requests.get(url, headers=cabecalhos(), timeout=60, stream=True) as resposta:
+                if resposta.status_code in (404, 409, 422):
+                    return None
+                if resposta.status_code != 200:
+                    raise requests.HTTPError(f"{resposta.status_code} em {url}")
+                recursiva = 'recursive=' in url
+                estado = {'truncated': False}
+                arquivos, subdiretorios = [], []
+                itens = _itens_ijson if ijson is not None else _itens_texto
+                for item in itens(resposta, estado):
+                    if item.get('type') == 'blob' and item['path'].endswith(sufixos):
+                        arquivos.append(item['path'])
+                    elif item.get('type') == 'tree' and not recursiva:
+                        subdiretorios.append((item['path'], item['sha']))
+                return arquivos, subdiretorios, estado['truncated']
+        except (requests.RequestException, ValueError) as e:
+            if tentativa == TENTATIVAS - 1:
+                raise RuntimeError(f"Falha ao ler a árvore {url}: {e}")
+            time.sleep(2 * (tentativa + 1))
+
+def _listar_subarvore(base, sha, prefixo, cabecalhos, sufixos):
+    """Tenta a subárvore inteira de uma vez; se vier truncada, lista só este nível e devolve os subdiretórios."""
+    resultado = _ler_arvore(f"{base}/{sha}?recursive=1", cabecalhos, sufixos)
+    if resultado is None:
+        raise RuntimeError(f"Subárvore {prefixo or '/'} ({sha}) não encontrada")
+    arquivos, _, truncada = resultado
+    subdiretorios = []
+    if truncada:
+        arquivos, subdiretorios, _ = _ler_arvore(f"{base}/{sha}", cabecalhos, sufixos)
+    return [prefixo + a for a in arquivos], [(prefixo + p + '/', s) for p, s in subdiretorios]
+
+def listar_arquivos(owner, name, branch, cabecalhos, sufixos=SUFIXOS_DOTNET,
+                    trabalhadores=TRABALHADORES_SUBARVORES, api=API_GITHUB):
+    """Lista todos os caminhos do branch terminados em um dos sufixos, ou None se o branch não existe.
+
+    Começa pela árvore recursiva. Se a API a truncar, percorre as subárvores em paralelo: cada uma é pedida
+    recursivamente e, se ainda vier truncada, é listada nível a nível, até que nada fique de fora.
+    """
+    base = f"{api}/repos/{owner}/{name}/git/trees"
+    resultado = _ler_arvore(f"{base}/{branch}?recursive=1", cabecalhos, sufixos)
+    if resultado is None:
+        return None
+    arquivos, _, truncada = resultado
+    encontrados = set(arquivos)
+    if not truncada:
+        return sorted(encontrados)
+
+    print(f"Árvore de {owner}/{name} truncada; percorrendo subárvores...")
+    raiz = _ler_arvore(f"{base}/{branch}", cabecalhos, sufixos)
+    if raiz is None:
+        return None
+    arquivos, subdiretorios, _ = raiz
+    encontrados.update(arquivos)
+    with ThreadPoolExecutor(max_workers=trabalhadores) as executor:
+        pendentes = {executor.submit(_listar_subarvore, base, sha, path + '/', cabecalhos, sufixos)
+                     for path, sha in subdiretorios}
+        while pendentes:
+            concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                arquivos, subdiretorios = futuro.result()
+                encontrados.update(arquivos)
+                pendentes.update(executor.submit(_listar_subarvore, base, sha, path, cabecalhos, sufixos)
+                                 for path, sha in subdiretorios)
+    return sorted(encontrados)
+
+def main():
+    parser = argparse.ArgumentParser(description="Lista os arquivos .csproj/.sln de um repositório pela API de árvores do GitHub.")
+    parser.add_argument("owner")
+    parser.add_argument("nome")
+    parser.add_argument("--branch", default="main")
+    parser.add_argument("--trabalhadores", type=int, default=TRABALHADORES_SUBARVORES)
+    parser.add_argument("--api", default=API_GITHUB)
+    args = parser.parse_args()
+
+    token = (os.getenv("GITHUB_TOKENS") or "").split(",")[0]
+    cabecalhos = lambda: {"Authorization": f"Bearer {token}"} if token else {}
+    inicio = time.perf_counter()
+    arquivos = listar_arquivos(args.owner, args.nome, args.branch, cabecalhos,
+                               trabalhadores=args.trabalhadores, api=args.api)
+    if arquivos is None:
+        print(f"Branch {args.branch} não encontrado.")
+        return
+    for caminho in arquivos:
+        print(caminho)
+    print(f"{len(arquivos)} arquivos em {time.perf_counter() - inicio:.1f}s "
+          f"(parser: {'ijson' if ijson is not None else 'json.raw_decode'})")
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,165 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from carregarDados import carregar_resultados
+from gerarDadosSinteticos import gerar_resultados
+from perfilamento import perfilar
+
+ESCALAS_PADRAO = [1_000, 10_000, 100_000, 1_000_000]
+# Etapas caras demais para escalas grandes: tamanho máximo em que ainda são executadas
+LIMITES_ETAPA = {'permutacao': 100_000, 'shapiro': 100_000}
+TOLERANCIA_REGRESSAO = 1.25  # Tempo 25% maior que a referência é sinalizado
+
+def _dados_escala(diretorio, n, semente):
+    """Gera (uma única vez) os CSVs sintéticos da escala `n`."""
+    caminho = Path(diretorio) / f"resultados_{n}.csv"
+    caminho_idade = Path(diretorio) / f"idade_{n}.csv"
+    if not caminho.exists() or not caminho_idade.exists():
+        print(f"Gerando dados sintéticos com {n} linhas...")
+        gerar_resultados(n, caminho, semente=semente, caminho_idade=caminho_idade)
+    return caminho, caminho_idade
+
+# Cada etapa recebe o contexto da escala e executa o mesmo código usado pelos scripts de análise
+def etapa_leitura_csv(ctx):
+    return carregar_resultados(ctx['csv'], ctx['idade'], usar_cache=False)
+
+def etapa_snapshot(ctx):
+    return carregar_resultados(ctx['csv'], ctx['idade'], usar_cache=True)
+
+def etapa_descritivas(ctx):
+    import generateCharts
+    with contextlib.redirect_stdout(io.StringIO()):
+        generateCharts.exibir_estatisticas(ctx['df'])
+        generateCharts.exibir_regressao_cobertura(ctx['df'])
+
+def _unidades(ctx, teste):
+    import relatorioEstatistico
+    espec = relatorioEstatistico.carregar_especificacao(None)
+    espec['testes'] = [teste]
+    for unidade in relatorioEstatistico.planejar(ctx['df'], espec):
+        relatorioEstatistico._executar_unidade(unidade)
+
+def etapa_shapiro(ctx):
+    _unidades(ctx, 'shapiro')
+
+def etapa_mannwhitney(ctx):
+    _unidades(ctx, 'mannwhitney')
+
+def etapa_permutacao(ctx):
+    from testesReamostragem import comparar_grupos
+    comparar_grupos(ctx['df'], n_permutacoes=2_000, n_bootstrap=2_000, workers=1)
+
+def etapa_regressao_pares(ctx):
+    from regressaoPares import regressao_todos_pares
+    regressao_todos_pares(ctx['df'])
+
+def etapa_graficos(ctx):
+    import generateCharts
+    conjuntos = {'resultados': ctx['df'], 'idade': ctx['df']}
+    for nome, (_, conjunto, colunas) in generateCharts.FIGURAS.items():
+        generateCharts.renderizar_figura(nome, conjuntos[conjunto][colunas].reset_index(drop=True),
+                                         ctx['saida_graficos'], ['png'], 100)
+
+ETAPAS = {
+    'leitura_csv': etapa_leitura_csv,
+    'snapshot': etapa_snapshot,
+    'descritivas': etapa_descritivas,
+    'shapiro': etapa_shapiro,
+    'mannwhitney': etapa_mannwhitney,
+    'permutacao': etapa_permutacao,
+    'regressao_pares': etapa_regressao_pares,
+    'graficos': etapa_graficos,
+}
+
+def medir(funcao, ctx, memoria=True):
+    """Mede tempo de parede e, numa segunda execução, o pico de memória alocada (tracemalloc)."""
+    gc.collect()
+    inicio = time.perf_counter()
+    funcao(ctx)
+    segundos = time.perf_counter() - inicio
+
+    pico_mb = None
+    if memoria:
+        gc.collect()
+        tracemalloc.start()
+        funcao(ctx)
+        pico_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return segundos, pico_mb
+
+def executar_benchmark(escalas, etapas, diretorio, semente=0, memoria=True):
+    resultados = []
+    for n in escalas:
+        caminho, caminho_idade = _dados_escala(diretorio, n, semente)
+        ctx = {'csv': caminho, 'idade': caminho_idade, 'saida_graficos': Path(diretorio) / f"graficos_{n}"}
+        ctx['saida_graficos'].mkdir(parents=True, exist_ok=True)
+        ctx['df'] = carregar_resultados(caminho, caminho_idade, usar_cache=True)
+        tamanho_mb = os.path.getsize(caminho) / 2 ** 20
+
+        for nome in etapas:
+            if n > LIMITES_ETAPA.get(nome, float('inf')):
+                print(f"[{n:>9}] {nome:<16} pulado (limite {LIMITES_ETAPA[nome]})")
+                continue
+            try:
+                segundos, pico_mb = medir(ETAPAS[nome], ctx, memoria)
+                erro = None
+            except Exception as e:
+                segundos, pico_mb, erro = None, None, str(e)
+            resultados.append({'linhas': n, 'csv_mb': round(tamanho_mb, 2), 'etapa': nome,
+                               'segundos': segundos, 'pico_mb': pico_mb, 'erro': erro})
+            if erro:
+                print(f"[{n:>9}] {nome:<16} ERRO: {erro}")
+            else:
+                memoria_txt = f"{pico_mb:9.1f} MB" if pico_mb is not None else ""
+                print(f"[{n:>9}] {nome:<16} {segundos:9.3f} s {memoria_txt}")
+    return resultados
+
+def comparar(resultados, referencia):
+    """Lista as etapas que ficaram mais lentas que a referência além da tolerância."""
+    anteriores = {(r['linhas'], r['etapa']): r for r in referencia if r.get('segundos')}
+    regressoes = []
+    for r in resultados:
+        anterior = anteriores.get((r['linhas'], r['etapa']))
+        if anterior and r.get('segundos') and r['segundos'] > anterior['segundos'] * TOLERANCIA_REGRESSAO:
+            regressoes.append((r['linhas'], r['etapa'], anterior['segundos'], r['segundos']))
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede tempo e memória de cada etapa de análise em várias escalas.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS_PADRAO)
+    parser.add_argument("--etapas", nargs="+", default=list(ETAPAS), choices=list(ETAPAS))
+    parser.add_argument("--diretorio", type=Path, default=Path('benchmark_dados'))
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--sem-memoria", action="store_true", help="Não mede o pico de memória (mais rápido)")
+    parser.add_argument("--saida", type=Path, default=Path('benchmark_analise.json'))
+    parser.add_argument("--referencia", type=Path, help="Resultado anterior para detectar regressões")
+    args = parser.parse_args()
+
+    import matplotlib
+    matplotlib.use('Agg')
+    warnings.filterwarnings('ignore', category=UserWarning)  # ex.: shapiro com N > 5000
+
+    resultados = executar_benchmark(args.escalas, args.etapas, args.diretorio, args.semente, not args.sem_memoria)
+    args.saida.write_text(json.dumps(resultados, indent=2), encoding='utf-8')
+    print(f"\nResultados salvos em {args.saida}")
+    print(pd.DataFrame(resultados).pivot_table(index='etapa', columns='linhas', values='segundos').round(3).to_string())
+
+    if args.referencia:
+        regressoes = comparar(resultados, json.loads(args.referencia.read_text(encoding='utf-8')))
+        for linhas, etapa, antes, depois in regressoes:
+            print(f"REGRESSÃO: {etapa} com {linhas} linhas: {antes:.3f}s -> {depois:.3f}s")
+        if regressoes:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,141 @@
+import argparse
+import csv
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from coverletRunner import extract_coverage, extract_dll_candidates, extract_dll_name
+from mutationTestRunnerV2 import extract_stryker_metrics
+from perfilamento import perfilar
+from registroErros import ler_log
+
+DIRETORIO_CORPUS = Path(__file__).parent / 'corpus'
+ARQUIVO_GOLDEN = DIRETORIO_CORPUS / 'golden.json'
+CSV_REPLAY = Path(__file__).parent / 'repositoriosClonadosV1.csv'
+PREFIXO_ERRO_STRYKER = "Erro ao executar Stryker: "
+TAMANHO_LOG_LONGO_MB = 20
+TEMPO_MINIMO = 0.5  # Cada medição de vazão repete o parser até somar pelo menos este tempo
+
+def _parse_coverlet(saida):
+    linha, metodo = extract_coverage(saida)
+    return {'Cobertura Linha (%)': linha, 'Cobertura Método (%)': metodo}
+
+def _parse_dotnet_test(saida):
+    return {'candidatos': extract_dll_candidates(saida), 'nome': extract_dll_name(saida)}
+
+PARSERS = {
+    'stryker': extract_stryker_metrics,
+    'coverlet': _parse_coverlet,
+    'dotnet_test': _parse_dotnet_test,
+}
+
+def carregar_corpus(csv_replay=CSV_REPLAY, tamanho_longo_mb=TAMANHO_LOG_LONGO_MB):
+    """Retorna {parser: {caso: texto}} com os logs gravados, os logs reais do CSV e um log muito longo."""
+    corpus = {parser: {} for parser in PARSERS}
+    for parser in PARSERS:
+        for arquivo in sorted((DIRETORIO_CORPUS / parser).glob('*.log')):
+            corpus[parser][f"{parser}/{arquivo.name}"] = arquivo.read_text(encoding='utf-8')
+
+    # Replay: saídas reais do Stryker guardadas na coluna 'Erro' dos resultados da campanha
+    if csv_replay and Path(csv_replay).exists():
+        csv.field_size_limit(10 * 1024 * 1024)
+        with open(csv_replay, mode='r', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                # Formato novo: a saída completa está no log comprimido indicado em 'Log Erro'
+                erro = ler_log(row["Log Erro"]) if row.get("Log Erro") and Path(row["Log Erro"]).exists() else row.get("Erro", "")
+                if erro.startswith(PREFIXO_ERRO_STRYKER):
+                    corpus['stryker'][f"csv:{row['Nome']}"] = erro[len(PREFIXO_ERRO_STRYKER):]
+
+    # Log longo: ruído real repetido seguido de um resumo conhecido; as métricas devem ser as do resumo
+    if tamanho_longo_mb:
+        ruido = max(corpus['stryker'].values(), key=len)
+        resumo = corpus['stryker']['stryker/sucesso_javatocsharp.log']
+        repeticoes = max(1, int(tamanho_longo_mb * 2 ** 20 / max(1, len(ruido))))
+        corpus['stryker']['longo:ruido+sucesso_javatocsharp'] = ruido * repeticoes + "\n" + resumo
+    return corpus
+
+def verificar_golden(corpus, golden):
+    """Compara a saída de cada parser com os valores de referência. Retorna a lista de divergências."""
+    divergencias = []
+    for parser, casos in corpus.items():
+        for caso, texto in casos.items():
+            esperado = golden.get(caso)
+            if caso.startswith('longo:'):
+                esperado = golden.get('stryker/sucesso_javatocsharp.log')
+            obtido = PARSERS[parser](texto)
+            if esperado is None:
+                divergencias.append((caso, 'sem valor de referência', obtido))
+            elif obtido != esperado:
+                divergencias.append((caso, esperado, obtido))
+    return divergencias
+
+def gerar_golden(corpus):
+    return {caso: PARSERS[parser](texto) for parser, casos in corpus.items()
+            for caso, texto in casos.items() if not caso.startswith('longo:')}
+
+def medir_vazao(parser, textos):
+    """Vazão (MB/s) e pico de memória (MB) do parser sobre um conjunto de textos."""
+    funcao = PARSERS[parser]
+    total_mb = sum(len(t.encode('utf-8')) for t in textos) / 2 ** 20
+
+    repeticoes = 0
+    inicio = time.perf_counter()
+    while True:
+        for texto in textos:
+            funcao(texto)
+        repeticoes += 1
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= TEMPO_MINIMO:
+            break
+
+    tracemalloc.start()
+    for texto in textos:
+        funcao(texto)
+    pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return {'mb': round(total_mb, 3), 'mb_por_s': total_mb * repeticoes / decorrido, 'pico_mb': pico}
+
+def main():
+    parser = argparse.ArgumentParser(description="Valida e mede os parsers de saída do Stryker, Coverlet e dotnet test.")
+    parser.add_argument("--atualizar-golden", action="store_true",
+                        help="Regrava corpus/golden.json com as saídas atuais (use apenas após revisar as mudanças)")
+    parser.add_argument("--tamanho-longo-mb", type=int, default=TAMANHO_LOG_LONGO_MB)
+    parser.add_argument("--saida", type=Path, help="Salva as medições neste arquivo JSON")
+    args = parser.parse_args()
+
+    corpus = carregar_corpus(tamanho_longo_mb=args.tamanho_longo_mb)
+
+    if args.atualizar_golden:
+        ARQUIVO_GOLDEN.write_text(json.dumps(gerar_golden(corpus), indent=2, ensure_ascii=False) + "\n", encoding='utf-8')
+        print(f"Valores de referência salvos em {ARQUIVO_GOLDEN}")
+        return
+
+    golden = json.loads(ARQUIVO_GOLDEN.read_text(encoding='utf-8'))
+    divergencias = verificar_golden(corpus, golden)
+    print("=== CORREÇÃO ===")
+    total_casos = sum(len(c) for c in corpus.values())
+    print(f"{total_casos - len(divergencias)}/{total_casos} casos conferem com os valores de referência")
+    for caso, esperado, obtido in divergencias:
+        print(f"  DIVERGÊNCIA em {caso}:\n    esperado: {esperado}\n    obtido:   {obtido}")
+
+    print("\n=== DESEMPENHO ===")
+    medicoes = {}
+    for nome_parser, casos in corpus.items():
+        grupos = {'corpus': [t for c, t in casos.items() if not c.startswith('longo:')],
+                  'longo': [t for c, t in casos.items() if c.startswith('longo:')]}
+        for grupo, textos in grupos.items():
+            if not textos:
+                continue
+            medicao = medir_vazao(nome_parser, textos)
+            medicoes[f"{nome_parser}/{grupo}"] = medicao
+            print(f"{nome_parser:<12} {grupo:<7} {medicao['mb']:>9.2f} MB  {medicao['mb_por_s']:>9.1f} MB/s  "
+                  f"pico {medicao['pico_mb']:>8.2f} MB")
+
+    if args.saida:
+        args.saida.write_text(json.dumps(medicoes, indent=2), encoding='utf-8')
+    if divergencias:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,173 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import tarfile
+import time
+import uuid
+from pathlib import Path
+
+from perfilamento import perfilar
+
+DIRETORIO_CACHE = "Instrumentos/Codigos/.cache_build"
+LIMITE_CACHE_GB = 20
+CONFIGURACAO_PADRAO = "Debug"  # Configuração usada pelo `dotnet build`/`dotnet test` sem -c
+PASTAS_SAIDA = ("bin", "obj")
+
+def commit_atual(caminho_repo):
+    """SHA do HEAD do clone (None se não for possível obter)."""
+    try:
+        return subprocess.run(["git", "-C", str(caminho_repo), "rev-parse", "HEAD"], check=True,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def versao_sdk(diretorio):
+    """Versão do SDK que o dotnet resolve no diretório (respeita o global.json do repositório)."""
+    try:
+        return subprocess.run(["dotnet", "--version"], cwd=diretorio, check=True,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def chave_build(owner, nome, sha, sdk, configuracao=CONFIGURACAO_PADRAO, diretorio_sln=""):
+    conteudo = json.dumps([owner, nome, sha, sdk, configuracao, diretorio_sln])
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()[:32]
+
+def pastas_saida(raiz):
+    """Pastas bin/obj dos projetos (sem descer nelas nem no .git)."""
+    encontradas = []
+    for diretorio, subdiretorios, _ in os.walk(raiz):
+        for nome in list(subdiretorios):
+            if nome in PASTAS_SAIDA:
+                encontradas.append(Path(diretorio) / nome)
+                subdiretorios.remove(nome)
+            elif nome == '.git':
+                subdiretorios.remove(nome)
+    return encontradas
+
+class CacheBuild:
+    """Cache local de bin/obj por (repositório, commit, SDK, configuração), com limite de tamanho por LRU."""
+
+    def __init__(self, diretorio=DIRETORIO_CACHE, limite_gb=LIMITE_CACHE_GB):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = int(limite_gb * 2 ** 30)
+
+    def _arquivo(self, chave):
+        return self.diretorio / f"{chave}.tar.gz"
+
+    def chave(self, repo, caminho_repo, caminho_sln, configuracao=CONFIGURACAO_PADRAO):
+        """Retorna (chave, metadados) do clone, ou (None, None) se o commit ou o SDK não puderem ser identificados."""
+        sha, sdk = commit_atual(caminho_repo), versao_sdk(caminho_sln)
+        if not sha or not sdk:
+            return None, None
+        metadados = {'repositorio': f"{repo['Proprietário']}/{repo['Nome']}", 'sha': sha, 'sdk': sdk,
+                     'configuracao': configuracao, 'diretorio_sln': repo.get("Diretório SLN", "")}
+        return chave_build(repo["Proprietário"], repo["Nome"], sha, sdk, configuracao, metadados['diretorio_sln']), metadados
+
+    def restaurar(self, chave, caminho_repo):
+        """Extrai bin/obj no clone novo. Retorna True se havia entrada no cache."""
+        arquivo = self._arquivo(chave)
+        if not chave or not arquivo.exists():
+            return False
+        inicio = time.time()
+        try:
+            with tarfile.open(arquivo, 'r:gz') as tar:
+                membros = tar.getmembers()
+                try:
+                    tar.extractall(caminho_repo, members=membros, filter='data')
+                except TypeError:  # Python sem o parâmetro filter
+                    tar.extractall(caminho_repo, members=membros)
+        except (OSError, tarfile.TarError) as e:
+            print(f"Entrada de cache {chave} ilegível ({e}); ignorando.")
+            self.remover(chave)
+            return False
+
+        # O clone acabou de criar os fontes com mtime atual; as saídas precisam ser mais novas
+        # para que o build incremental do MSBuild as considere atualizadas
+        agora = time.time() + 1
+        for membro in membros:
+            caminho = Path(caminho_repo) / membro.name
+            if caminho.exists() and not caminho.is_symlink():
+                os.utime(caminho, (agora, agora))
+        os.utime(arquivo)  # Marca como usado recentemente (LRU)
+        print(f"Build restaurado do cache em {time.time() - inicio:.1f}s ({arquivo.stat().st_size / 2 ** 20:.1f} MB)")
+        return True
+
+    def salvar(self, chave, caminho_repo, metadados=None):
+        """Guarda as pastas bin/obj do clone e aplica o limite de tamanho."""
+        if not chave:
+            return False
+        pastas = pastas_saida(caminho_repo)
+        if not pastas:
+            return False
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        temporario = self.diretorio / f".{chave}.{uuid.uuid4().hex}.tmp"
+        try:
+            with tarfile.open(temporario, 'w:gz', compresslevel=1) as tar:
+                for pasta in pastas:
+                    tar.add(pasta, arcname=pasta.relative_to(caminho_repo).as_posix())
+            os.replace(temporario, self._arquivo(chave))  # Atômico: outros workers nunca veem arquivo parcial
+        except OSError as e:
+            print(f"Não foi possível salvar o build no cache: {e}")
+            if temporario.exists():
+                temporario.unlink()
+            return False
+        (self.diretorio / f"{chave}.json").write_text(json.dumps({**(metadados or {}), 'criado_em': time.time()}),
+                                                      encoding='utf-8')
+        self.podar()
+        return True
+
+    def remover(self, chave):
+        for arquivo in (self._arquivo(chave), self.diretorio / f"{chave}.json"):
+            try:
+                arquivo.unlink()
+            except FileNotFoundError:
+                pass
+
+    def entradas(self):
+        """Entradas do cache da mais recentemente usada para a menos usada: [(chave, bytes, último uso)]."""
+        resultado = []
+        for arquivo in self.diretorio.glob('*.tar.gz'):
+            try:
+                info = arquivo.stat()
+            except FileNotFoundError:
+                continue  # Removida por outro worker
+            resultado.append((arquivo.name[:-len('.tar.gz')], info.st_size, info.st_mtime))
+        return sorted(resultado, key=lambda entrada: entrada[2], reverse=True)
+
+    def podar(self):
+        """Remove as entradas menos usadas até o cache caber no limite. Retorna quantas foram removidas."""
+        total, removidas = 0, 0
+        for chave, tamanho, _ in self.entradas():
+            total += tamanho
+            if total > self.limite_bytes:
+                self.remover(chave)
+                removidas += 1
+        return removidas
+
+def main():
+    parser = argparse.ArgumentParser(description="Administra o cache de saídas de build (bin/obj).")
+    parser.add_argument("comando", choices=["status", "podar", "limpar"])
+    parser.add_argument("--diretorio", default=DIRETORIO_CACHE)
+    parser.add_argument("--limite-gb", type=float, default=LIMITE_CACHE_GB)
+    args = parser.parse_args()
+
+    cache = CacheBuild(args.diretorio, args.limite_gb)
+    if args.comando == "podar":
+        print(f"{cache.podar()} entradas removidas")
+    elif args.comando == "limpar":
+        for chave, _, _ in cache.entradas():
+            cache.remover(chave)
+    entradas = cache.entradas()
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    print(f"{len(entradas)} entradas, {total / 2 ** 30:.2f} GB de {args.limite_gb} GB")
+    for chave, tamanho, uso in entradas[:20]:
+        meta_arquivo = cache.diretorio / f"{chave}.json"
+        meta = json.loads(meta_arquivo.read_text(encoding='utf-8')) if meta_arquivo.exists() else {}
+        print(f"  {time.strftime('%Y-%m-%d %H:%M', time.localtime(uso))}  {tamanho / 2 ** 20:8.1f} MB  "
+              f"{meta.get('repositorio', chave)} {meta.get('sha', '')[:10]} SDK {meta.get('sdk', '?')}")
+
+if __name__ == "__main__":
+    perfilar(main)()
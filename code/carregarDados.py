@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Caminhos padrão dos dados analisados
+CAMINHO_RESULTADOS = Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv')
+CAMINHO_IDADE = Path('Instrumentos/Codigos/repositoriosIdade.csv')
+CAMINHO_HISTORICO = Path('Instrumentos/Codigos/historicoRepositorios.csv')
+
+NA_VALUES = ['', ' ', 'NA', 'N/A']
+COLUNAS_PORCENTAGEM = ['Cobertura Linha (%)', 'Cobertura Método (%)', 'Mutation Score']
+COLUNAS_NUMERICAS = [
+    'Estrelas', 'Killed', 'Survived', 'Timeout', 'Total Mutants', 'Mutants Compile Error',
+    'Mutants No Coverage', 'Mutants Ignored', 'Mutants Tested'
+]
+# Métricas de histórico calculadas localmente (historicoRepositorios.py)
+COLUNAS_HISTORICO = [
+    'Idade Primeiro Commit (anos)', 'Dias Desde Último Commit', 'Commits', 'Contribuidores', 'Churn Teste',
+    'Churn Produção', 'Churn Teste (%)', 'LOC Teste', 'LOC Produção', 'Razão LOC Teste/Código'
+]
+
+# Incrementar sempre que o tratamento dos dados mudar, para invalidar os snapshots antigos
+VERSAO_ESQUEMA = 3
+DIRETORIO_CACHE = '.cache_dados'
+
+def converter_porcentagem(serie):
+    """Converte uma coluna de porcentagens para float.
+
+    Mantém a regra histórica dos scripts de análise: textos (ex.: '73.11%') são divididos
+    por 100, enquanto valores que o pandas já leu como números são mantidos como estão.
+    """
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+
+    texto = serie.astype('string').str.strip()
+    texto = texto.mask(texto.str.upper().isin(['', 'NAN', 'N/A']))
+    valores = pd.to_numeric(texto.str.replace('%', '', regex=False).str.strip(), errors='coerce')
+    return (valores / 100).astype(float)
+
+def converter_duracao(serie):
+    """Converte durações no formato do Stryker ('01:14:29.8168552') para segundos."""
+    return pd.to_timedelta(serie, errors='coerce').dt.total_seconds()
+
+def normalizar_arquitetura(serie):
+    return serie.astype(str).str.strip().str.upper()
+
+def _ler_csv(caminho):
+    return pd.read_csv(caminho, keep_default_na=True, na_values=NA_VALUES)
+
+def tratar_resultados(df):
+    """Aplica a tipagem padrão a um DataFrame de resultados (repositoriosTestados*.csv).
+
+    'Amostrado' marca as linhas do Stryker por amostragem (coluna 'Amostragem' preenchida): nelas a pontuação
+    e as contagens são estimativas para a solução inteira, não execuções completas. Análises que só devem usar
+    execuções completas filtram com df[~df['Amostrado']]. Em ambas, 'Mutants Tested' é o total de mutantes que o
+    Stryker pula (CompileError + Ignored + NoCoverage), apesar do nome.
+    """
+    df = df.copy()
+    df['Arquitetura'] = normalizar_arquitetura(df['Arquitetura'])
+    df['Amostrado'] = df['Amostragem'].notna() if 'Amostragem' in df.columns else False
+
+    for coluna in COLUNAS_NUMERICAS:
+        if coluna in df.columns:
+            df[coluna] = pd.to_numeric(df[coluna], errors='coerce')
+    for coluna in COLUNAS_PORCENTAGEM:
+        if coluna in df.columns:
+            df[coluna] = converter_porcentagem(df[coluna])
+
+    if 'Time Elapsed' in df.columns:
+        df['Time Elapsed (s)'] = converter_duracao(df['Time Elapsed'])
+    if 'Mutants Compile Error' in df.columns and 'Total Mutants' in df.columns:
+        df['Mutantes Erro Compilação (%)'] = (df['Mutants Compile Error'] / df['Total Mutants']) * 100
+    return df
+
+def tratar_idade(df_idade):
+    """Aplica a tipagem padrão ao CSV de idades (repositoriosIdade.csv)."""
+    df_idade = df_idade.copy()
+    df_idade['Arquitetura'] = normalizar_arquitetura(df_idade['Arquitetura'])
+    df_idade['Mutation Score'] = converter_porcentagem(df_idade['Mutation Score'])
+    df_idade['Idade (anos)'] = pd.to_numeric(df_idade['Idade (anos)'], errors='coerce')
+    return df_idade
+
+def juntar_idade(df, df_idade):
+    """Adiciona a coluna 'Idade (anos)' aos resultados, casando por (Proprietário, Nome).
+
+    Arquivos de idade antigos não têm a coluna 'Proprietário'; nesse caso a junção é só por 'Nome'.
+    """
+    chaves = ['Proprietário', 'Nome'] if 'Proprietário' in df_idade.columns else ['Nome']
+    idades = df_idade[chaves + ['Idade (anos)']].drop_duplicates(subset=chaves, keep='last')
+    return df.merge(idades, on=chaves, how='left', validate='many_to_one')
+
+def tratar_historico(df_historico):
+    """Tipagem das métricas de histórico; repositórios com erro no cálculo ficam de fora."""
+    df_historico = df_historico[df_historico['Erro'].isna()] if 'Erro' in df_historico.columns else df_historico
+    df_historico = df_historico.copy()
+    for coluna in COLUNAS_HISTORICO:
+        df_historico[coluna] = pd.to_numeric(df_historico[coluna], errors='coerce')
+    return df_historico
+
+def juntar_historico(df, df_historico):
+    """Adiciona as COLUNAS_HISTORICO aos resultados, casando por (Proprietário, Nome)."""
+    historico = df_historico[['Proprietário', 'Nome'] + COLUNAS_HISTORICO].drop_duplicates(
+        subset=['Proprietário', 'Nome'], keep='last')
+    return df.merge(historico, on=['Proprietário', 'Nome'], how='left', validate='many_to_one')
+
+def _assinatura_arquivo(caminho, anterior=None):
+    """Retorna mtime, tamanho e hash do arquivo. O hash só é recalculado se mtime/tamanho mudarem."""
+    info = os.stat(caminho)
+    if anterior and anterior['mtime'] == info.st_mtime_ns and anterior['tamanho'] == info.st_size:
+        return anterior
+
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+            sha.update(bloco)
+    return {'mtime': info.st_mtime_ns, 'tamanho': info.st_size, 'sha256': sha.hexdigest()}
+
+def _caminhos_snapshot(nome, fontes):
+    diretorio = Path(fontes[0]).parent / DIRETORIO_CACHE
+    return diretorio / f'{nome}.parquet', diretorio / f'{nome}.json'
+
+def _carregar_com_cache(nome, fontes, construir, usar_cache):
+    """Lê o snapshot Parquet se as fontes não mudaram; caso contrário reconstrói e salva."""
+    fontes = [Path(f) for f in fontes if f is not None and Path(f).exists()]
+    if not usar_cache or not fontes:
+        return construir()
+
+    caminho_dados, caminho_meta = _caminhos_snapshot(nome, fontes)
+    meta = {}
+    if caminho_meta.exists():
+        with open(caminho_meta, 'r', encoding='utf-8') as arquivo:
+            meta = json.load(arquivo)
+
+    anteriores = meta.get('fontes', {})
+    assinaturas = {str(f.resolve()): _assinatura_arquivo(f, anteriores.get(str(f.resolve()))) for f in fontes}
+    mesmas_fontes = {k: v['sha256'] for k, v in assinaturas.items()} == {k: v['sha256'] for k, v in anteriores.items()}
+
+    if meta.get('versao') == VERSAO_ESQUEMA and mesmas_fontes and caminho_dados.exists():
+        try:
+            df = pd.read_parquet(caminho_dados)
+            if assinaturas != anteriores:
+                # Só o mtime mudou (ex.: checkout); atualiza a assinatura para evitar novo hash
+                _salvar_meta(caminho_meta, assinaturas)
+            return df
+        except ImportError:
+            return construir()
+
+    df = construir()
+    try:
+        caminho_dados.parent.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(caminho_dados, index=False)
+        _salvar_meta(caminho_meta, assinaturas)
+    except ImportError:
+        print("Aviso: pyarrow não instalado; o snapshot em cache não será salvo.")
+    return df
+
+def _salvar_meta(caminho_meta, assinaturas):
+    with open(caminho_meta, 'w', encoding='utf-8') as arquivo:
+        json.dump({'versao': VERSAO_ESQUEMA, 'fontes': assinaturas}, arquivo, indent=2)
+
+def carregar_idade(caminho_idade=CAMINHO_IDADE, usar_cache=True):
+    """Carrega o CSV de idades já tipado."""
+    return _carregar_com_cache(
+        'idade', [caminho_idade], lambda: tratar_idade(_ler_csv(caminho_idade)), usar_cache
+    )
+
+def carregar_resultados(caminho_csv=CAMINHO_RESULTADOS, caminho_idade=CAMINHO_IDADE, usar_cache=True,
+                        caminho_historico=CAMINHO_HISTORICO):
+    """Carrega os resultados tipados, com a idade e as métricas de histórico já unidas quando disponíveis."""
+    caminho_idade = Path(caminho_idade) if caminho_idade is not None else None
+    tem_idade = caminho_idade is not None and caminho_idade.exists()
+    caminho_historico = Path(caminho_historico) if caminho_historico is not None else None
+    tem_historico = caminho_historico is not None and caminho_historico.exists()
+
+    def construir():
+        df = tratar_resultados(_ler_csv(caminho_csv))
+        if tem_idade:
+            df = juntar_idade(df, tratar_idade(_ler_csv(caminho_idade)))
+        else:
+            df['Idade (anos)'] = np.nan
+        if tem_historico and 'Proprietário' in df.columns:
+            df = juntar_historico(df, tratar_historico(_ler_csv(caminho_historico)))
+        else:
+            for coluna in COLUNAS_HISTORICO:
+                df[coluna] = np.nan
+        return df
+
+    nome = f"resultados_{Path(caminho_csv).stem}"
+    fontes = [caminho_csv, caminho_idade if tem_idade else None, caminho_historico if tem_historico else None]
+    return _carregar_com_cache(nome, fontes, construir, usar_cache)
@@ -0,0 +1,426 @@
+import argparse
+import csv
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import nullcontext
+
+from areaTrabalho import ORCAMENTO_MEMORIA_GB, AreaTrabalho
+from arquivoSaidas import CAMPO_ORIGEM, ArquivoSaidas
+from perfilamento import perfilar
+
+# Configurações padrão da fila
+DURACAO_LEASE = 600  # Segundos que um worker pode segurar um repositório sem heartbeat
+MAX_TENTATIVAS = 3  # Quantas vezes um repositório volta para a fila antes de ser marcado como falho
+# Sem atividade do pipeline por tanto tempo (ou passada a duração máxima) o heartbeat para e o lease expira
+LIMITE_INATIVIDADE = 2 * 3600
+DURACAO_MAXIMA_TAREFA = 24 * 3600
+PORTA_PADRAO = 8765
+
+class FilaLeases:
+    """Fila de repositórios persistida em SQLite, distribuída por leases com expiração."""
+
+    def __init__(self, db_path, duracao_lease=DURACAO_LEASE, max_tentativas=MAX_TENTATIVAS):
+        self.db_path = db_path
+        self.duracao_lease = duracao_lease
+        self.max_tentativas = max_tentativas
+        with self._conectar() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tarefas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    chave TEXT UNIQUE NOT NULL,
+                    dados TEXT NOT NULL,
+                    estado TEXT NOT NULL DEFAULT 'pendente',
+                    worker TEXT,
+                    token TEXT,
+                    lease_ate REAL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    resultado TEXT,
+                    atualizado_em REAL
+                )
+            """)
+
+    def _conectar(self):
+        # Cada operação abre sua própria conexão: a mesma fila é usada por vários processos
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def carregar(self, repositorios):
+        """Insere os repositórios na fila, ignorando os que já estão cadastrados."""
+        conn = self._conectar()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            inseridos = 0
+            for repo in repositorios:
+                chave = f"{repo['Proprietário']}/{repo['Nome']}"
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO tarefas (chave, dados, atualizado_em) VALUES (?, ?, ?)",
+                    (chave, json.dumps(repo, ensure_ascii=False), time.time())
+                )
+                inseridos += cursor.rowcount
+            conn.execute("COMMIT")
+            return inseridos
+        finally:
+            conn.close()
+
+    def _expirar(self, conn, agora):
+        """Devolve para a fila os leases vencidos (worker morto ou travado)."""
+        conn.execute(
+            "UPDATE tarefas SET estado = 'falhou', worker = NULL, token = NULL, atualizado_em = ? "
+            "WHERE estado = 'em_execucao' AND lease_ate < ? AND tentativas >= ?",
+            (agora, agora, self.max_tentativas)
+        )
+        conn.execute(
+            "UPDATE tarefas SET estado = 'pendente', worker = NULL, token = NULL, atualizado_em = ? "
+            "WHERE estado = 'em_execucao' AND lease_ate < ?",
+            (agora, agora)
+        )
+
+    def adquirir(self, worker):
+        """Entrega o próximo repositório pendente ao worker. Retorna (id, token, repo) ou None."""
+        conn = self._conectar()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            agora = time.time()
+            self._expirar(conn, agora)
+            linha = conn.execute(
+                "SELECT id, dados FROM tarefas WHERE estado = 'pendente' ORDER BY id LIMIT 1"
+            ).fetchone()
+            if linha is None:
+                conn.execute("COMMIT")
+                return None
+            tarefa_id, dados = linha
+            token = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE tarefas SET estado = 'em_execucao', worker = ?, token = ?, lease_ate = ?, "
+                "tentativas = tentativas + 1, atualizado_em = ? WHERE id = ?",
+                (worker, token, agora + self.duracao_lease, agora, tarefa_id)
+            )
+            conn.execute("COMMIT")
+            return tarefa_id, token, json.loads(dados)
+        finally:
+            conn.close()
+
+    def renovar(self, tarefa_id, token):
+        """Heartbeat: estende o lease. Retorna False se o lease foi perdido."""
+        conn = self._conectar()
+        try:
+            agora = time.time()
+            cursor = conn.execute(
+                "UPDATE tarefas SET lease_ate = ?, atualizado_em = ? "
+                "WHERE id = ? AND token = ? AND estado = 'em_execucao'",
+                (agora + self.duracao_lease, agora, tarefa_id, token)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def concluir(self, tarefa_id, token, linhas):
+        """Grava as linhas de resultado. Resultados de leases já expirados são descartados."""
+        conn = self._conectar()
+        try:
+            cursor = conn.execute(
+                "UPDATE tarefas SET estado = 'concluida', resultado = ?, token = NULL, atualizado_em = ? "
+                "WHERE id = ? AND token = ? AND estado = 'em_execucao'",
+                (json.dumps(linhas, ensure_ascii=False), time.time(), tarefa_id, token)
+            )
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def config(self):
+        """Parâmetros da fila que os workers precisam seguir (o heartbeat depende da duração do lease)."""
+        return {"duracao_lease": self.duracao_lease, "max_tentativas": self.max_tentativas}
+
+    def resumo(self):
+        """Retorna a contagem de tarefas por estado."""
+        conn = self._conectar()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._expirar(conn, time.time())
+            conn.execute("COMMIT")
+            return dict(conn.execute("SELECT estado, COUNT(*) FROM tarefas GROUP BY estado").fetchall())
+        finally:
+            conn.close()
+
+    def resultados(self):
+        """Retorna todas as linhas de resultado das tarefas concluídas, na ordem do CSV de entrada."""
+        conn = self._conectar()
+        try:
+            linhas = []
+            for (resultado,) in conn.execute(
+                "SELECT resultado FROM tarefas WHERE estado = 'concluida' ORDER BY id"
+            ):
+                linhas.extend(json.loads(resultado))
+            return linhas
+        finally:
+            conn.close()
+
+class _ManipuladorFila(socketserver.StreamRequestHandler):
+    """Protocolo JSON por linha: {"op": ..., "args": [...]} -> {"ok": ..., "valor": ...}."""
+
+    OPERACOES = {"adquirir", "renovar", "concluir", "resumo", "config"}
+
+    def handle(self):
+        for linha in self.rfile:
+            try:
+                pedido = json.loads(linha)
+                if pedido["op"] not in self.OPERACOES:
+                    raise ValueError(f"Operação desconhecida: {pedido['op']}")
+                valor = getattr(self.server.fila, pedido["op"])(*pedido.get("args", []))
+                resposta = {"ok": True, "valor": valor}
+            except Exception as e:
+                resposta = {"ok": False, "erro": str(e)}
+            self.wfile.write((json.dumps(resposta, ensure_ascii=False) + "\n").encode("utf-8"))
+
+class ServidorFila(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, endereco, fila):
+        super().__init__(endereco, _ManipuladorFila)
+        self.fila = fila
+
+class ClienteFila:
+    """Acessa uma FilaLeases remota pela rede, com a mesma interface da fila local."""
+
+    def __init__(self, host, porta, timeout=60):
+        self.endereco = (host, porta)
+        self.timeout = timeout
+
+    def _chamar(self, op, *args):
+        with socket.create_connection(self.endereco, timeout=self.timeout) as sock:
+            sock.sendall((json.dumps({"op": op, "args": list(args)}, ensure_ascii=False) + "\n").encode("utf-8"))
+            resposta = json.loads(sock.makefile("r", encoding="utf-8").readline())
+        if not resposta["ok"]:
+            raise RuntimeError(resposta["erro"])
+        return resposta["valor"]
+
+    def adquirir(self, worker):
+        return self._chamar("adquirir", worker)
+
+    def renovar(self, tarefa_id, token):
+        return self._chamar("renovar", tarefa_id, token)
+
+    def concluir(self, tarefa_id, token, linhas):
+        return self._chamar("concluir", tarefa_id, token, linhas)
+
+    def config(self):
+        return self._chamar("config")
+
+    def resumo(self):
+        return self._chamar("resumo")
+
+def _heartbeat(fila, tarefa_id, token, intervalo, parar, atividade=None,
+               limite_inatividade=LIMITE_INATIVIDADE, duracao_maxima=DURACAO_MAXIMA_TAREFA):
+    """Renova o lease periodicamente até o processamento terminar, enquanto ele avança.
+
+    `atividade` devolve o momento da última saída do pipeline; parada há mais de `limite_inatividade`, ou com a
+    tarefa além de `duracao_maxima`, a renovação cessa e o repositório volta à fila quando o lease expira.
+    """
+    inicio = time.time()
+    while not parar.wait(intervalo):
+        agora = time.time()
+        ultima = max(inicio, atividade()) if atividade else agora
+        if agora - ultima > limite_inatividade or agora - inicio > duracao_maxima:
+            print(f"Tarefa {tarefa_id} sem progresso há {agora - ultima:.0f}s (em execução há {agora - inicio:.0f}s); "
+                  f"o lease não será mais renovado.")
+            return
+        try:
+            if not fila.renovar(tarefa_id, token):
+                print(f"Lease da tarefa {tarefa_id} perdido; o resultado será descartado.")
+                return
+        except Exception as e:
+            print(f"Erro ao renovar lease da tarefa {tarefa_id}: {e}")
+
+def _com_origem(linha, arquivo):
+    """Marca a linha com a origem das etapas arquivadas, para que `exportar_resultados` indexe o resultado."""
+    if arquivo:
+        linha[CAMPO_ORIGEM] = arquivo.origem()
+    return linha
+
+def processar_mutacao(repo, base_dir, area_trabalho=None):
+    """Executa o pipeline de mutação (mutationTestRunnerV2) para um repositório."""
+    import mutationTestRunnerV2
+    if repo["Nome"] in mutationTestRunnerV2.REPOSITORIOS_PARA_IGNORAR:
+        print(f"Pulando repositório {repo['Nome']}...")
+        return []
+    mutationTestRunnerV2.AREA_TRABALHO = area_trabalho
+    return [_com_origem(mutationTestRunnerV2.process_repository(repo, base_dir), mutationTestRunnerV2.ARQUIVO_SAIDAS)]
+
+def processar_cobertura(repo, base_dir, area_trabalho=None):
+    """Executa o pipeline de cobertura (coverletRunner) para um repositório."""
+    from pathlib import Path
+    import coverletRunner
+    from cacheBuild import CacheBuild
+    coverletRunner.base_dir = Path(base_dir).resolve()
+    coverletRunner.clone_dir = coverletRunner.base_dir / 'repositorios_clonados'
+    coverletRunner.build_cache = CacheBuild(coverletRunner.base_dir / '.cache_build')
+    coverletRunner.work_area = area_trabalho
+    arquivo = coverletRunner.base_dir / 'arquivo_saidas'
+    if coverletRunner.output_archive and coverletRunner.output_archive.diretorio != arquivo:
+        coverletRunner.output_archive = ArquivoSaidas(arquivo, ferramenta="coverlet")
+    return [_com_origem(coverletRunner.process_repository(repo.copy()), coverletRunner.output_archive)]
+
+PIPELINES = {
+    "mutacao": processar_mutacao,
+    "cobertura": processar_cobertura,
+}
+
+def _atividade_mutacao():
+    import mutationTestRunnerV2
+    return mutationTestRunnerV2.PROGRESSO.ultima_atividade
+
+# Pipelines que informam a última atividade; nos demais só vale a duração máxima da tarefa
+ATIVIDADE = {
+    "mutacao": _atividade_mutacao,
+}
+
+def executar_worker(fila, pipeline, base_dir, intervalo_heartbeat=None, worker=None, memoria_gb=None,
+                    limite_inatividade=LIMITE_INATIVIDADE, duracao_maxima=DURACAO_MAXIMA_TAREFA):
+    """Consome repositórios da fila até que ela esvazie. Retorna quantas tarefas foram concluídas.
+
+    Sem pendentes, o worker continua consultando a fila enquanto houver tarefas em execução em outros workers:
+    se uma delas tiver o lease expirado (worker morto ou travado), ela volta para a fila e é assumida aqui.
+
+    Sem `intervalo_heartbeat`, usa um terço da duração do lease informada pela fila (a do servidor, se remota).
+    Com `memoria_gb`, os clones que cabem no orçamento vão para um diretório em tmpfs exclusivo deste worker.
+    """
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    intervalo_heartbeat = intervalo_heartbeat or fila.config()["duracao_lease"] / 3
+    processar = PIPELINES[pipeline]
+    os.makedirs(base_dir, exist_ok=True)
+    concluidas = 0
+
+    with AreaTrabalho(orcamento_gb=memoria_gb) if memoria_gb else nullcontext() as area_trabalho:
+        while True:
+            tarefa = fila.adquirir(worker)
+            if tarefa is None:
+                estados = fila.resumo()
+                if not estados.get("pendente") and not estados.get("em_execucao"):
+                    print(f"[{worker}] Nenhum repositório pendente. Encerrando.")
+                    return concluidas
+                time.sleep(intervalo_heartbeat)
+                continue
+
+            tarefa_id, token, repo = tarefa
+            print(f"[{worker}] Processando {repo['Proprietário']}/{repo['Nome']} (tarefa {tarefa_id})...")
+
+            parar = threading.Event()
+            batimento = threading.Thread(target=_heartbeat, args=(fila, tarefa_id, token, intervalo_heartbeat, parar,
+                                                                  ATIVIDADE.get(pipeline), limite_inatividade,
+                                                                  duracao_maxima), daemon=True)
+            batimento.start()
+            try:
+                linhas = processar(repo, base_dir, area_trabalho)
+            except Exception as e:
+                repo["Erro"] = f"Erro inesperado no worker {worker}: {e}"
+                linhas = [repo]
+            finally:
+                parar.set()
+                batimento.join()
+
+            if fila.concluir(tarefa_id, token, linhas):
+                concluidas += 1
+            else:
+                print(f"[{worker}] Tarefa {tarefa_id} já tinha sido devolvida à fila; resultado descartado.")
+
+def exportar_resultados(fila, csv_path):
+    """Grava os resultados concluídos em um CSV, com as colunas na ordem em que aparecem.
+
+    Cada linha também entra no índice do arquivo de saídas do worker que a produziu, para reprocessarSaidas.
+    """
+    linhas = fila.resultados()
+    origens = [linha.pop(CAMPO_ORIGEM, None) for linha in linhas]
+    fieldnames = []
+    for linha in linhas:
+        fieldnames.extend(campo for campo in linha if campo not in fieldnames)
+
+    with open(csv_path, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(linhas)
+
+    arquivos = {}
+    for linha, origem in zip(linhas, origens):
+        if origem:
+            chave = (origem['diretorio'], origem['ferramenta'])
+            arquivo = arquivos.setdefault(chave, ArquivoSaidas(*chave))
+            arquivo.resultado(linha['Nome'], linha, csv_path, sessao=origem['sessao'])
+    return len(linhas)
+
+def _abrir_fila(args):
+    if args.host:
+        return ClienteFila(args.host, args.porta)
+    return FilaLeases(args.db, args.duracao_lease)
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribui repositórios entre workers por meio de leases.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_carregar = sub.add_parser("carregar", help="Carrega um CSV de repositórios na fila")
+    p_carregar.add_argument("csv")
+    p_carregar.add_argument("--db", default="fila.db")
+
+    p_servidor = sub.add_parser("servidor", help="Publica a fila via TCP para workers em outras máquinas")
+    p_servidor.add_argument("--db", default="fila.db")
+    p_servidor.add_argument("--bind", default="0.0.0.0")
+    p_servidor.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    p_servidor.add_argument("--duracao-lease", type=float, default=DURACAO_LEASE)
+
+    p_worker = sub.add_parser("worker", help="Consome repositórios da fila")
+    p_worker.add_argument("--pipeline", choices=sorted(PIPELINES), default="mutacao")
+    p_worker.add_argument("--base-dir", default="Instrumentos/Codigos/repositoriosClonados")
+    p_worker.add_argument("--db", default="fila.db", help="Fila local (arquivo SQLite compartilhado)")
+    p_worker.add_argument("--host", help="Endereço do servidor da fila (ignora --db)")
+    p_worker.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    p_worker.add_argument("--duracao-lease", type=float, default=DURACAO_LEASE, help="Só para a fila local (--db)")
+    p_worker.add_argument("--memoria-gb", type=float, nargs="?", const=ORCAMENTO_MEMORIA_GB,
+                          help="Clona em tmpfs os repositórios que cabem neste orçamento")
+    p_worker.add_argument("--limite-inatividade", type=float, default=LIMITE_INATIVIDADE,
+                          help="Segundos sem saída do pipeline após os quais o lease deixa de ser renovado")
+    p_worker.add_argument("--duracao-maxima", type=float, default=DURACAO_MAXIMA_TAREFA,
+                          help="Segundos por repositório após os quais o lease deixa de ser renovado")
+
+    p_status = sub.add_parser("status", help="Mostra o andamento da fila")
+    p_status.add_argument("--db", default="fila.db")
+    p_status.add_argument("--host")
+    p_status.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    p_status.add_argument("--duracao-lease", type=float, default=DURACAO_LEASE)
+
+    p_exportar = sub.add_parser("exportar", help="Grava os resultados concluídos em CSV")
+    p_exportar.add_argument("saida")
+    p_exportar.add_argument("--db", default="fila.db")
+
+    args = parser.parse_args()
+
+    if args.comando == "carregar":
+        with open(args.csv, mode='r', encoding='utf-8') as file:
+            repositorios = list(csv.DictReader(file))
+        inseridos = FilaLeases(args.db).carregar(repositorios)
+        print(f"{inseridos} repositórios adicionados à fila ({len(repositorios)} no CSV).")
+    elif args.comando == "servidor":
+        fila = FilaLeases(args.db, args.duracao_lease)
+        with ServidorFila((args.bind, args.porta), fila) as servidor:
+            print(f"Fila {args.db} disponível em {args.bind}:{args.porta}")
+            servidor.serve_forever()
+    elif args.comando == "worker":
+        # O intervalo de heartbeat vem da fila: com --host vale a duração do lease do servidor, não a local
+        concluidas = executar_worker(_abrir_fila(args), args.pipeline, args.base_dir,
+                                     memoria_gb=args.memoria_gb, limite_inatividade=args.limite_inatividade,
+                                     duracao_maxima=args.duracao_maxima)
+        print(f"Tarefas concluídas por este worker: {concluidas}")
+    elif args.comando == "status":
+        print(_abrir_fila(args).resumo())
+    elif args.comando == "exportar":
+        total = exportar_resultados(FilaLeases(args.db), args.saida)
+        print(f"{total} linhas salvas em {args.saida}")
+
+if __name__ == "__main__":
+    perfilar(main)()
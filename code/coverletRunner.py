@@ -3,17 +3,33 @@ import os
 import subprocess
 import re
 import shutil
+import time
 from pathlib import Path
 
+from arquivoSaidas import ArquivoSaidas, arquivos_modificados
+from cacheBuild import CacheBuild
+from perfilamento import perfilar
+from preparacaoAntecipada import LIMITE_DISCO_GB, PreparacaoAntecipada
+
 # Configurações - caminhos absolutos
 base_dir = Path('C:/Users/')
 csv_input_path = base_dir / 'repositoriosTestados.csv'
 csv_output_path = base_dir / 'repositoriosTestadosCoverlet.csv'
 clone_dir = base_dir / 'repositorios_clonados'
+build_cache = CacheBuild(base_dir / '.cache_build')  # bin/obj por commit e SDK (None desativa)
+prefetch_depth = 0  # Repositórios clonados e restaurados à frente enquanto o atual roda os testes (0 desativa)
+prefetch_disk_gb = LIMITE_DISCO_GB  # Espaço máximo dos repositórios preparados à frente
+work_area = None  # areaTrabalho.AreaTrabalho(): clones que cabem no orçamento de memória vão para tmpfs (None mantém em clone_dir)
+output_archive = ArquivoSaidas(base_dir / 'arquivo_saidas', ferramenta="coverlet")  # Saídas para reprocessarSaidas (None desativa)
 
 # Versões do .NET a serem verificadas
 DOTNET_VERSIONS = ['net9.0', 'net8.0', 'net6.0']
 
+def archive_output(repo_name, stage, result, **options):
+    """Guarda stdout/stderr da etapa em output_archive (se ativo)"""
+    if output_archive and repo_name:
+        output_archive.registrar(repo_name, stage, result.returncode, stdout=result.stdout, stderr=result.stderr, **options)
+
 def print_header(message):
     print("\n" + "="*80)
     print(f" {message.center(78)} ")
@@ -30,17 +46,22 @@ def clean_repo_directory(repo_path):
         print(f"ERRO ao limpar diretório do repositório: {e}")
         return False
 
-def clone_repo(repo_url, repo_name):
+def repo_directory(row):
+    """Diretório do clone: em memória se work_area o aceitar, senão clone_dir/Nome"""
+    memory_path = work_area.reservar(row['Nome'], row.get('Tamanho (KB)')) if work_area else None
+    return Path(memory_path) if memory_path else clone_dir / row['Nome']
+
+def clone_repo(repo_url, repo_name, repo_path=None):
     print_header(f"CLONANDO REPOSITÓRIO: {repo_url}")
     try:
-        repo_path = clone_dir / repo_name
+        repo_path = repo_path or clone_dir / repo_name
         
         # Limpa apenas o repositório específico
         if not clean_repo_directory(repo_path):
             return False
             
         # Garante que o diretório pai existe
-        clone_dir.mkdir(parents=True, exist_ok=True)
+        repo_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Clona o repositório
         result = subprocess.run(
@@ -48,6 +69,7 @@ def clone_repo(repo_url, repo_name):
             capture_output=True,
             text=True
         )
+        archive_output(repo_name, "clone", result)
         
         if result.returncode == 0:
             print("Clone realizado com sucesso!")
@@ -60,20 +82,55 @@ def clone_repo(repo_url, repo_name):
         print(f"Erro inesperado ao clonar: {e}")
         return False
 
-def find_dll_in_output(output):
-    """Tenta encontrar o caminho do .dll na saída do dotnet test"""
-    patterns = [
-        r'Execução de teste para (.+\.Tests?\.dll)',
-        r'Test execution for (.+\.Tests?\.dll)',
-        r'Test results for: (.+\.Tests?\.dll)'
-    ]
-    
-    for pattern in patterns:
+def restore_dependencies(test_dir, repo_name=None):
+    """Executa o dotnet restore; uma falha não interrompe, pois o dotnet test restaura de novo e reporta o erro"""
+    print_header(f"RESTAURANDO DEPENDÊNCIAS EM: {test_dir}")
+    try:
+        result = subprocess.run(['dotnet', 'restore'], cwd=test_dir, capture_output=True, text=True)
+        archive_output(repo_name, "restore", result)
+        if result.returncode != 0:
+            print(f"Aviso: dotnet restore falhou:\n{result.stdout}{result.stderr}")
+        return result.returncode == 0
+    except Exception as e:
+        print(f"Erro inesperado no dotnet restore: {e}")
+        return False
+
+# Padrões da saída do dotnet test (pt-BR e inglês) que indicam o .dll de testes
+DLL_PATTERNS = [
+    r'Execução de teste para (.+\.Tests?\.dll)',
+    r'Test execution for (.+\.Tests?\.dll)',
+    r'Test results for: (.+\.Tests?\.dll)'
+]
+DLL_NAME_PATTERN = r'(\S+\.Tests?\.dll)'
+COVERAGE_TOTAL_PATTERN = r'\|\s*Total\s*\|\s*([\d\.]+)%\s*\|\s*[\d\.]+%\s*\|\s*([\d\.]+)%\s*\|'
+
+def extract_dll_candidates(output):
+    """Retorna, na ordem dos padrões, os caminhos de .dll citados na saída do dotnet test"""
+    candidates = []
+    for pattern in DLL_PATTERNS:
         match = re.search(pattern, output)
         if match:
-            dll_path = Path(match.group(1))
-            if dll_path.exists():
-                return dll_path
+            candidates.append(match.group(1))
+    return candidates
+
+def extract_dll_name(output):
+    """Retorna o primeiro nome de .dll de testes que aparece na saída, se houver"""
+    match = re.search(DLL_NAME_PATTERN, output)
+    return match.group(1) if match else None
+
+def extract_coverage(output):
+    """Extrai (cobertura de linhas, cobertura de métodos) da linha Total da tabela do Coverlet"""
+    match = re.search(COVERAGE_TOTAL_PATTERN, output)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    return None, None
+
+def find_dll_in_output(output):
+    """Tenta encontrar o caminho do .dll na saída do dotnet test"""
+    for candidate in extract_dll_candidates(output):
+        dll_path = Path(candidate)
+        if dll_path.exists():
+            return dll_path
     return None
 
 def find_dll_in_directory(repo_path, dll_name=None):
@@ -103,7 +160,7 @@ def find_dll_in_directory(repo_path, dll_name=None):
     
     return None
 
-def run_dotnet_test(test_dir):
+def run_dotnet_test(test_dir, repo_name=None):
     print_header(f"EXECUTANDO DOTNET TEST EM: {test_dir}")
     try:
         if not test_dir.exists():
@@ -117,14 +174,14 @@ def run_dotnet_test(test_dir):
             print("ERRO: Nenhum arquivo .sln ou .csproj encontrado!")
             return None
             
-        original_dir = Path.cwd()
-        os.chdir(test_dir)
-        
+        # cwd em vez de os.chdir: a thread de preparação antecipada usa caminhos relativos ao diretório do processo
         result = subprocess.run(
             ['dotnet', 'test'],
+            cwd=test_dir,
             capture_output=True,
             text=True
         )
+        archive_output(repo_name, "dotnet_test", result)
 
         print("Saída do dotnet test:")
         print(result.stdout)
@@ -132,36 +189,30 @@ def run_dotnet_test(test_dir):
         dll_path = find_dll_in_output(result.stdout)
         if dll_path:
             print(f"Arquivo de testes encontrado (saída): {dll_path}")
-            os.chdir(original_dir)
             return dll_path
         
-        match = re.search(r'(\S+\.Tests?\.dll)', result.stdout)
-        if match:
-            dll_name = match.group(1)
+        dll_name = extract_dll_name(result.stdout)
+        if dll_name:
             print(f"Procurando arquivo: {dll_name}")
             dll_path = find_dll_in_directory(test_dir, dll_name)
             if dll_path:
                 print(f"Arquivo de testes encontrado (busca): {dll_path}")
-                os.chdir(original_dir)
                 return dll_path
         
         print("Procurando qualquer arquivo .Tests.dll...")
         dll_path = find_dll_in_directory(test_dir)
         if dll_path:
             print(f"Arquivo de testes encontrado (genérico): {dll_path}")
-            os.chdir(original_dir)
             return dll_path
         
         print("Nenhum arquivo de testes .dll encontrado.")
-        os.chdir(original_dir)
         return None
         
     except Exception as e:
         print(f"Erro ao executar dotnet test: {e}")
-        os.chdir(original_dir)
         return None
 
-def run_coverlet(dll_path):
+def run_coverlet(dll_path, repo_name=None):
     print_header(f"EXECUTANDO COVERLET EM: {dll_path}")
     try:
         if not dll_path.exists():
@@ -175,24 +226,22 @@ def run_coverlet(dll_path):
                 break
             project_dir = project_dir.parent
         
-        original_dir = Path.cwd()
-        os.chdir(project_dir)
-        
+        start = time.time()
         result = subprocess.run(
-            ['coverlet', str(dll_path), '--target', 'dotnet', '--targetargs', f'test "{project_dir}" --no-build'],
+            ['coverlet', str(dll_path.resolve()), '--target', 'dotnet', '--targetargs', f'test "{project_dir.resolve()}" --no-build'],
+            cwd=project_dir,
             capture_output=True,
             text=True
         )
         
-        os.chdir(original_dir)
+        reports = [path for path in arquivos_modificados(project_dir, start) if path.name.startswith('coverage.')]
+        archive_output(repo_name, "coverlet", result, segundos=round(time.time() - start, 2), relatorios=reports, raiz=project_dir)
         
         print("Saída do Coverlet:")
         print(result.stdout)
         
-        match = re.search(r'\|\s*Total\s*\|\s*([\d\.]+)%\s*\|\s*[\d\.]+%\s*\|\s*([\d\.]+)%\s*\|', result.stdout)
-        if match:
-            line_cov = float(match.group(1))
-            method_cov = float(match.group(2))
+        line_cov, method_cov = extract_coverage(result.stdout)
+        if line_cov is not None:
             print(f"Cobertura encontrada - Linhas: {line_cov}%, Métodos: {method_cov}%")
             return line_cov, method_cov
         
@@ -204,6 +253,14 @@ def run_coverlet(dll_path):
         return None, None
 
 def process_repository(row):
+    row, context = prepare_repository(row)
+    row = execute_repository(row, context) if context else row
+    if work_area:
+        work_area.liberar(row['Nome'])
+    return row
+
+def prepare_repository(row):
+    """Clone, cache de build e restore (rede e disco). Retorna (row, contexto), com contexto None se falhou"""
     repo_url = f"https://github.com/{row['Proprietário']}/{row['Nome']}.git"
     repo_name = row['Nome']
     
@@ -215,16 +272,33 @@ def process_repository(row):
         "Diretório Testado": "N/A"
     })
     
-    if not clone_repo(repo_url, repo_name):
+    repo_path = repo_directory(row)
+    if not clone_repo(repo_url, repo_name, repo_path):
         row["Status"] = "Erro ao clonar"
-        return row
+        return row, None
     
-    repo_path = clone_dir / repo_name
     sln_dir = row.get('Diretório SLN', '').strip()
     test_dir = repo_path / sln_dir if sln_dir else repo_path
-    row["Diretório Testado"] = str(test_dir.relative_to(base_dir))  # Mostra caminho relativo
-    
-    dll_path = run_dotnet_test(test_dir)
+    # Mostra caminho relativo (o mesmo se o clone estiver em memória)
+    row["Diretório Testado"] = str((clone_dir / repo_name / sln_dir).relative_to(base_dir))
+
+    # Com bin/obj deste commit em cache, o dotnet test faz só o build incremental
+    cache_key, cache_metadata = build_cache.chave(row, repo_path, test_dir) if build_cache and test_dir.exists() else (None, None)
+    cache_hit = cache_key is not None and build_cache.restaurar(cache_key, repo_path)
+    if not cache_hit and test_dir.exists():
+        restore_dependencies(test_dir, repo_name)
+
+    return row, {"repo_path": repo_path, "test_dir": test_dir, "cache_key": cache_key,
+                 "cache_metadata": cache_metadata, "cache_hit": cache_hit}
+
+def execute_repository(row, context):
+    """dotnet test e Coverlet (CPU) de um repositório já preparado"""
+    repo_path, test_dir = context["repo_path"], context["test_dir"]
+    cache_key, cache_metadata, cache_hit = context["cache_key"], context["cache_metadata"], context["cache_hit"]
+
+    dll_path = run_dotnet_test(test_dir, row['Nome'])
+    if dll_path and cache_key and not cache_hit:
+        build_cache.salvar(cache_key, repo_path, cache_metadata)
     
     if not dll_path:
         row.update({
@@ -234,7 +308,7 @@ def process_repository(row):
         })
         return row
     
-    line_cov, method_cov = run_coverlet(dll_path)
+    line_cov, method_cov = run_coverlet(dll_path, row['Nome'])
     
     if line_cov is not None and method_cov is not None:
         row.update({
@@ -271,20 +345,33 @@ def main():
         return
     
     processed_rows = []
-    
-    for i, row in enumerate(rows, 1):
-        print_header(f"PROCESSANDO REPOSITÓRIO {i}/{len(rows)}: {row['Nome']}")
-        processed_row = process_repository(row.copy())
-        processed_rows.append(processed_row)
-        
-        with open(csv_output_path, 'w', newline='', encoding='utf-8') as csv_file:
-            fieldnames = list(rows[0].keys()) + ["Cobertura Linha (%)", "Cobertura Método (%)", "Status", "Diretório Testado"]
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(processed_rows)
+    fieldnames = list(rows[0].keys()) + ["Cobertura Linha (%)", "Cobertura Método (%)", "Status", "Diretório Testado"]
+
+    # Com prefetch_depth > 0 os próximos repositórios são clonados e restaurados enquanto o atual é testado
+    prefetch = PreparacaoAntecipada([row.copy() for row in rows], prepare_repository, prefetch_depth, prefetch_disk_gb,
+                                    caminho=repo_directory)
+    try:
+        with prefetch:
+            for i, (row, (processed_row, context)) in enumerate(prefetch, 1):
+                print_header(f"PROCESSANDO REPOSITÓRIO {i}/{len(rows)}: {row['Nome']}")
+                if context:
+                    processed_row = execute_repository(processed_row, context)
+                if work_area:
+                    work_area.liberar(row['Nome'])  # Clones em memória não ficam para depois, ao contrário dos em disco
+                processed_rows.append(processed_row)
+
+                with open(csv_output_path, 'w', newline='', encoding='utf-8') as csv_file:
+                    writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
+                    writer.writeheader()
+                    writer.writerows(processed_rows)
+                if output_archive:
+                    output_archive.resultado(row['Nome'], processed_row, csv_output_path)
+    finally:
+        if work_area:
+            work_area.fechar()
     
     print_header("TESTE CONCLUÍDO")
     print(f"Resultados salvos em: {csv_output_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    perfilar(main)()
\ No newline at end of file
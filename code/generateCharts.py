@@ -1,55 +1,38 @@
-import pandas as pd
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sys
+import matplotlib
+if '--lote' in sys.argv:
+    matplotlib.use('Agg')  # Modo em lote: sem display
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from scipy.stats import linregress
+from carregarDados import carregar_resultados, carregar_idade
+from perfilamento import perfilar
 
 # 1. CONFIGURAÇÃO INICIAL
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 12
 palette = {'MVC': '#1f77b4', 'MVVM': '#ff7f0e'}
-
-# 2. CARREGAR DADOS CORRETAMENTE
 caminho_csv = Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv')
+caminho_csvAge = Path('Instrumentos/Codigos/repositoriosIdade.csv')
+
+# Incrementar para forçar a regeração de todas as figuras no modo em lote
+VERSAO_GRAFICOS = 1
+ARQUIVO_HASHES = '.hashes_graficos.json'
 
-try:
-    df = pd.read_csv(caminho_csv, keep_default_na=True, na_values=['', ' ', 'NA', 'N/A'])
-except Exception as e:
-    print(f"Erro ao ler o arquivo CSV: {e}")
-    exit()
-
-# 3. VERIFICAÇÃO INICIAL
-print("\n=== VERIFICAÇÃO INICIAL ===")
-print("Colunas disponíveis:", df.columns.tolist())
-print("\nValores únicos em 'Arquitetura':", df['Arquitetura'].unique())
-
-df['Arquitetura'] = df['Arquitetura'].astype(str).str.strip().str.upper()
-
-def converter_porcentagem(valor):
-    if pd.isna(valor) or str(valor).strip() in ['', 'NAN', 'N/A']:
-        return np.nan
-    if isinstance(valor, str):
-        return float(valor.replace('%', '').strip()) / 100
-    return float(valor)
-
-df['Cobertura Linha (%)'] = df['Cobertura Linha (%)'].apply(converter_porcentagem)
-df['Mutation Score'] = df['Mutation Score'].apply(converter_porcentagem)
-df['Mutantes Erro Compilação (%)'] = (df['Mutants Compile Error'] / df['Total Mutants']) * 100
-
-# 7. VERIFICAÇÃO FINAL
-print("\n=== DADOS PROCESSADOS ===")
-print(f"Total de projetos válidos: {len(df)}")
-print(f"Projetos MVC: {len(df[df['Arquitetura'] == 'MVC'])}")
-print(f"Projetos MVVM: {len(df[df['Arquitetura'] == 'MVVM'])}")
-
-if len(df) == 0:
-    print("\nERRO: Nenhum dado válido encontrado!")
-    exit()
-
-# 8. INTERVALO INTERQUARTIL (IQR)
-def exibir_iqr(coluna, nome_coluna_exibicao):
+def configurar_estilo():
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.figsize'] = (12, 6)
+    plt.rcParams['font.size'] = 12
+
+# 2. ESTATÍSTICAS
+def exibir_iqr(df, coluna, nome_coluna_exibicao):
     print(f"\n=== IQR de '{nome_coluna_exibicao}' por Arquitetura ===")
     for arquitetura, grupo in df.groupby('Arquitetura'):
         q1 = grupo[coluna].quantile(0.25)
@@ -57,34 +40,19 @@ def exibir_iqr(coluna, nome_coluna_exibicao):
         iqr = q3 - q1
         print(f"{arquitetura}: Q1 = {q1:.3f}, Q3 = {q3:.3f}, IQR = {iqr:.3f}")
 
-exibir_iqr('Mutation Score', 'Mutation Score')
-exibir_iqr('Cobertura Linha (%)', 'Cobertura de Linhas')
-exibir_iqr('Mutantes Erro Compilação (%)', 'Mutantes com Erro de Compilação')
+def exibir_estatisticas(df):
+    exibir_iqr(df, 'Mutation Score', 'Mutation Score')
+    exibir_iqr(df, 'Cobertura Linha (%)', 'Cobertura de Linhas')
+    exibir_iqr(df, 'Mutantes Erro Compilação (%)', 'Mutantes com Erro de Compilação')
 
-# 9. GERAR GRÁFICOS
-try:
     print("\n=== MEDIANAS POR ARQUITETURA ===")
     for coluna in ['Mutation Score', 'Cobertura Linha (%)', 'Mutantes Erro Compilação (%)']:
         print(f"\nMedianas de '{coluna}':")
         medianas = df.groupby('Arquitetura')[coluna].median()
         for arquitetura, mediana in medianas.items():
             print(f"  {arquitetura}: {mediana:.3f}")
-            
-    # Gráfico 1: Mutation Score
-    plt.figure(figsize=(14, 6))
-    sns.boxplot(data=df, x='Arquitetura', y='Mutation Score', palette=palette, hue='Arquitetura', legend=False)
-    plt.title('Mutation Score por Arquitetura')
-    plt.ylabel('Score (0-1)')
-    plt.show()
-
-    # Gráfico 2: Cobertura de Linhas
-    plt.figure(figsize=(14, 6))
-    sns.boxplot(data=df, x='Arquitetura', y='Cobertura Linha (%)', palette=palette, hue='Arquitetura', legend=False)
-    plt.title('Cobertura de Linhas por Arquitetura')
-    plt.ylabel('Cobertura (0-1)')
-    plt.xlabel('Arquitetura')
-    plt.show()
 
+def exibir_regressao_cobertura(df):
     print("\n=== COEFICIENTES DE REGRESSÃO LINEAR ===")
 
     for arquitetura in ['MVC', 'MVVM']:
@@ -104,15 +72,42 @@ try:
             print(f"\nArquitetura: {arquitetura}")
             print("  Não há dados suficientes para calcular a regressão linear.")
 
-    # Gráfico 3: Relação Cobertura vs Mutation Score + Regressão Linear
-    plt.figure(figsize=(14, 6))
+def exibir_regressao_idade(df_idade):
+    print("\n=== GRÁFICO: Idade do Repositório vs Mutation Score ===")
+    df_valido = df_idade.dropna(subset=['Idade (anos)', 'Mutation Score'])
+    for arquitetura in ['MVC', 'MVVM']:
+        grupo = df_valido[df_valido['Arquitetura'] == arquitetura]
+        if len(grupo) >= 3:
+            slope, intercept, r_value, p_value, std_err = linregress(grupo['Idade (anos)'].values, grupo['Mutation Score'].values)
+            print(f"{arquitetura}: r = {r_value:.4f}, p = {p_value:.4f}")
+        else:
+            print(f"Arquitetura {arquitetura}: dados insuficientes para regressão.")
+
+# 3. GRÁFICOS
+def grafico_mutation_score(df):
+    fig = plt.figure(figsize=(14, 6))
+    sns.boxplot(data=df, x='Arquitetura', y='Mutation Score', palette=palette, hue='Arquitetura', legend=False)
+    plt.title('Mutation Score por Arquitetura')
+    plt.ylabel('Score (0-1)')
+    return fig
+
+def grafico_cobertura_linhas(df):
+    fig = plt.figure(figsize=(14, 6))
+    sns.boxplot(data=df, x='Arquitetura', y='Cobertura Linha (%)', palette=palette, hue='Arquitetura', legend=False)
+    plt.title('Cobertura de Linhas por Arquitetura')
+    plt.ylabel('Cobertura (0-1)')
+    plt.xlabel('Arquitetura')
+    return fig
+
+def grafico_cobertura_vs_mutation(df):
+    # Relação Cobertura vs Mutation Score + Regressão Linear
+    fig = plt.figure(figsize=(14, 6))
     arquiteturas = df['Arquitetura'].unique()
-    df_mvc = df[df['Arquitetura'] == 'MVC'].dropna(subset=['Cobertura Linha (%)', 'Mutation Score'])
     for arquitetura in arquiteturas:
         grupo = df[df['Arquitetura'] == arquitetura].dropna(subset=['Cobertura Linha (%)', 'Mutation Score'])
         x = grupo['Cobertura Linha (%)'].values
         y = grupo['Mutation Score'].values
-        
+
         # Scatter individual
         sns.scatterplot(x=x, y=y, color=palette[arquitetura], label=f'{arquitetura} dados', s=100)
 
@@ -128,29 +123,22 @@ try:
     plt.ylabel('Mutation Score (0-1)')
     plt.legend()
     plt.grid(True)
-    plt.show()
+    return fig
 
-    # Gráfico 4: Erro de Compilação
-    plt.figure(figsize=(14, 6))
+def grafico_erro_compilacao(df):
+    fig = plt.figure(figsize=(14, 6))
     sns.boxplot(data=df, x='Arquitetura', y='Mutantes Erro Compilação (%)', palette=palette, hue='Arquitetura', legend=False)
     plt.title('Distribuição da Proporção de Mutantes com Erro de Compilação')
     plt.ylabel('Mutantes com Erro de Compilação (%)')
     plt.xlabel('Arquitetura')
-    plt.ylim(0, 30)  
-    plt.show()
-
-    # Gráfico 5: Idade do Repositório vs Mutation Score
-    print("\n=== GRÁFICO: Idade do Repositório vs Mutation Score ===")
-    caminho_csvAge = Path('Instrumentos/Codigos/repositoriosIdade.csv')
-
-    df_idade = pd.read_csv(caminho_csvAge, keep_default_na=True, na_values=['', ' ', 'NA', 'N/A'])
-    df_idade['Arquitetura'] = df_idade['Arquitetura'].astype(str).str.strip().str.upper()
-    df_idade['Mutation Score'] = df_idade['Mutation Score'].apply(converter_porcentagem)
+    plt.ylim(0, 30)
+    return fig
 
+def grafico_idade_vs_mutation(df_idade):
     df_valido = df_idade.dropna(subset=['Idade (anos)', 'Mutation Score'])
 
-    plt.figure(figsize=(12, 6))
-    
+    fig = plt.figure(figsize=(12, 6))
+
     # Plotar os pontos coloridos por arquitetura
     sns.scatterplot(data=df_valido, x='Idade (anos)', y='Mutation Score', hue='Arquitetura', palette=palette, s=100)
 
@@ -164,17 +152,141 @@ try:
             linha_x = np.linspace(x.min(), x.max(), 100)
             linha_y = slope * linha_x + intercept
             plt.plot(linha_x, linha_y, linestyle='--', label=f'{arquitetura} regressão (r={r_value:.2f})', color=palette[arquitetura])
-            
-            print(f"{arquitetura}: r = {r_value:.4f}, p = {p_value:.4f}")
-        else:
-            print(f"Arquitetura {arquitetura}: dados insuficientes para regressão.")
 
     plt.title('Idade do Repositório vs Mutation Score com Regressão por Arquitetura')
     plt.xlabel('Idade do Repositório (anos)')
     plt.ylabel('Mutation Score (0-1)')
     plt.legend()
     plt.grid(True)
-    plt.show()
+    return fig
+
+# Nome do arquivo -> (função, conjunto de dados, colunas usadas)
+FIGURAS = {
+    'Figure_1_MutationScore': (grafico_mutation_score, 'resultados', ['Arquitetura', 'Mutation Score']),
+    'Figure_1_CoberturaLinha': (grafico_cobertura_linhas, 'resultados', ['Arquitetura', 'Cobertura Linha (%)']),
+    'FigureCoberturaMutationRegression': (grafico_cobertura_vs_mutation, 'resultados', ['Arquitetura', 'Cobertura Linha (%)', 'Mutation Score']),
+    'Figure_1MutantesErro': (grafico_erro_compilacao, 'resultados', ['Arquitetura', 'Mutantes Erro Compilação (%)']),
+    'FigureAgeReposMutation': (grafico_idade_vs_mutation, 'idade', ['Arquitetura', 'Idade (anos)', 'Mutation Score']),
+}
+
+# 4. MODO EM LOTE
+def hash_figura(nome, dados, formatos, dpi):
+    """Hash dos dados de entrada da figura e de tudo que afeta o desenho."""
+    funcao = FIGURAS[nome][0]
+    sha = hashlib.sha256()
+    sha.update(pd.util.hash_pandas_object(dados, index=False).values.tobytes())
+    sha.update(json.dumps({
+        'versao': VERSAO_GRAFICOS,
+        'colunas': list(dados.columns),
+        'formatos': sorted(formatos),
+        'dpi': dpi,
+        'palette': palette,
+        'codigo': inspect.getsource(funcao),
+        'matplotlib': matplotlib.__version__,
+        'seaborn': sns.__version__,
+    }, sort_keys=True).encode('utf-8'))
+    return sha.hexdigest()
+
+def renderizar_figura(nome, dados, saida, formatos, dpi):
+    """Renderiza uma figura em um processo separado e grava os arquivos de saída."""
+    plt.switch_backend('Agg')
+    configurar_estilo()
+    fig = FIGURAS[nome][0](dados)
+    arquivos = []
+    for formato in formatos:
+        arquivo = Path(saida) / f"{nome}.{formato}"
+        fig.savefig(arquivo, format=formato, dpi=dpi, bbox_inches='tight')
+        arquivos.append(str(arquivo))
+    plt.close(fig)
+    return nome, arquivos
+
+def gerar_em_lote(conjuntos, saida, formatos, dpi=150, workers=None, forcar=False):
+    """Gera todas as figuras sem display, pulando as que não mudaram desde a última execução."""
+    saida = Path(saida)
+    saida.mkdir(parents=True, exist_ok=True)
+    caminho_hashes = saida / ARQUIVO_HASHES
+    hashes = json.loads(caminho_hashes.read_text(encoding='utf-8')) if caminho_hashes.exists() else {}
+
+    pendentes = {}
+    for nome, (funcao, conjunto, colunas) in FIGURAS.items():
+        dados = conjuntos[conjunto][colunas].reset_index(drop=True)
+        atual = hash_figura(nome, dados, formatos, dpi)
+        existentes = all((saida / f"{nome}.{formato}").exists() for formato in formatos)
+        if not forcar and existentes and hashes.get(nome) == atual:
+            print(f"Figura sem alterações, pulando: {nome}")
+            continue
+        pendentes[nome] = (dados, atual)
+
+    if not pendentes:
+        return []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futuros = {executor.submit(renderizar_figura, nome, dados, saida, formatos, dpi): nome
+                   for nome, (dados, _) in pendentes.items()}
+        for futuro in futuros:
+            nome = futuros[futuro]
+            try:
+                _, arquivos = futuro.result()
+                hashes[nome] = pendentes[nome][1]
+                print(f"Figura gerada: {', '.join(arquivos)}")
+            except Exception as e:
+                print(f"Erro ao gerar a figura {nome}: {e}")
+
+    caminho_hashes.write_text(json.dumps(hashes, indent=2, sort_keys=True), encoding='utf-8')
+    return list(pendentes)
+
+def main():
+    parser = argparse.ArgumentParser(description="Estatísticas descritivas e gráficos MVC vs MVVM.")
+    parser.add_argument("--lote", action="store_true", help="Gera os arquivos das figuras sem abrir janelas")
+    parser.add_argument("--saida", type=Path, default=Path('images'), help="Diretório das figuras no modo em lote")
+    parser.add_argument("--formatos", nargs="+", default=["png"], choices=["png", "svg", "pdf"])
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--forcar", action="store_true", help="Regera todas as figuras, ignorando o cache")
+    args = parser.parse_args()
+
+    configurar_estilo()
+
+    # CARREGAR DADOS CORRETAMENTE
+    try:
+        df = carregar_resultados(caminho_csv)
+    except Exception as e:
+        print(f"Erro ao ler o arquivo CSV: {e}")
+        exit()
+
+    # VERIFICAÇÃO INICIAL
+    print("\n=== VERIFICAÇÃO INICIAL ===")
+    print("Colunas disponíveis:", df.columns.tolist())
+    print("\nValores únicos em 'Arquitetura':", df['Arquitetura'].unique())
+
+    # VERIFICAÇÃO FINAL
+    print("\n=== DADOS PROCESSADOS ===")
+    print(f"Total de projetos válidos: {len(df)}")
+    print(f"Projetos MVC: {len(df[df['Arquitetura'] == 'MVC'])}")
+    print(f"Projetos MVVM: {len(df[df['Arquitetura'] == 'MVVM'])}")
+
+    if len(df) == 0:
+        print("\nERRO: Nenhum dado válido encontrado!")
+        exit()
+
+    try:
+        df_idade = carregar_idade(caminho_csvAge)
+
+        exibir_estatisticas(df)
+        exibir_regressao_cobertura(df)
+        exibir_regressao_idade(df_idade)
+
+        conjuntos = {'resultados': df, 'idade': df_idade}
+        if args.lote:
+            gerar_em_lote(conjuntos, args.saida, args.formatos, args.dpi, args.workers, args.forcar)
+            return
+
+        for nome, (funcao, conjunto, colunas) in FIGURAS.items():
+            funcao(conjuntos[conjunto])
+            plt.show()
+
+    except Exception as e:
+        print(f"\nErro ao gerar gráficos: {e}")
 
-except Exception as e:
-    print(f"\nErro ao gerar gráficos: {e}")
\ No newline at end of file
+if __name__ == "__main__":
+    perfilar(main)()
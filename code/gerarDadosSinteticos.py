@@ -0,0 +1,130 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from perfilamento import perfilar
+
+# Mesmo esquema de repositoriosTestadosCoverletV2.csv
+COLUNAS = [
+    "Nome", "Proprietário", "Estrelas", "SDK", "Arquitetura", "Diretório SLN",
+    "Killed", "Survived", "Timeout", "Time Elapsed", "Mutation Score",
+    "Total Mutants", "Mutants Compile Error", "Mutants No Coverage", "Mutants Ignored", "Mutants Tested", "Erro",
+    "Cobertura Linha (%)", "Cobertura Método (%)"
+]
+COLUNAS_METRICAS = [
+    "Killed", "Survived", "Timeout", "Time Elapsed", "Mutation Score", "Total Mutants", "Mutants Compile Error",
+    "Mutants No Coverage", "Mutants Ignored", "Mutants Tested", "Cobertura Linha (%)", "Cobertura Método (%)"
+]
+TAMANHO_BLOCO = 100_000
+
+# Trechos de saída reais (dotnet/Stryker) usados para montar os blobs da coluna 'Erro'
+TRECHOS_ERRO = [
+    "Erro ao compilar o projeto: {caminho}/{projeto}.csproj : error NU1101: Unable to find package {pacote}. "
+    "No packages exist with this id in source(s): nuget.org",
+    "Erro ao restaurar dependências: {caminho}/{projeto}.csproj : error NETSDK1045: The current .NET SDK does not "
+    "support targeting .NET {versao}. Either target .NET 8.0 or lower, or use a version of the .NET SDK that supports .NET {versao}.",
+    "Erro ao executar Stryker: [{hora} INF] Analysis starting.\n[{hora} ERR] Stryker.NET failed to mutate your project. "
+    "For more information see the logs.",
+    "{caminho}/{projeto}/Program.cs(12,5): error CS0246: The type or namespace name '{pacote}' could not be found "
+    "(are you missing a using directive or an assembly reference?) [{caminho}/{projeto}.csproj]",
+]
+
+def _formatar_duracao(segundos):
+    horas, resto = np.divmod(segundos, 3600)
+    minutos, resto = np.divmod(resto, 60)
+    return [f"{int(h):02d}:{int(m):02d}:{s:010.7f}" for h, m, s in zip(horas, minutos, resto)]
+
+def _blob_erro(rng, tamanho_kb):
+    """Monta um texto de erro de vários KB com linhas parecidas com as saídas reais."""
+    linhas = []
+    total = 0
+    while total < tamanho_kb * 1024:
+        trecho = TRECHOS_ERRO[rng.integers(len(TRECHOS_ERRO))].format(
+            caminho=f"/repos/r{rng.integers(1_000_000)}", projeto=f"Projeto{rng.integers(50)}",
+            pacote=f"Pacote.{rng.integers(500)}", versao=f"{rng.integers(5, 10)}.0",
+            hora=f"{rng.integers(24):02d}:{rng.integers(60):02d}:{rng.integers(60):02d}")
+        linhas.append(trecho)
+        total += len(trecho) + 1
+    return "\n".join(linhas)
+
+def gerar_bloco(rng, inicio, n, fracao_erro=0.1, fracao_na_cobertura=0.05, tamanho_erro_kb=4):
+    """Gera `n` linhas sintéticas com distribuições parecidas com as observadas no estudo."""
+    total = np.maximum(1, rng.lognormal(7.0, 1.2, n)).astype(int)
+    proporcoes = rng.dirichlet([4, 3, 0.3, 0.6, 3, 1.5], n)  # killed, survived, timeout, compile, nocov, ignored
+    killed, survived, timeout, compile_error, no_coverage, ignored = (np.floor(proporcoes * total[:, None])).T.astype(int)
+    detectados = killed + timeout
+    score = np.round(100 * detectados / np.maximum(1, detectados + survived + no_coverage), 2)
+    segundos = total * rng.gamma(2.0, 1.5, n)
+    cobertura_linha = np.clip(rng.beta(1.2, 1.3, n), 0, 1)
+    cobertura_metodo = np.clip(cobertura_linha + rng.normal(0.03, 0.04, n), 0, 1)
+
+    # Arquitetura com as variações de caixa/espaços que a normalização precisa tratar
+    arquitetura = rng.choice(["MVC", "MVVM", "mvc", " MVVM "], n, p=[0.7, 0.25, 0.03, 0.02])
+
+    df = pd.DataFrame({
+        "Nome": [f"repo{i}" for i in range(inicio, inicio + n)],
+        "Proprietário": [f"owner{i % 9973}" for i in range(inicio, inicio + n)],
+        "Estrelas": (100 + rng.lognormal(5.5, 1.3, n)).astype(int),
+        "SDK": rng.choice(["8.0.x", "6.0.x"], n, p=[0.8, 0.2]),
+        "Arquitetura": arquitetura,
+        "Diretório SLN": rng.choice(["", "src", "Source"], n, p=[0.6, 0.3, 0.1]),
+        "Killed": killed,
+        "Survived": survived,
+        "Timeout": timeout,
+        "Time Elapsed": _formatar_duracao(segundos),
+        "Mutation Score": score,
+        "Total Mutants": total,
+        "Mutants Compile Error": compile_error,
+        "Mutants No Coverage": no_coverage,
+        "Mutants Ignored": ignored,
+        "Mutants Tested": compile_error + ignored + no_coverage,  # Linha "mutants are skipped" do Stryker
+        "Erro": "",
+        "Cobertura Linha (%)": [f"{v * 100:.2f}%" for v in cobertura_linha],
+        "Cobertura Método (%)": [f"{v * 100:.2f}%" for v in cobertura_metodo],
+    }, columns=COLUNAS)
+
+    # Repositórios que falharam: métricas em N/A e um blob de erro grande
+    falhas = rng.random(n) < fracao_erro
+    df[COLUNAS_METRICAS] = df[COLUNAS_METRICAS].astype(object)
+    df.loc[falhas, COLUNAS_METRICAS] = "N/A"
+    df.loc[falhas, "Erro"] = [_blob_erro(rng, tamanho_erro_kb) for _ in range(int(falhas.sum()))]
+
+    # Testes que rodaram mas o Coverlet não encontrou cobertura
+    sem_cobertura = ~falhas & (rng.random(n) < fracao_na_cobertura)
+    df.loc[sem_cobertura, ["Cobertura Linha (%)", "Cobertura Método (%)"]] = "Erro"
+    return df
+
+def gerar_resultados(n, caminho, semente=0, fracao_erro=0.1, tamanho_erro_kb=4, caminho_idade=None):
+    """Grava um CSV sintético com `n` linhas em blocos, sem manter o arquivo inteiro em memória."""
+    rng = np.random.default_rng(semente)
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+
+    for inicio in range(0, n, TAMANHO_BLOCO):
+        bloco = gerar_bloco(rng, inicio, min(TAMANHO_BLOCO, n - inicio), fracao_erro, tamanho_erro_kb=tamanho_erro_kb)
+        bloco.to_csv(caminho, mode='w' if inicio == 0 else 'a', header=inicio == 0, index=False)
+
+        if caminho_idade is not None:
+            idade = bloco[["Nome", "Proprietário", "Arquitetura", "Mutation Score"]].copy()
+            idade["Arquitetura"] = idade["Arquitetura"].str.strip().str.upper()
+            idade["Idade (anos)"] = np.round(rng.uniform(1, 15, len(bloco)), 2)
+            idade.to_csv(caminho_idade, mode='w' if inicio == 0 else 'a', header=inicio == 0, index=False)
+    return caminho
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera CSVs de resultados sintéticos com o esquema do estudo.")
+    parser.add_argument("linhas", type=int)
+    parser.add_argument("saida", type=Path)
+    parser.add_argument("--idade", type=Path, help="Também gera um CSV de idades compatível")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--fracao-erro", type=float, default=0.1)
+    parser.add_argument("--tamanho-erro-kb", type=int, default=4)
+    args = parser.parse_args()
+
+    gerar_resultados(args.linhas, args.saida, args.semente, args.fracao_erro, args.tamanho_erro_kb, args.idade)
+    print(f"{args.linhas} linhas salvas em {args.saida}")
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -3,6 +3,10 @@ import pandas as pd
 import requests
 from datetime import datetime
 from pathlib import Path
+from perfilamento import iniciar
+
+if __name__ == "__main__":
+    iniciar()  # Perfilamento opcional (--perfil ou PERFILAMENTO); importado, não mexe em sys.argv
 
 # Caminho do CSV de entrada
 caminho_csv = Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv')
@@ -24,8 +28,17 @@ except Exception as e:
 # Normalizar a coluna Arquitetura
 df['Arquitetura'] = df['Arquitetura'].astype(str).str.strip().str.upper()
 
+def idade_em_anos(created_at):
+    created_date = datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")
+    idade_dias = (datetime.utcnow() - created_date).days
+    return round(idade_dias / 365.25, 2)
+
 # Função para obter a idade do repositório
-def obter_idade_repositorio(owner, name):
+def obter_idade_repositorio(owner, name, created_at=None):
+    # CSVs gerados com os metadados da busca já trazem createdAt: sem requisição à API
+    if created_at:
+        return idade_em_anos(created_at)
+
     query = """
     query($owner: String!, $name: String!) {
       repository(owner: $owner, name: $name) {
@@ -46,11 +59,7 @@ def obter_idade_repositorio(owner, name):
 
     data = response.json()
     try:
-        created_at = data['data']['repository']['createdAt']
-        created_date = datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%SZ")
-        idade_dias = (datetime.utcnow() - created_date).days
-        idade_anos = round(idade_dias / 365.25, 2)
-        return idade_anos
+        return idade_em_anos(data['data']['repository']['createdAt'])
     except Exception as e:
         print(f"Erro ao processar {owner}/{name}: {e}")
         return None
@@ -64,11 +73,12 @@ for _, row in df.iterrows():
     mutation_score = row.get('Mutation Score', 'N/A') or 'N/A'
     arquitetura = row.get('Arquitetura', 'N/A') or 'N/A'
     
-    idade = obter_idade_repositorio(owner, nome)
+    idade = obter_idade_repositorio(owner, nome, row.get('Criado em', ''))
     
     if idade is not None:
         resultados.append({
             'Nome': nome,
+            'Proprietário': owner,
             'Arquitetura': arquitetura,
             'Mutation Score': mutation_score,
             'Idade (anos)': idade
@@ -8,11 +8,21 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 import json
 
+from arvoreRepositorio import listar_arquivos
+from perfilamento import perfilar
+
 # Carrega as variáveis de ambiente
 load_dotenv()
 GITHUB_TOKENS = os.getenv("GITHUB_TOKENS").split(",")  # Lista de tokens
 GRAPHQL_URL = "https://api.github.com/graphql"
 
+# Filtros aplicados com os metadados da busca, antes de qualquer requisição por repositório
+TAMANHO_MAXIMO_KB = 2_000_000  # diskUsage (KB) acima do qual o repositório é descartado
+LINGUAGEM_PRINCIPAL = "C#"
+
+# Colunas de metadados da busca gravadas no CSV depois das colunas da análise
+COLUNAS_METADADOS = ["ID", "Branch Padrão", "Criado em", "Último Push", "Tamanho (KB)", "Linguagem"]
+
 # Variável global para controlar o token atual
 token_index = 0
 
@@ -55,11 +65,23 @@ def fetch_repositories(query_string, end_cursor=None):
             }}
             nodes {{
               ... on Repository {{
+                id
                 name
                 owner {{
                   login
                 }}
                 stargazerCount
+                defaultBranchRef {{
+                  name
+                }}
+                createdAt
+                pushedAt
+                diskUsage
+                isFork
+                isArchived
+                primaryLanguage {{
+                  name
+                }}
               }}
             }}
           }}
@@ -80,23 +102,15 @@ def fetch_repositories(query_string, end_cursor=None):
     
     return repositories, end_cursor
 
-def analyze_repository_files(owner, name, stars):
+def analyze_repository_files(owner, name, stars, branch):
     """Analisa os arquivos do repositório para verificar se é .NET, tem testes e sua arquitetura"""
-    default_branches = ["main", "master"]
-    
-    for branch in default_branches:
-        url = f"https://api.github.com/repos/{owner}/{name}/git/trees/{branch}?recursive=1"
-        response = requests.get(url, headers=get_headers(), timeout=60)
-        if response.status_code == 200:
-            break  
-        time.sleep(1)  
-    
-    if response.status_code != 200:
+    # Lê a árvore em streaming guardando só .csproj/.sln; árvores truncadas são percorridas por subárvore
+    tree_files = listar_arquivos(owner, name, branch, get_headers)
+    if tree_files is None:
         return name, owner, stars, False, False, None, None, None
 
-    tree = response.json().get("tree", [])
-    is_dotnet = any(f['path'].endswith(('.csproj', '.sln')) for f in tree)
-    csproj_files = [f['path'] for f in tree if f['path'].endswith(".csproj")]
+    is_dotnet = bool(tree_files)
+    csproj_files = [path for path in tree_files if path.endswith(".csproj")]
 
     # Verifica a versão do SDK nos arquivos .csproj
     sdk_version = None
@@ -125,7 +139,7 @@ def analyze_repository_files(owner, name, stars):
         time.sleep(1)  # Evitar rate limit
 
     # Detecta o diretório da solução
-    sln_files = [f['path'] for f in tree if f['path'].endswith(".sln")]
+    sln_files = [path for path in tree_files if path.endswith(".sln")]
     if len(sln_files) == 1:
         sln_directory = os.path.dirname(sln_files[0])
     else:
@@ -161,6 +175,41 @@ def analyze_repository_files(owner, name, stars):
 
     return name, owner, stars, is_dotnet, has_tests, sdk_version, architecture, sln_directory
 
+def discard_reason(repo):
+    """Motivo para descartar o repositório só com os metadados da busca, ou None se ele deve ser analisado"""
+    if repo.get('isFork'):
+        return "fork"
+    if repo.get('isArchived'):
+        return "arquivado"
+    if not repo.get('defaultBranchRef'):
+        return "vazio"
+    if (repo.get('diskUsage') or 0) > TAMANHO_MAXIMO_KB:
+        return "grande demais"
+    if (repo.get('primaryLanguage') or {}).get('name') != LINGUAGEM_PRINCIPAL:
+        return "outra linguagem"
+    return None
+
+def filter_repositories(repositories):
+    """Remove duplicados (mesmo id em janelas de busca diferentes) e os repositórios descartados pelos metadados"""
+    selected, seen, discarded = [], set(), {}
+    for repo in repositories:
+        if not repo or repo.get('id') in seen:
+            continue
+        seen.add(repo.get('id'))
+        reason = discard_reason(repo)
+        if reason:
+            discarded[reason] = discarded.get(reason, 0) + 1
+        else:
+            selected.append(repo)
+    print(f"Repositórios para análise: {len(selected)} de {len(seen)} "
+          f"(descartados: {', '.join(f'{motivo}: {total}' for motivo, total in discarded.items()) or 'nenhum'})")
+    return selected
+
+def repository_metadata(repo):
+    """Valores das COLUNAS_METADADOS para o repositório"""
+    return [repo['id'], repo['defaultBranchRef']['name'], repo['createdAt'], repo['pushedAt'],
+            repo['diskUsage'], repo['primaryLanguage']['name']]
+
 def save_checkpoint(current_date, end_cursor):
     """Salva o checkpoint atual em um arquivo JSON"""
     checkpoint = {
@@ -209,17 +258,19 @@ def fetch_all_repositories():
 def analyze_repositories():
     """Executa a análise dos repositórios e salva os resultados no CSV"""
     all_repos = fetch_all_repositories()
+    candidates = filter_repositories(all_repos)
     filtered_repos = []
     lock = Lock()  # Bloqueio para evitar condições de corrida
 
     # Usando ThreadPoolExecutor para análise em paralelo
     max_workers = 24  # Limita a 32 workers
     with ThreadPoolExecutor(max_workers=max_workers) as executor:  # Ajuste o número de workers conforme necessário
-        futures = []
-        for repo in all_repos:
+        futures = {}
+        for repo in candidates:
             owner, name, stars = repo['owner']['login'], repo['name'], repo['stargazerCount']
+            branch = repo['defaultBranchRef']['name']
             print(f"Submetendo análise: {name}")
-            futures.append(executor.submit(analyze_repository_files, owner, name, stars))
+            futures[executor.submit(analyze_repository_files, owner, name, stars, branch)] = repo
 
         for future in as_completed(futures):
             try:
@@ -230,18 +281,19 @@ def analyze_repositories():
 
                 if is_dotnet and has_tests and is_sdk_8 and architecture:
                     with lock:
-                        filtered_repos.append([name, owner, stars, sdk_version, architecture, sln_directory])
+                        filtered_repos.append([name, owner, stars, sdk_version, architecture, sln_directory]
+                                              + repository_metadata(futures[future]))
             except Exception as e:
                 print(f"Erro ao analisar repositório: {e}")
     
     os.makedirs("Instrumentos/Codigos", exist_ok=True)
     with open("Instrumentos/Codigos/repositorios.csv", "w", newline="", encoding="utf-8") as file:
         writer = csv.writer(file)
-        writer.writerow(["Nome", "Proprietário", "Estrelas", "SDK", "Arquitetura", "Diretório SLN"])
+        writer.writerow(["Nome", "Proprietário", "Estrelas", "SDK", "Arquitetura", "Diretório SLN"] + COLUNAS_METADADOS)
         writer.writerows(filtered_repos)
     
-    print(f"\nTotal de repositórios analisados: {len(all_repos)}")
+    print(f"\nTotal de repositórios analisados: {len(candidates)} (de {len(all_repos)} encontrados)")
     print(f"Total de repositórios salvos no CSV: {len(filtered_repos)}")
 
 # Executa a análise
-analyze_repositories()
\ No newline at end of file
+perfilar(analyze_repositories)()
\ No newline at end of file
@@ -0,0 +1,246 @@
+import argparse
+import csv
+import os
+import posixpath
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from perfilamento import perfilar
+from verificacaoPrevia import projeto_de_teste
+
+DIRETORIO_ESPELHOS = "Instrumentos/Codigos/espelhos"
+CAMINHO_HISTORICO = "Instrumentos/Codigos/historicoRepositorios.csv"
+EXTENSAO_CODIGO = ".cs"
+# Usado quando a solução não tem .csproj de testes reconhecível: pastas/arquivos com "test" no nome
+TESTE_PATTERN = r'(^|/)[^/]*tests?[^/]*(/|$)|tests?\.cs$'
+BLOCO_LEITURA = 1 << 20
+
+COLUNAS_HISTORICO = [
+    "Nome", "Proprietário", "HEAD", "Idade Primeiro Commit (anos)", "Dias Desde Último Commit", "Commits",
+    "Contribuidores", "Churn Teste", "Churn Produção", "Churn Teste (%)", "LOC Teste", "LOC Produção",
+    "Razão LOC Teste/Código", "Erro",
+]
+
+def caminho_espelho(owner, nome, diretorio=DIRETORIO_ESPELHOS):
+    return Path(diretorio) / f"{owner}__{nome}.git"
+
+def localizar_repositorio(owner, nome, espelhos=DIRETORIO_ESPELHOS, clones=None):
+    """Espelho bare (<owner>__<nome>.git) ou, na falta dele, o clone em <clones>/<nome>; None se não houver."""
+    espelho = caminho_espelho(owner, nome, espelhos)
+    if espelho.is_dir():
+        return espelho
+    if clones and (Path(clones) / nome / ".git").exists():
+        return Path(clones) / nome
+    return None
+
+def _git(repositorio, *argumentos, **opcoes):
+    return subprocess.Popen(["git", "-c", "core.quotepath=off", "-C", str(repositorio), *argumentos], stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, **opcoes)
+
+def _entradas(saida, separador=b"\0"):
+    """Entradas de uma saída -z lidas em blocos."""
+    pendente = b""
+    for bloco in iter(lambda: saida.read(BLOCO_LEITURA), b""):
+        *completas, pendente = (pendente + bloco).split(separador)
+        yield from completas
+    if pendente:
+        yield pendente
+
+def _arquivos_head(repositorio):
+    """[(sha, caminho)] dos .cs e .csproj do HEAD, lidos em streaming do ls-tree."""
+    arquivos = []
+    processo = _git(repositorio, "ls-tree", "-r", "-z", "HEAD")
+    for entrada in _entradas(processo.stdout):
+        cabecalho, caminho = entrada.split(b"\t", 1)
+        _, tipo, sha = cabecalho.split()
+        caminho = caminho.decode("utf-8", errors="replace")
+        if tipo == b"blob" and caminho.endswith((EXTENSAO_CODIGO, ".csproj")):
+            arquivos.append((sha.decode(), caminho))
+    processo.wait()
+    return arquivos
+
+def _ler_blobs(repositorio, shas, consumir):
+    """Passa cada blob para `consumir(indice, blocos)` via `git cat-file --batch`, sem carregar o arquivo inteiro."""
+    processo = _git(repositorio, "cat-file", "--batch", stdin=subprocess.PIPE)
+
+    def escrever():
+        # Em thread: com muitos blobs o stdout enche antes de terminarmos de escrever os SHAs
+        for sha in shas:
+            processo.stdin.write(f"{sha}\n".encode())
+        processo.stdin.close()
+
+    escritor = threading.Thread(target=escrever, daemon=True)
+    escritor.start()
+    for indice in range(len(shas)):
+        cabecalho = processo.stdout.readline().split()
+        if len(cabecalho) < 3:
+            continue  # "<sha> missing"
+        restante = int(cabecalho[2])
+
+        def blocos():
+            nonlocal restante
+            while restante:
+                bloco = processo.stdout.read(min(restante, BLOCO_LEITURA))
+                restante -= len(bloco)
+                yield bloco
+
+        consumir(indice, blocos())
+        for _ in blocos():  # Descarta o que o consumidor não leu
+            pass
+        processo.stdout.read(1)  # "\n" após o conteúdo
+    escritor.join()
+    processo.wait()
+
+def _contar_linhas(blocos):
+    linhas, ultimo = 0, b"\n"
+    for bloco in blocos:
+        linhas += bloco.count(b"\n")
+        ultimo = bloco[-1:] or ultimo
+    return linhas + (ultimo != b"\n")
+
+def classificador_testes(repositorio, arquivos):
+    """Função caminho -> é teste? pelas pastas dos .csproj de testes do HEAD (ou pelo nome, se não houver)."""
+    projetos = [(sha, caminho) for sha, caminho in arquivos if caminho.endswith(".csproj")]
+    pastas_teste = []
+
+    def ler_projeto(indice, blocos):
+        if projeto_de_teste(b"".join(blocos).decode("utf-8-sig", errors="replace")):
+            pastas_teste.append(posixpath.dirname(projetos[indice][1]))
+
+    _ler_blobs(repositorio, [sha for sha, _ in projetos], ler_projeto)
+    if not pastas_teste:
+        return lambda caminho: re.search(TESTE_PATTERN, caminho, re.IGNORECASE) is not None
+    prefixos = tuple(f"{pasta}/" if pasta else "" for pasta in pastas_teste)
+    return lambda caminho: caminho.startswith(prefixos)
+
+def metricas_historico(repositorio, agora=None):
+    """Métricas de histórico e de tamanho de um repositório git, lendo a saída do git em streaming."""
+    agora = agora or time.time()
+    head = subprocess.run(["git", "-C", str(repositorio), "rev-parse", "HEAD"], stdout=subprocess.PIPE,
+                          stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    if not head:
+        return {"Erro": "Repositório sem HEAD"}
+
+    arquivos = _arquivos_head(repositorio)
+    eh_teste = classificador_testes(repositorio, arquivos)
+
+    # LOC (linhas físicas) dos .cs no HEAD
+    codigo = [(sha, caminho) for sha, caminho in arquivos if caminho.endswith(EXTENSAO_CODIGO)]
+    loc = {True: 0, False: 0}
+
+    def contar(indice, blocos):
+        loc[eh_teste(codigo[indice][1])] += _contar_linhas(blocos)
+
+    _ler_blobs(repositorio, [sha for sha, _ in codigo], contar)
+
+    # Histórico: um cabeçalho "\0<data>\t<email>" por commit seguido das linhas do --numstat
+    commits, contribuidores, primeiro, ultimo = 0, set(), None, None
+    churn = {True: 0, False: 0}
+    processo = _git(repositorio, "log", "--no-renames", "--numstat", "--format=%x00%at%x09%aE", "HEAD")
+    for linha in processo.stdout:
+        linha = linha.decode("utf-8", errors="replace").rstrip("\n")
+        if linha.startswith("\0"):
+            data, _, email = linha[1:].partition("\t")
+            commits += 1
+            contribuidores.add(email.lower())
+            data = int(data)
+            primeiro = data if primeiro is None else min(primeiro, data)
+            ultimo = data if ultimo is None else max(ultimo, data)
+            continue
+        partes = linha.split("\t", 2)
+        if len(partes) == 3 and partes[2].endswith(EXTENSAO_CODIGO) and partes[0].isdigit() and partes[1].isdigit():
+            churn[eh_teste(partes[2])] += int(partes[0]) + int(partes[1])
+    processo.wait()
+
+    total_churn = churn[True] + churn[False]
+    return {
+        "HEAD": head,
+        "Idade Primeiro Commit (anos)": round((agora - primeiro) / 86400 / 365.25, 2) if primeiro else "N/A",
+        "Dias Desde Último Commit": round((agora - ultimo) / 86400) if ultimo else "N/A",
+        "Commits": commits,
+        "Contribuidores": len(contribuidores),
+        "Churn Teste": churn[True],
+        "Churn Produção": churn[False],
+        "Churn Teste (%)": f"{100 * churn[True] / total_churn:.2f}" if total_churn else "N/A",
+        "LOC Teste": loc[True],
+        "LOC Produção": loc[False],
+        "Razão LOC Teste/Código": f"{loc[True] / loc[False]:.4f}" if loc[False] else "N/A",
+        "Erro": "",
+    }
+
+def espelhar(owner, nome, diretorio=DIRETORIO_ESPELHOS):
+    """Cria o espelho bare do repositório (sem working tree: só o que o histórico precisa). Retorna o erro ou None."""
+    destino = caminho_espelho(owner, nome, diretorio)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    resultado = subprocess.run(["git", "clone", "--mirror", "--quiet", f"https://github.com/{owner}/{nome}.git", str(destino)],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    return None if resultado.returncode == 0 else f"Erro ao espelhar: {resultado.stderr.strip()}"
+
+def analisar(tarefa):
+    """Executada no pool: localiza (ou espelha) o repositório e calcula as métricas."""
+    owner, nome, espelhos, clones, clonar = tarefa
+    linha = {"Nome": nome, "Proprietário": owner}
+    repositorio = localizar_repositorio(owner, nome, espelhos, clones)
+    if repositorio is None and clonar:
+        erro = espelhar(owner, nome, espelhos)
+        if erro:
+            return {**linha, "Erro": erro}
+        repositorio = caminho_espelho(owner, nome, espelhos)
+    if repositorio is None:
+        return {**linha, "Erro": "Espelho/clone não encontrado"}
+    try:
+        return {**linha, **metricas_historico(repositorio)}
+    except (OSError, ValueError) as e:
+        return {**linha, "Erro": f"Erro ao ler o histórico: {e}"}
+
+def carregar_existentes(caminho):
+    if not os.path.exists(caminho):
+        return set()
+    with open(caminho, mode='r', encoding='utf-8') as file:
+        return {(row["Proprietário"], row["Nome"]) for row in csv.DictReader(file) if not row.get("Erro")}
+
+def main():
+    parser = argparse.ArgumentParser(description="Métricas de histórico (idade, commits, contribuidores, churn e LOC de testes) a partir de espelhos git locais.")
+    parser.add_argument("csv", help="CSV com as colunas Nome e Proprietário (ex.: resultados da campanha)")
+    parser.add_argument("--saida", default=CAMINHO_HISTORICO)
+    parser.add_argument("--espelhos", default=DIRETORIO_ESPELHOS, help="Diretório dos espelhos <owner>__<nome>.git")
+    parser.add_argument("--clones", help="Diretório com clones <nome>/ usados quando não há espelho")
+    parser.add_argument("--clonar", action="store_true", help="Cria os espelhos que faltam (git clone --mirror)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--refazer", action="store_true", help="Recalcula também os repositórios já presentes na saída")
+    args = parser.parse_args()
+
+    with open(args.csv, mode='r', encoding='utf-8') as file:
+        repositorios = list(dict.fromkeys((row["Proprietário"], row["Nome"]) for row in csv.DictReader(file)))
+    feitos = set() if args.refazer else carregar_existentes(args.saida)
+    pendentes = [repo for repo in repositorios if repo not in feitos]
+    print(f"Repositórios: {len(repositorios)} (já calculados: {len(repositorios) - len(pendentes)}, a calcular: {len(pendentes)})")
+
+    # Linhas antigas que não serão recalculadas continuam no arquivo; cada resultado é gravado assim que sai do pool
+    anteriores, recalcular = [], set(pendentes)
+    if os.path.exists(args.saida):
+        with open(args.saida, mode='r', encoding='utf-8') as file:
+            anteriores = [row for row in csv.DictReader(file) if (row["Proprietário"], row["Nome"]) not in recalcular]
+    Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.saida, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=COLUNAS_HISTORICO, restval="", extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(anteriores)
+        file.flush()
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futuros = [executor.submit(analisar, (owner, nome, args.espelhos, args.clones, args.clonar))
+                       for owner, nome in pendentes]
+            for i, futuro in enumerate(as_completed(futuros), 1):
+                linha = futuro.result()
+                writer.writerow(linha)
+                file.flush()
+                print(f"[{i}/{len(pendentes)}] {linha['Proprietário']}/{linha['Nome']}: "
+                      f"{linha.get('Erro') or str(linha.get('Commits')) + ' commits'}")
+    print(f"Métricas salvas em {args.saida}")
+
+if __name__ == "__main__":
+    perfilar(main)()
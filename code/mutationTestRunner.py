@@ -5,6 +5,9 @@ import subprocess
 import time
 import shutil
 
+from perfilamento import perfilar
+from registroErros import COLUNAS_ERRO, LIMITE_CAMPO_LEGADO, estender_cabecalho, registrar_erro
+
 def load_repositories(csv_path):
     """Carrega todos os repositórios a partir do arquivo CSV."""
     with open(csv_path, mode='r', encoding='utf-8') as file:
@@ -102,12 +105,15 @@ def save_resultes(csv_path, resultes):
         "Nome", "Proprietário", "Estrelas", "SDK", "Arquitetura", "Diretório SLN",
         "Killed", "Survived", "Timeout", "Time Elapsed", "Mutation Score",
         "Total Mutants", "Mutants Compile Error", "Mutants No Coverage", "Mutants Ignored", "Mutants Tested", "Erro"
-    ]
-    
+    ] + COLUNAS_ERRO
+
+    if existe:
+        fieldnames = estender_cabecalho(csv_path, fieldnames)
+
     with open(csv_path, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        if not existe:
-            writer.writeheader()  # Escreve o cabeçalho apenas se o arquivo não existir
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        if file.tell() == 0:
+            writer.writeheader()  # Escreve o cabeçalho apenas em arquivo novo ou vazio
         writer.writerows(resultes)
 
 def delete_repositorie(diretorio):
@@ -128,9 +134,8 @@ def load_last_processed_repo(csv_path):
     if not os.path.exists(csv_path):
         return None  # Se o arquivo não existir
 
-    # Aumenta o limite do tamanho do campo para 10 MB
-    csv.field_size_limit(10 * 1024 * 1024)  
-
+    # A saída das ferramentas agora fica nos logs (registroErros), mas CSVs anteriores à migração ainda a têm inline
+    csv.field_size_limit(LIMITE_CAMPO_LEGADO)
     with open(csv_path, mode='r', encoding='utf-8') as file:
         reader = csv.DictReader(file)
         rows = list(reader)
@@ -179,7 +184,7 @@ def main():
         print(f"Clonando repositório {nome}...")
         sucess, erro_clone = clone_repositories(owner, nome, caminho_repo)
         if not sucess:
-            repo["Erro"] = erro_clone
+            repo.update(registrar_erro(repo, "clone", erro_clone))
             results.append(repo)
             save_resultes(csv_output, [repo])  # Salva o erro 
             continue
@@ -188,7 +193,7 @@ def main():
         caminho_sln = os.path.join(caminho_repo, diretorio_sln)
         
         if not os.path.exists(caminho_sln):
-            repo["Erro"] = "Diretório da solução não encontrado"
+            repo.update(registrar_erro(repo, "clone", "Diretório da solução não encontrado"))
             results.append(repo)
             save_resultes(csv_output, [repo])  # Salva o erro 
             delete_repositorie(caminho_repo)  # Deleta se não encontrar a solução
@@ -198,7 +203,7 @@ def main():
         print(f"Compilando o projeto em {caminho_sln}...")
         sucess_build, erro_build = build_project(caminho_sln)
         if not sucess_build:
-            repo["Erro"] = erro_build
+            repo.update(registrar_erro(repo, "build", erro_build))
             results.append(repo)
             save_resultes(csv_output, [repo])  # Salva o erro 
             delete_repositorie(caminho_repo)  # Deleta o repositório após o erro
@@ -211,7 +216,7 @@ def main():
         if metricas:
             repo.update(metricas)  # Atualiza o dicionário com as métricas do Stryker
         if erro:
-            repo["Erro"] = erro
+            repo.update(registrar_erro(repo, "stryker", erro))
         
         results.append(repo)
 
@@ -226,4 +231,4 @@ def main():
     print("Execução concluída! Resultados salvos em", csv_output)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    perfilar(main)()
\ No newline at end of file
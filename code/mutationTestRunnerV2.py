@@ -1,3 +1,4 @@
+import argparse
 import csv
 import os
 import stat
@@ -5,6 +6,45 @@ import subprocess
 import time
 import shutil
 
+from ajusteStryker import COLUNA_CONFIG, ajustar, argumentos_config
+from areaTrabalho import ORCAMENTO_MEMORIA_GB, AreaTrabalho
+from arquivoSaidas import ArquivoSaidas, arquivos_modificados
+from amostragemMutacao import COLUNAS_AMOSTRAGEM, LARGURA_IC_ALVO, argumentos_stryker, estimar_por_amostragem
+from cacheBuild import CacheBuild
+from perfilamento import perfilar
+from progressoCampanha import ARQUIVO_EVENTOS, PORTA_METRICAS, Progresso, mutantes_testados
+from preparacaoAntecipada import LIMITE_DISCO_GB, PreparacaoAntecipada
+from registroErros import COLUNAS_ERRO, estender_cabecalho, registrar_erro
+from strykerPorProjeto import executar_por_projeto
+from verificacaoPrevia import PREFIXO_MOTIVO, verificar_repositorio
+
+# Verifica pelo checkout esparso se o build vai falhar antes de clonar o repositório inteiro (um clone a mais por repositório)
+VERIFICACAO_PREVIA = False
+
+# Mede configurações candidatas do Stryker em uma amostra e usa a mais rápida (reaproveitada nas próximas execuções)
+AJUSTE_STRYKER = False
+
+# Um Stryker por projeto de código da solução, em paralelo, com as métricas somadas em uma linha
+STRYKER_POR_PROJETO = False
+
+# Cache de bin/obj por commit e SDK (None desativa)
+CACHE_BUILD = CacheBuild()
+
+# stdout/stderr e relatórios de cada etapa, comprimidos, para recalcular as métricas com reprocessarSaidas (None desativa)
+ARQUIVO_SAIDAS = ArquivoSaidas()
+
+# Diretórios de trabalho em tmpfs para os repositórios que cabem no orçamento de memória (None clona em base_dir)
+AREA_TRABALHO = None
+
+# Eventos de progresso da campanha (etapa atual, mutantes, falhas, ETA)
+PROGRESSO = Progresso()
+
+# Pausa após cada repositório processado com sucesso (segundos)
+PAUSA_APOS_REPOSITORIO = 2
+
+# Grandes demais para o Stryker completo; com --amostragem são amostrados em vez de pulados
+REPOSITORIOS_PARA_IGNORAR = ["quartznet", "PeanutButter", "Mapsui"]
+
 def load_repositories(csv_path):
     """Carrega todos os repositórios a partir do arquivo CSV."""
     with open(csv_path, mode='r', encoding='utf-8') as file:
@@ -12,6 +52,11 @@ def load_repositories(csv_path):
         return list(reader)  # Retorna todas as linhas do CSV
     return []
 
+def archive_output(nome, etapa, codigo, stdout="", stderr="", **opcoes):
+    """Guarda as saídas da etapa em ARQUIVO_SAIDAS (se ativo)."""
+    if ARQUIVO_SAIDAS and nome:
+        ARQUIVO_SAIDAS.registrar(nome, etapa, codigo, stdout=stdout, stderr=stderr, **opcoes)
+
 def clone_repositories(owner, nome, destino, max_attempts=3):
     """Clona o repositório para o diretório especificado."""
     if os.path.exists(destino):
@@ -24,104 +69,162 @@ def clone_repositories(owner, nome, destino, max_attempts=3):
     for attempt in range(max_attempts):
         try:
             process = subprocess.run(comand, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+            archive_output(nome, "clone", 0, process.stdout, process.stderr)
             return True, None
         except subprocess.CalledProcessError as e:
+            archive_output(nome, "clone", e.returncode, e.stdout, e.stderr)
             if attempt < max_attempts - 1:
                 print(f"Tentativa {attempt + 1} de {max_attempts} falhou. Tentando novamente...")
                 time.sleep(5)  # Espera 5 segundos antes de tentar novamente
             else:
                 return False, f"Erro ao clonar {nome}: {e.stderr}"
 
-def execute_stryker(diretorio):
+def extract_stryker_metrics(saida):
+    """Extrai as métricas do resumo impresso pelo Stryker.NET (valores ausentes ficam como 'N/A')."""
+    killed = survived = timeout = time_elapsed = mutation_score = "N/A"
+    total_mutants = mutants_compile_error = mutants_no_coverage = mutants_ignored = mutants_tested = "N/A"
+    
+    for line in saida.split('\n'):
+        if "Killed" in line and ":" in line:
+            killed = line.split(":")[-1].strip()
+        elif "Survived" in line and ":" in line:
+            survived = line.split(":")[-1].strip()
+        elif "Timeout" in line and ":" in line:
+            timeout = line.split(":")[-1].strip()
+        elif "Time Elapsed" in line:
+            time_elapsed = line.split()[-1].strip()
+        elif "The final mutation score" in line:
+            mutation_score = line.split()[-2].strip()
+        elif "mutants created" in line:
+            total_mutants = line.split("INF]")[-1].strip().split()[0]
+        elif "mutants got status CompileError" in line:
+            mutants_compile_error = line.split("INF]")[-1].strip().split()[0]
+        elif "mutants got status NoCoverage" in line:
+            mutants_no_coverage = line.split("INF]")[-1].strip().split()[0]
+        elif "mutants got status Ignored" in line:
+            mutants_ignored = line.split("INF]")[-1].strip().split()[0]
+        elif "total mutants are skipped" in line:
+            mutants_tested = line.split("INF]")[-1].strip().split()[0]
+    
+    return {
+        "Killed": killed,
+        "Survived": survived,
+        "Timeout": timeout,
+        "Time Elapsed": time_elapsed,
+        "Mutation Score": mutation_score,
+        "Total Mutants": total_mutants,
+        "Mutants Compile Error": mutants_compile_error,
+        "Mutants No Coverage": mutants_no_coverage,
+        "Mutants Ignored": mutants_ignored,
+        "Mutants Tested": mutants_tested
+    }
+
+def stryker_output_dir(diretorio, argumentos=()):
+    """Diretório em que o Stryker grava os relatórios (--output, ou StrykerOutput da solução)."""
+    argumentos = list(argumentos)
+    if "--output" in argumentos:
+        return os.path.join(diretorio, argumentos[argumentos.index("--output") + 1])
+    return os.path.join(diretorio, "StrykerOutput")
+
+def execute_stryker(diretorio, concurrency=None, nome=None, argumentos=(), parte=None):
     """Executa o Stryker.NET no diretório especificado e retorna as métricas."""
     try:
         comand = ["dotnet", "stryker", "--verbosity", "info"]
+        if concurrency:
+            comand += ["--concurrency", str(concurrency)]  # Sem a opção o Stryker usa todos os núcleos
+        comand += list(argumentos)
+        inicio = time.time()
         process = subprocess.Popen(comand, cwd=diretorio, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding="utf-8", errors="replace")
 
         output = []
         for line in process.stdout:
-            print(line, end='')  # Exibe a saída do Stryker em tempo real
+            if PROGRESSO.eco:
+                print(line, end='')  # Exibe a saída do Stryker em tempo real
+            PROGRESSO.linha_stryker(nome, line, parte)
             output.append(line.strip())  # Salva a saída para análise
 
         process.wait()  # Aguarda a finalização completa do processo
         saida = "\n".join(output)
         erro = process.stderr.read().strip() if process.stderr else ""
+        archive_output(nome, "stryker", process.returncode, saida, erro, segundos=round(time.time() - inicio, 2), parte=parte,
+                       relatorios=arquivos_modificados(stryker_output_dir(diretorio, argumentos), inicio), raiz=diretorio)
         
         if process.returncode != 0:
             return None, f"Erro ao executar Stryker: {saida + erro}"
         
         # Extrair métricas da saída do Stryker
-        killed = survived = timeout = time_elapsed = mutation_score = "N/A"
-        total_mutants = mutants_compile_error = mutants_no_coverage = mutants_ignored = mutants_tested = "N/A"
-        
-        for line in saida.split('\n'):
-            if "Killed" in line and ":" in line:
-                killed = line.split(":")[-1].strip()
-            elif "Survived" in line and ":" in line:
-                survived = line.split(":")[-1].strip()
-            elif "Timeout" in line and ":" in line:
-                timeout = line.split(":")[-1].strip()
-            elif "Time Elapsed" in line:
-                time_elapsed = line.split()[-1].strip()
-            elif "The final mutation score" in line:
-                mutation_score = line.split()[-2].strip()
-            elif "mutants created" in line:
-                total_mutants = line.split("INF]")[-1].strip().split()[0]
-            elif "mutants got status CompileError" in line:
-                mutants_compile_error = line.split("INF]")[-1].strip().split()[0]
-            elif "mutants got status NoCoverage" in line:
-                mutants_no_coverage = line.split("INF]")[-1].strip().split()[0]
-            elif "mutants got status Ignored" in line:
-                mutants_ignored = line.split("INF]")[-1].strip().split()[0]
-            elif "total mutants are skipped" in line:
-                mutants_tested = line.split("INF]")[-1].strip().split()[0]
-        
-        return {
-            "Killed": killed,
-            "Survived": survived,
-            "Timeout": timeout,
-            "Time Elapsed": time_elapsed,
-            "Mutation Score": mutation_score,
-            "Total Mutants": total_mutants,
-            "Mutants Compile Error": mutants_compile_error,
-            "Mutants No Coverage": mutants_no_coverage,
-            "Mutants Ignored": mutants_ignored,
-            "Mutants Tested": mutants_tested
-        }, None
+        return extract_stryker_metrics(saida), None
     except Exception as e:
         return None, f"Erro inesperado ao executar Stryker: {str(e)}"
 
-def restore_project(diretorio):
+def execute_stryker_sampled(diretorio, largura_ic, concurrency=None, nome=None, argumentos=()):
+    """Estima a pontuação de mutação rodando o Stryker só em uma amostra estratificada dos arquivos."""
+    def executar(arquivos, saida):
+        return execute_stryker(diretorio, concurrency, nome, argumentos_stryker(arquivos, saida) + list(argumentos))
+    return estimar_por_amostragem(diretorio, executar, nome, largura_ic)
+
+def execute_stryker_projects(diretorio, concurrency=None, nome=None, argumentos=()):
+    """Executa um Stryker por projeto de código em paralelo (ou um só, se a solução tem um projeto testado)."""
+    def executar(diretorio_projeto, concurrency_projeto, argumentos_projeto, parte):
+        return execute_stryker(diretorio_projeto, concurrency_projeto, nome, list(argumentos) + argumentos_projeto, parte)
+    resultado = executar_por_projeto(diretorio, executar, concurrency)
+    if resultado is None:
+        return execute_stryker(diretorio, concurrency, nome, argumentos)
+    return resultado
+
+def tune_stryker(diretorio, repo, concurrency=None):
+    """Escolhe (ou reaproveita) a configuração mais rápida do Stryker para o repositório e retorna os argumentos extras.
+
+    O nome da configuração escolhida vai para a coluna COLUNA_CONFIG da linha do repositório.
+    """
+    def executar(argumentos):
+        return execute_stryker(diretorio, concurrency, repo["Nome"], argumentos)
+    registro = ajustar(diretorio, executar, repo)
+    repo[COLUNA_CONFIG] = registro['escolhido']
+    return argumentos_config(diretorio, registro['config'])
+
+def restore_project(diretorio, nome=None):
     """Executa o comando `dotnet restore` no diretório especificado."""
     try:
         comand = ["dotnet", "restore"]
         process = subprocess.run(comand, cwd=diretorio, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        archive_output(nome, "restore", 0, process.stdout, process.stderr)
         return True, None
     except subprocess.CalledProcessError as e:
-        return False, f"Erro ao restaurar dependências: {e.stderr}"
+        archive_output(nome, "restore", e.returncode, e.stdout, e.stderr)
+        return False, f"Erro ao restaurar dependências: {e.stdout}{e.stderr}"  # O dotnet escreve os erros no stdout
 
-def build_project(diretorio):
+def build_project(diretorio, nucleos=None, nome=None):
     """Executa o comando `dotnet build` no diretório especificado."""
     try:
         comand = ["dotnet", "build"]
+        if nucleos:
+            comand.append(f"-maxcpucount:{nucleos}")
         process = subprocess.run(comand, cwd=diretorio, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        archive_output(nome, "build", 0, process.stdout, process.stderr)
         return True, None
     except subprocess.CalledProcessError as e:
-        return False, f"Erro ao compilar o projeto: {e.stderr}"
+        archive_output(nome, "build", e.returncode, e.stdout, e.stderr)
+        return False, f"Erro ao compilar o projeto: {e.stdout}{e.stderr}"
 
 def save_resultes(csv_path, resultes):
     """Salva os resultados no arquivo CSV (modo append para não sobrescrever)."""
     existe = os.path.exists(csv_path)
     fieldnames = [
         "Nome", "Proprietário", "Estrelas", "SDK", "Arquitetura", "Diretório SLN",
+        "ID", "Branch Padrão", "Criado em", "Último Push", "Tamanho (KB)", "Linguagem",
         "Killed", "Survived", "Timeout", "Time Elapsed", "Mutation Score",
-        "Total Mutants", "Mutants Compile Error", "Mutants No Coverage", "Mutants Ignored", "Mutants Tested", "Erro"
-    ]
-    
+        "Total Mutants", "Mutants Compile Error", "Mutants No Coverage", "Mutants Ignored", "Mutants Tested",
+        *COLUNAS_AMOSTRAGEM, COLUNA_CONFIG, "Erro"
+    ] + COLUNAS_ERRO
+
+    if existe:
+        fieldnames = estender_cabecalho(csv_path, fieldnames)
+
     with open(csv_path, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        if not existe:
-            writer.writeheader()  # Escreve o cabeçalho apenas se o arquivo não existir
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        if file.tell() == 0:
+            writer.writeheader()  # Escreve o cabeçalho apenas em arquivo novo ou vazio
         writer.writerows(resultes)
 
 def delete_repositorie(diretorio):
@@ -150,11 +253,175 @@ def filter_untested_repositories(repositorios, tested_repos):
     """Filtra a lista de repositórios, retornando apenas os que não foram testados."""
     return [repo for repo in repositorios if repo["Nome"] not in tested_repos]
 
+def process_repository(repo, base_dir, nucleos=None, amostragem=None):
+    """Executa o pipeline completo (clone, restore, build e Stryker) de um repositório e retorna a linha de resultado.
+
+    `nucleos` limita o paralelismo do build e do Stryker (None = todos os núcleos da máquina).
+    `amostragem` é a largura alvo do IC da pontuação (pontos percentuais) para rodar o Stryker só em uma
+    amostra dos arquivos; None executa todos os mutantes.
+    """
+    return finish_repository(repo, prepare_repository(repo, base_dir), nucleos, amostragem)
+
+def repository_directory(repo, base_dir):
+    """Diretório do clone: em memória ou em disco conforme AREA_TRABALHO, ou base_dir/Nome."""
+    memoria = AREA_TRABALHO.reservar(repo["Nome"], repo.get("Tamanho (KB)")) if AREA_TRABALHO else None
+    return memoria or os.path.join(base_dir, repo["Nome"])
+
+def finish_repository(repo, preparado, nucleos=None, amostragem=None):
+    """Executa a parte de CPU de um repositório já preparado (ou que falhou na preparação) e fecha o seu progresso."""
+    if preparado is not None:
+        repo = execute_repository(repo, preparado, nucleos, amostragem)
+    if AREA_TRABALHO:
+        AREA_TRABALHO.liberar(repo["Nome"])  # O clone já foi apagado em todos os caminhos
+    PROGRESSO.concluir(repo, mutantes_testados(repo))
+    return repo
+
+def prepare_repository(repo, base_dir, antecipada=False):
+    """Etapas de rede e disco (pré-verificação, clone, cache de build e restore); podem rodar à frente do Stryker.
+
+    Retorna o estado usado por execute_repository, ou None se o repositório falhou (o erro fica em `repo`).
+    Cada início de etapa é publicado em PROGRESSO (como `antecipada` quando roda à frente do consumidor).
+    """
+    nome = repo["Nome"]
+    owner = repo["Proprietário"]
+    diretorio_sln = repo.get("Diretório SLN", "")
+    caminho_repo = repository_directory(repo, base_dir)
+
+    # Pré-verificação: pula repositórios que certamente falhariam no restore/build
+    if VERIFICACAO_PREVIA and not os.path.exists(caminho_repo):
+        PROGRESSO.etapa(nome, "previa", antecipada)
+        motivo = verificar_repositorio(repo, base_dir)
+        if motivo:
+            print(f"Pulando {nome}: {motivo}")
+            repo.update(registrar_erro(repo, "previa", PREFIXO_MOTIVO + motivo))
+            return None
+
+    # Clonar repositório (se já não existir)
+    PROGRESSO.etapa(nome, "clone", antecipada)
+    print(f"Clonando repositório {nome}...")
+    sucess, erro_clone = clone_repositories(owner, nome, caminho_repo)
+    if not sucess:
+        repo.update(registrar_erro(repo, "clone", erro_clone))
+        return None
+
+    # Caminho completo do diretório da solução
+    caminho_sln = os.path.join(caminho_repo, diretorio_sln)
+    
+    if not os.path.exists(caminho_sln):
+        repo.update(registrar_erro(repo, "clone", "Diretório da solução não encontrado"))
+        delete_repositorie(caminho_repo)  # Deleta se não encontrar a solução
+        return None
+
+    # Com o build deste commit/SDK em cache, restore e build são pulados
+    chave_cache, metadados_cache = CACHE_BUILD.chave(repo, caminho_repo, caminho_sln) if CACHE_BUILD else (None, None)
+    build_em_cache = chave_cache is not None and CACHE_BUILD.restaurar(chave_cache, caminho_repo)
+
+    if not build_em_cache:
+        # Restaurar dependências
+        PROGRESSO.etapa(nome, "restore", antecipada)
+        print(f"Restaurando dependências em {caminho_sln}...")
+        sucess_restore, erro_restore = restore_project(caminho_sln, nome)
+        if not sucess_restore:
+            repo.update(registrar_erro(repo, "restore", erro_restore))
+            delete_repositorie(caminho_repo)  # Deleta o repositório após o erro
+            return None
+
+    return {"caminho_repo": caminho_repo, "caminho_sln": caminho_sln, "chave_cache": chave_cache,
+            "metadados_cache": metadados_cache, "build_em_cache": build_em_cache}
+
+def execute_repository(repo, preparado, nucleos=None, amostragem=None):
+    """Etapas de CPU (build, ajuste e Stryker) de um repositório preparado; apaga o clone no final."""
+    nome = repo["Nome"]
+    caminho_repo, caminho_sln = preparado["caminho_repo"], preparado["caminho_sln"]
+    chave_cache, build_em_cache = preparado["chave_cache"], preparado["build_em_cache"]
+
+    if not build_em_cache:
+        # Compilar o projeto
+        PROGRESSO.etapa(nome, "build")
+        print(f"Compilando o projeto em {caminho_sln}...")
+        sucess_build, erro_build = build_project(caminho_sln, nucleos, nome)
+        if not sucess_build:
+            repo.update(registrar_erro(repo, "build", erro_build))
+            delete_repositorie(caminho_repo)  # Deleta o repositório após o erro
+            return repo
+
+        if chave_cache:
+            CACHE_BUILD.salvar(chave_cache, caminho_repo, preparado["metadados_cache"])
+
+    opcoes_stryker = []
+    if AJUSTE_STRYKER:
+        PROGRESSO.etapa(nome, "ajuste")
+        opcoes_stryker = tune_stryker(caminho_sln, repo, nucleos)
+
+    # Executar Stryker
+    PROGRESSO.etapa(nome, "stryker")
+    print(f"Executando Stryker em {caminho_sln}...")
+    if amostragem:
+        metricas, erro = execute_stryker_sampled(caminho_sln, amostragem, nucleos, nome, opcoes_stryker)
+    elif STRYKER_POR_PROJETO:
+        metricas, erro = execute_stryker_projects(caminho_sln, nucleos, nome, opcoes_stryker)
+    else:
+        metricas, erro = execute_stryker(caminho_sln, nucleos, nome, opcoes_stryker)
+    
+    if metricas:
+        repo.update(metricas)  # Atualiza o dicionário com as métricas do Stryker
+    if erro:
+        repo.update(registrar_erro(repo, "stryker", erro))
+        if build_em_cache:
+            CACHE_BUILD.remover(chave_cache)  # A próxima tentativa compila do zero
+
+    # Apaga o repositório após execução
+    print(f"Deletando repositório {caminho_repo}...")
+    delete_repositorie(caminho_repo)
+    time.sleep(PAUSA_APOS_REPOSITORIO)
+    return repo
+
+def configurar_progresso(args):
+    """Substitui o PROGRESSO padrão conforme as opções de linha de comando e sobe o endpoint de métricas."""
+    global PROGRESSO
+    PROGRESSO = Progresso(eco=not args.sem_eco, arquivo_eventos=args.eventos)
+    if args.porta_metricas:
+        PROGRESSO.servir(args.porta_metricas)
+    return PROGRESSO
+
+def argumentos_progresso(parser):
+    parser.add_argument("--sem-eco", action="store_true", help="Não repete a saída do Stryker no console")
+    parser.add_argument("--eventos", default=ARQUIVO_EVENTOS, help="Arquivo JSON lines com os eventos de progresso")
+    parser.add_argument("--porta-metricas", type=int, nargs="?", const=PORTA_METRICAS,
+                        help=f"Publica métricas Prometheus em http://127.0.0.1:PORTA/metrics (padrão {PORTA_METRICAS})")
+    return parser
+
 def main():
+    parser = argumentos_progresso(argparse.ArgumentParser(description="Executa o Stryker.NET nos repositórios ainda não testados."))
+    parser.add_argument("--amostragem", action="store_true",
+                        help="Testa os repositórios grandes (antes ignorados) por amostragem, com IC da pontuação")
+    parser.add_argument("--largura-ic", type=float, default=LARGURA_IC_ALVO,
+                        help="Largura alvo do IC da pontuação por amostragem (pontos percentuais)")
+    parser.add_argument("--verificacao-previa", action="store_true",
+                        help="Pula, após um checkout esparso, os repositórios cujo build certamente falharia (ver verificacaoPrevia)")
+    parser.add_argument("--ajustar-stryker", action="store_true",
+                        help="Escolhe por repositório a configuração mais rápida do Stryker (ver ajusteStryker)")
+    parser.add_argument("--por-projeto", action="store_true",
+                        help="Executa um Stryker por projeto de código da solução, em paralelo")
+    parser.add_argument("--antecipar", type=int, default=0, metavar="K",
+                        help="Clona e restaura os próximos K repositórios enquanto o atual roda o Stryker (0 desativa)")
+    parser.add_argument("--limite-disco-gb", type=float, default=LIMITE_DISCO_GB,
+                        help="Espaço máximo dos repositórios preparados à frente")
+    parser.add_argument("--memoria-gb", type=float, nargs="?", const=ORCAMENTO_MEMORIA_GB,
+                        help=f"Clona em tmpfs os repositórios que cabem neste orçamento (padrão {ORCAMENTO_MEMORIA_GB} GB)")
+    args = parser.parse_args()
+    progresso = configurar_progresso(args)
+    global VERIFICACAO_PREVIA, AJUSTE_STRYKER, STRYKER_POR_PROJETO, AREA_TRABALHO
+    VERIFICACAO_PREVIA = VERIFICACAO_PREVIA or args.verificacao_previa
+    AJUSTE_STRYKER = AJUSTE_STRYKER or args.ajustar_stryker
+    STRYKER_POR_PROJETO = STRYKER_POR_PROJETO or args.por_projeto
+
     csv_input = "Instrumentos/Codigos/repositorios.csv"
     csv_tested = "Instrumentos/Codigos/repositoriosTestados.csv"
     csv_output = "Instrumentos/Codigos/repositoriosClonados.csv"
     base_dir = "Instrumentos/Codigos/repositoriosClonados"
+    if args.memoria_gb:
+        AREA_TRABALHO = AreaTrabalho(orcamento_gb=args.memoria_gb)
     
     # Carrega todos os repositórios do CSV de entrada
     repositorios = load_repositories(csv_input)
@@ -170,83 +437,50 @@ def main():
     untested_repos = filter_untested_repositories(repositorios, tested_repos)
     print(f"Repositórios a serem testados: {len(untested_repos)}")
 
-    # Lista de repositórios para ignorar
-    repositorios_para_ignorar = ["quartznet", "PeanutButter", "Mapsui"]
+    # Lista de repositórios para ignorar (com --amostragem são amostrados)
+    repositorios_amostrados = set(REPOSITORIOS_PARA_IGNORAR) if args.amostragem else set()
+    repositorios_para_ignorar = [nome for nome in REPOSITORIOS_PARA_IGNORAR if nome not in repositorios_amostrados]
+    progresso.iniciar(len([repo for repo in untested_repos if repo["Nome"] not in repositorios_para_ignorar]))
 
     results = []
-    
-    # Processa apenas os repositórios não testados
+
+    # Verifica se o repositório deve ser ignorado
     for repo in untested_repos:
-        nome = repo["Nome"]
-
-        # Verifica se o repositório deve ser ignorado
-        if nome in repositorios_para_ignorar:
-            print(f"Pulando repositório {nome}...")
-            continue
-
-        owner = repo["Proprietário"]
-        diretorio_sln = repo.get("Diretório SLN", "")
-        caminho_repo = os.path.join(base_dir, nome)
-
-        # Clonar repositório (se já não existir)
-        print(f"Clonando repositório {nome}...")
-        sucess, erro_clone = clone_repositories(owner, nome, caminho_repo)
-        if not sucess:
-            repo["Erro"] = erro_clone
-            results.append(repo)
-            save_resultes(csv_output, [repo])  # Salva o erro no repositoriosClonados.csv
-            continue
-
-        # Caminho completo do diretório da solução
-        caminho_sln = os.path.join(caminho_repo, diretorio_sln)
-        
-        if not os.path.exists(caminho_sln):
-            repo["Erro"] = "Diretório da solução não encontrado"
-            results.append(repo)
-            save_resultes(csv_output, [repo])  # Salva o erro no repositoriosClonados.csv
-            delete_repositorie(caminho_repo)  # Deleta se não encontrar a solução
-            continue
+        if repo["Nome"] in repositorios_para_ignorar:
+            print(f"Pulando repositório {repo['Nome']}...")
+    untested_repos = [repo for repo in untested_repos if repo["Nome"] not in repositorios_para_ignorar]
 
-        # Restaurar dependências
-        print(f"Restaurando dependências em {caminho_sln}...")
-        sucess_restore, erro_restore = restore_project(caminho_sln)
-        if not sucess_restore:
-            repo["Erro"] = erro_restore
-            results.append(repo)
-            save_resultes(csv_output, [repo])  # Salva o erro no repositoriosClonados.csv
-            delete_repositorie(caminho_repo)  # Deleta o repositório após o erro
-            continue
+    # Processa apenas os repositórios não testados; com --antecipar, clone e restore dos próximos correm em paralelo
+    antecipar = args.antecipar > 0
 
-        # Compilar o projeto
-        print(f"Compilando o projeto em {caminho_sln}...")
-        sucess_build, erro_build = build_project(caminho_sln)
-        if not sucess_build:
-            repo["Erro"] = erro_build
-            results.append(repo)
-            save_resultes(csv_output, [repo])  # Salva o erro no repositoriosClonados.csv
-            delete_repositorie(caminho_repo)  # Deleta o repositório após o erro
-            continue
-
-        # Executar Stryker
-        print(f"Executando Stryker em {caminho_sln}...")
-        metricas, erro = execute_stryker(caminho_sln)
-        
-        if metricas:
-            repo.update(metricas)  # Atualiza o dicionário com as métricas do Stryker
-        if erro:
-            repo["Erro"] = erro
-        
-        results.append(repo)
+    def preparar(repo):
+        try:
+            return prepare_repository(repo, base_dir, antecipar)
+        finally:
+            if antecipar:
+                progresso.preparado(repo["Nome"])
 
-        # Salvar os resultados no repositoriosClonados.csv
-        save_resultes(csv_output, [repo])
+    preparacao = PreparacaoAntecipada(untested_repos, preparar, args.antecipar,
+                                      args.limite_disco_gb, caminho=lambda repo: repository_directory(repo, base_dir))
+    try:
+        with preparacao:
+            for repo, preparado in preparacao:
+                nome = repo["Nome"]
+                if antecipar:
+                    progresso.retomar(nome)
+                repo = finish_repository(repo, preparado, amostragem=args.largura_ic if nome in repositorios_amostrados else None)
+                results.append(repo)
 
-        # Apaga o repositório após execução
-        print(f"Deletando repositório {caminho_repo}...")
-        delete_repositorie(caminho_repo)
-        time.sleep(2)
+                # Salvar os resultados no repositoriosClonados.csv
+                save_resultes(csv_output, [repo])
+                if ARQUIVO_SAIDAS:
+                    ARQUIVO_SAIDAS.resultado(nome, repo, csv_output)
+                print(progresso.resumo())
+    finally:
+        if AREA_TRABALHO:
+            AREA_TRABALHO.fechar()  # Libera o tmpfs mesmo se a campanha for interrompida
 
     print("Execução concluída! Resultados salvos em", csv_output)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    perfilar(main)()
\ No newline at end of file
@@ -0,0 +1,205 @@
+import atexit
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+# Perfilamento opcional de qualquer script de code/:
+#   python script.py --perfil[=DIRETORIO] [--perfil-memoria] ...    ou    PERFILAMENTO=1|DIRETORIO python script.py ...
+# Gera, por processo, <script>-<pid>.prof (cProfile: snakeviz, flameprof, python -m pstats) e
+# <script>-<pid>.trace.json (Trace Event: Perfetto, chrome://tracing, speedscope) com um trecho por
+# subprocesso e por requisição HTTP. Desligado, `perfilar` devolve a própria função e `trecho` um contexto nulo.
+VARIAVEL_AMBIENTE = "PERFILAMENTO"
+VARIAVEL_MEMORIA = "PERFILAMENTO_MEMORIA"
+ARGUMENTO = "--perfil"
+ARGUMENTO_MEMORIA = "--perfil-memoria"
+DIRETORIO_PERFIS = "Instrumentos/Codigos/perfis"
+LINHAS_MEMORIA = 30  # Linhas do relatório do tracemalloc
+LIMITE_COMANDO = 300  # Caracteres do comando guardados em cada trecho
+# A partir do 3.12 o cProfile usa sys.monitoring, que vale para todas as threads e admite um só perfil ativo
+PERFIL_UNICO = sys.version_info >= (3, 12)
+
+_NULO = contextlib.nullcontext()
+_sessao = None
+
+def _pedido():
+    """Diretório dos perfis se o perfilamento foi pedido (o argumento sai de sys.argv antes do argparse)."""
+    diretorio = os.environ.get(VARIAVEL_AMBIENTE) or None
+    memoria = os.environ.get(VARIAVEL_MEMORIA) == "1"
+    restantes = []
+    for argumento in sys.argv[1:]:
+        if argumento == ARGUMENTO or argumento.startswith(f"{ARGUMENTO}="):
+            diretorio = argumento.partition("=")[2] or DIRETORIO_PERFIS
+        elif argumento == ARGUMENTO_MEMORIA:
+            memoria = True
+        else:
+            restantes.append(argumento)
+    sys.argv[1:] = restantes
+    if diretorio in ("1", "true"):
+        diretorio = DIRETORIO_PERFIS
+    if diretorio:
+        # Subprocessos Python (workers do coordenador, por exemplo) herdam o pedido e gravam os seus próprios perfis
+        os.environ[VARIAVEL_AMBIENTE] = diretorio
+        if memoria:
+            os.environ[VARIAVEL_MEMORIA] = "1"
+    return diretorio, memoria
+
+class _Sessao:
+    """Perfis e trechos do processo atual, gravados em `diretorio` ao final."""
+
+    def __init__(self, diretorio, memoria):
+        self.diretorio = Path(diretorio)
+        self.memoria = memoria
+        self.nome = f"{Path(sys.argv[0]).stem or 'python'}-{os.getpid()}"
+        self.inicio = time.perf_counter()
+        self.eventos = []
+        self.threads = {}
+        self.perfis = []
+        self._lock = threading.Lock()
+
+    def agora_us(self):
+        return (time.perf_counter() - self.inicio) * 1e6
+
+    def registrar(self, nome, categoria, inicio_us, **dados):
+        thread = threading.current_thread()
+        evento = {'name': nome, 'cat': categoria, 'ph': 'X', 'ts': inicio_us, 'dur': self.agora_us() - inicio_us,
+                  'pid': os.getpid(), 'tid': thread.ident, 'args': dados}
+        with self._lock:
+            self.threads.setdefault(thread.ident, thread.name)
+            self.eventos.append(evento)
+
+    def iniciar(self):
+        if self.memoria:
+            tracemalloc.start()
+        perfil = cProfile.Profile()
+        self.perfis.append(perfil)
+        if not PERFIL_UNICO:
+            threading.setprofile(self._perfilar_thread)  # Threads criadas daqui em diante ganham um perfil próprio
+        perfil.enable()
+
+    def _perfilar_thread(self, *_):
+        perfil = cProfile.Profile()
+        with self._lock:
+            self.perfis.append(perfil)
+        perfil.enable()  # Substitui este gancho na thread pelo do cProfile
+
+    def gravar(self):
+        if not PERFIL_UNICO:
+            threading.setprofile(None)
+        self.perfis[0].disable()
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        base = self.diretorio / self.nome
+
+        estatisticas = pstats.Stats(self.perfis[0])
+        for perfil in self.perfis[1:]:
+            try:
+                estatisticas.add(perfil)
+            except TypeError:
+                continue  # Thread que não chegou a executar nada perfilado
+        estatisticas.dump_stats(f"{base}.prof")
+
+        metadados = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': nome}}
+                     for tid, nome in self.threads.items()]
+        if self.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            metadados.append({'name': 'memoria', 'ph': 'C', 'ts': self.agora_us(), 'pid': os.getpid(),
+                              'args': {'atual_mb': atual / 2 ** 20, 'pico_mb': pico / 2 ** 20}})
+            linhas = tracemalloc.take_snapshot().statistics('lineno')[:LINHAS_MEMORIA]
+            tracemalloc.stop()
+            with open(f"{base}.memoria.txt", 'w', encoding='utf-8') as arquivo:
+                arquivo.write(f"Pico: {pico / 2 ** 20:.1f} MB, ao final: {atual / 2 ** 20:.1f} MB\n\n")
+                arquivo.writelines(f"{linha}\n" for linha in linhas)
+        with open(f"{base}.trace.json", 'w', encoding='utf-8') as arquivo:
+            json.dump({'traceEvents': metadados + self.eventos, 'displayTimeUnit': 'ms'}, arquivo, default=str)
+        print(f"Perfil gravado em {base}.prof e {base}.trace.json", file=sys.stderr)
+
+def trecho(nome, categoria="etapa", **dados):
+    """Contexto que registra um trecho na linha do tempo (contexto nulo com o perfilamento desligado)."""
+    if _sessao is None:
+        return _NULO
+    return _trecho(nome, categoria, dados)
+
+@contextlib.contextmanager
+def _trecho(nome, categoria, dados):
+    inicio = _sessao.agora_us()
+    try:
+        yield dados  # Quem chama pode completar os dados (código de saída, tamanho da resposta...)
+    finally:
+        _sessao.registrar(nome, categoria, inicio, **dados)
+
+class _PopenRastreado(subprocess.Popen):
+    """Popen que registra um trecho do início do processo até o código de saída ser conhecido."""
+
+    def __init__(self, args, *posicionais, **opcoes):
+        self._inicio_trecho = _sessao.agora_us()
+        self._trecho_registrado = False
+        super().__init__(args, *posicionais, **opcoes)
+
+    def _registrar_trecho(self, codigo):
+        if codigo is None or self._trecho_registrado:
+            return
+        self._trecho_registrado = True
+        comando = self.args if isinstance(self.args, (str, bytes)) else " ".join(map(str, self.args))
+        programa = Path(str(comando).split()[0]).name if str(comando).split() else "?"
+        _sessao.registrar(programa, "subprocesso", self._inicio_trecho, comando=str(comando)[:LIMITE_COMANDO],
+                          codigo=codigo)
+
+    def wait(self, timeout=None):
+        codigo = super().wait(timeout)
+        self._registrar_trecho(codigo)
+        return codigo
+
+    def poll(self):
+        codigo = super().poll()
+        self._registrar_trecho(codigo)
+        return codigo
+
+def _instalar_ganchos():
+    subprocess.Popen = _PopenRastreado  # subprocess.run/check_output usam o Popen do módulo
+    try:
+        import requests
+    except ImportError:
+        return
+    requisicao_original = requests.Session.request
+
+    def requisicao_rastreada(self, method, url, *args, **kwargs):
+        with trecho(f"{method.upper()} {str(url).split('?')[0]}", "http") as dados:
+            resposta = requisicao_original(self, method, url, *args, **kwargs)
+            dados.update(status=resposta.status_code, bytes=resposta.headers.get('Content-Length'))
+            return resposta
+
+    requests.Session.request = requisicao_rastreada
+
+def iniciar():
+    """Liga o perfilamento do processo se foi pedido; os arquivos são gravados na saída do processo.
+
+    Para scripts que executam no nível do módulo, sem main.
+    """
+    global _sessao
+    if _sessao is not None:
+        return True
+    diretorio, memoria = _pedido()
+    if not diretorio:
+        return False
+    _sessao = _Sessao(diretorio, memoria)
+    _instalar_ganchos()
+    _sessao.iniciar()
+    atexit.register(_sessao.gravar)
+    return True
+
+def perfilar(funcao):
+    """Ponto de entrada perfilado quando o perfilamento foi pedido; senão, a própria função."""
+    if not iniciar():
+        return funcao
+
+    def executar(*args, **kwargs):
+        with trecho(funcao.__name__, "principal"):
+            return funcao(*args, **kwargs)
+    return executar
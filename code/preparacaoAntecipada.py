@@ -0,0 +1,127 @@
+import os
+import shutil
+import signal
+import stat
+import threading
+import time
+
+PROFUNDIDADE_PADRAO = 2  # Repositórios preparados (ou em preparação) à frente do atual
+LIMITE_DISCO_GB = 20  # Espaço máximo ocupado pelos repositórios preparados e ainda não consumidos
+
+def tamanho_diretorio(caminho):
+    """Bytes ocupados pelos arquivos de um diretório (0 se não existe)."""
+    total = 0
+    for raiz, _, arquivos in os.walk(caminho):
+        for arquivo in arquivos:
+            try:
+                total += os.lstat(os.path.join(raiz, arquivo)).st_size
+            except OSError:
+                pass
+    return total
+
+def remover_diretorio(caminho):
+    def on_error(func, path, exc_info):
+        os.chmod(path, stat.S_IWRITE)  # Arquivos somente leitura do .git no Windows
+        func(path)
+    shutil.rmtree(caminho, onerror=on_error)
+
+class PreparacaoAntecipada:
+    """Prepara os próximos itens (clone, restore) em segundo plano enquanto o atual é executado.
+
+    Uso:
+        with PreparacaoAntecipada(repos, preparar, caminho=...) as fila:
+            for repo, preparado in fila:
+                executar(repo, preparado)
+
+    `preparar(item)` roda em uma thread, no máximo `profundidade` itens à frente do consumidor, e não começa um
+    novo item enquanto os preparados e ainda não consumidos ocuparem mais que `limite_disco_gb` (medido pelos
+    diretórios de `caminho(item)`). Se a iteração for interrompida (exceção, Ctrl+C ou SIGTERM), a preparação
+    em andamento é concluída e os diretórios preparados que ninguém consumiu são apagados.
+    Com profundidade 0 não há thread: cada item é preparado na hora em que é consumido.
+    """
+
+    def __init__(self, itens, preparar, profundidade=PROFUNDIDADE_PADRAO, limite_disco_gb=LIMITE_DISCO_GB, caminho=None):
+        self.itens = list(itens)
+        self.preparar = preparar
+        self.profundidade = profundidade
+        self.limite_bytes = limite_disco_gb * 2 ** 30
+        self.caminho = caminho or (lambda item: None)
+        self._condicao = threading.Condition()
+        self._prontos = []  # (item, resultado, bytes) na ordem de preparação
+        self._em_preparo = None
+        self._abortar = False
+        self._erro = None
+        self._thread = None
+        self._sigterm = None
+
+    def __enter__(self):
+        if self.profundidade > 0:
+            self._thread = threading.Thread(target=self._produzir, name="preparacao-antecipada", daemon=True)
+            self._thread.start()
+        if threading.current_thread() is threading.main_thread():
+            # SIGTERM vira KeyboardInterrupt para que a limpeza do __exit__ também rode quando o processo é encerrado
+            self._sigterm = signal.signal(signal.SIGTERM, signal.default_int_handler)
+        return self
+
+    def __exit__(self, tipo, valor, traceback):
+        with self._condicao:
+            self._abortar = True
+            self._condicao.notify_all()
+        if self._thread is not None:
+            if self._em_preparo is not None:
+                print("Aguardando a preparação em andamento terminar para limpar...")
+            self._thread.join()
+        if self._sigterm is not None:
+            signal.signal(signal.SIGTERM, self._sigterm)
+        for item, _, _ in self._prontos:
+            caminho = self.caminho(item)
+            if caminho and os.path.exists(caminho):
+                print(f"Removendo repositório preparado e não processado: {caminho}")
+                remover_diretorio(caminho)
+        self._prontos.clear()
+        return False
+
+    def _ocupado(self):
+        return sum(tamanho for _, _, tamanho in self._prontos)
+
+    def _produzir(self):
+        try:
+            for item in self.itens:
+                with self._condicao:
+                    # Espera vaga na profundidade e no orçamento de disco (sempre deixa preparar se nada estiver pronto)
+                    self._condicao.wait_for(lambda: self._abortar or (
+                        len(self._prontos) < self.profundidade
+                        and (not self._prontos or self._ocupado() < self.limite_bytes)))
+                    if self._abortar:
+                        return
+                    self._em_preparo = item
+                resultado = self.preparar(item)
+                caminho = self.caminho(item)
+                tamanho = tamanho_diretorio(caminho) if caminho else 0
+                with self._condicao:
+                    self._prontos.append((item, resultado, tamanho))
+                    self._em_preparo = None
+                    self._condicao.notify_all()
+        except BaseException as e:
+            with self._condicao:
+                self._erro = e
+                self._em_preparo = None
+                self._condicao.notify_all()
+
+    def __iter__(self):
+        if self._thread is None:
+            for item in self.itens:
+                yield item, self.preparar(item)
+            return
+        for _ in self.itens:
+            inicio = time.monotonic()
+            with self._condicao:
+                self._condicao.wait_for(lambda: self._prontos or self._erro is not None)
+                if not self._prontos:
+                    raise self._erro
+                item, resultado, _ = self._prontos.pop(0)
+                self._condicao.notify_all()
+            espera = time.monotonic() - inicio
+            if espera >= 1:
+                print(f"Aguardou {espera:.0f}s pela preparação do próximo repositório")
+            yield item, resultado
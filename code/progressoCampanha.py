@@ -0,0 +1,259 @@
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORTA_METRICAS = 9464
+ARQUIVO_EVENTOS = "Instrumentos/Codigos/progresso.jsonl"
+# Barra de progresso do Stryker.NET: "Tests progress | ████ | 123 / 849 | 14 % | ~2m 03s |"
+PROGRESSO_STRYKER_PATTERN = r'(\d+)\s*/\s*(\d+)\s*[│|]\s*\d+\s*%'
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _rotulos(**rotulos):
+    return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in rotulos.items()) + "}"
+
+def mutantes_testados(linha):
+    """Mutantes efetivamente executados pelo Stryker (Killed + Survived + Timeout)."""
+    try:
+        return sum(int(float(linha.get(coluna))) for coluna in ("Killed", "Survived", "Timeout"))
+    except (TypeError, ValueError):
+        return 0
+
+class Progresso:
+    """Estado da campanha (repositório N de M, etapa atual, mutantes, falhas) com eventos em JSON lines e ETA."""
+
+    def __init__(self, eco=True, arquivo_eventos=None):
+        self.eco = eco  # Repete a saída do Stryker no console
+        self.arquivo_eventos = arquivo_eventos
+        self.total = 0
+        self.concluidos = 0
+        self.mutantes_testados = 0
+        self.falhas = Counter()
+        self.em_execucao = {}  # nome -> {'etapa', 'inicio_etapa', 'inicio', 'mutantes', 'mutantes_total'}
+        self.antecipados = {}  # nome -> {'etapa', 'inicio_etapa'}: preparados à frente do Stryker (--antecipar)
+        self.duracoes = []  # Segundos por repositório concluído nesta campanha
+        self.duracoes_etapa = Counter()
+        self.contagem_etapa = Counter()
+        self.historico = self._carregar_historico()
+        self.paralelismo = 1
+        self.inicio = time.time()
+        self.ultimo_evento = self.inicio
+        self.ultima_atividade = self.inicio  # Último evento ou linha do Stryker, mesmo sem evento registrado
+        self._lock = threading.Lock()
+
+    def _carregar_historico(self):
+        """Duração dos repositórios concluídos em campanhas anteriores (do mesmo arquivo de eventos)."""
+        if not self.arquivo_eventos or not os.path.exists(self.arquivo_eventos):
+            return []
+        duracoes = []
+        with open(self.arquivo_eventos, 'r', encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                try:
+                    evento = json.loads(linha)
+                except ValueError:
+                    continue
+                if evento.get('tipo') == 'concluido' and evento.get('segundos'):
+                    duracoes.append(evento['segundos'])
+        return duracoes
+
+    def _registrar(self, tipo, **dados):
+        self.ultimo_evento = self.ultima_atividade = time.time()
+        if self.arquivo_eventos:
+            os.makedirs(os.path.dirname(self.arquivo_eventos) or '.', exist_ok=True)
+            with open(self.arquivo_eventos, 'a', encoding='utf-8') as arquivo:
+                arquivo.write(json.dumps({'tipo': tipo, 'momento': self.ultimo_evento, **dados}, ensure_ascii=False) + "\n")
+
+    def iniciar(self, total):
+        with self._lock:
+            self.total = total
+            self._registrar('inicio', total=total)
+
+    def _fechar_etapa(self, estado, agora):
+        if 'etapa' in estado:
+            self.duracoes_etapa[estado['etapa']] += agora - estado['inicio_etapa']
+            self.contagem_etapa[estado['etapa']] += 1
+
+    def etapa(self, nome, etapa, antecipada=False):
+        """Marca o início de uma etapa (clone, restore, build, stryker...) de um repositório.
+
+        Etapas `antecipada`s (preparação de um repositório que ainda vai esperar na fila) ficam em `antecipados`:
+        não contam no paralelismo, que divide o ETA, até `retomar` quando o repositório é consumido.
+        """
+        with self._lock:
+            agora = time.time()
+            if antecipada:
+                estado = self.antecipados.setdefault(nome, {})
+            else:
+                estado = self.em_execucao.setdefault(nome, {'inicio': agora, 'mutantes': 0, 'mutantes_total': 0})
+                self.paralelismo = max(self.paralelismo, len(self.em_execucao))
+            self._fechar_etapa(estado, agora)
+            estado.update(etapa=etapa, inicio_etapa=agora)
+            self._registrar('etapa', repositorio=nome, etapa=etapa, antecipada=antecipada,
+                            posicao=self.concluidos + len(self.em_execucao), total=self.total)
+
+    def preparado(self, nome):
+        """Fecha a última etapa antecipada: o tempo até o repositório ser consumido é espera na fila, não etapa."""
+        with self._lock:
+            estado = self.antecipados.get(nome)
+            if estado and 'etapa' in estado:
+                self._fechar_etapa(estado, time.time())
+                estado['etapa_anterior'] = estado.pop('etapa')
+                self._registrar('preparado', repositorio=nome)
+
+    def retomar(self, nome):
+        """O repositório preparado à frente passa a estar em execução (o consumidor acabou de pegá-lo)."""
+        with self._lock:
+            estado = self.antecipados.pop(nome, {})
+            self.em_execucao[nome] = {'inicio': time.time(), 'mutantes': 0, 'mutantes_total': 0,
+                                      'etapa_anterior': estado.get('etapa_anterior')}
+            self.paralelismo = max(self.paralelismo, len(self.em_execucao))
+
+    def linha_stryker(self, nome, linha, parte=None):
+        """Acompanha a barra de progresso do Stryker; só registra evento a cada 10% para não inflar o arquivo.
+
+        Com `parte` (um Stryker por projeto), o progresso do repositório é a soma das partes.
+        """
+        self.ultima_atividade = time.time()
+        match = re.search(PROGRESSO_STRYKER_PATTERN, linha)
+        if not match:
+            return
+        testados, total = int(match.group(1)), int(match.group(2))
+        with self._lock:
+            estado = self.em_execucao.get(nome)
+            if estado is None:
+                return
+            if parte is not None:
+                estado.setdefault('partes', {})[parte] = (testados, total)
+                testados, total = map(sum, zip(*estado['partes'].values()))
+            anterior = estado['mutantes']
+            estado.update(mutantes=testados, mutantes_total=total)
+            if total and (testados == total or testados * 10 // total != anterior * 10 // total):
+                self._registrar('mutantes', repositorio=nome, testados=testados, total=total)
+
+    def concluir(self, repo, mutantes_testados=0):
+        """Fecha o repositório com a linha de resultado do pipeline."""
+        nome = repo["Nome"]
+        with self._lock:
+            estado = self.em_execucao.pop(nome, None)
+            agora = time.time()
+            segundos = agora - estado['inicio'] if estado else None
+            if estado:
+                self._fechar_etapa(estado, agora)
+            self.concluidos += 1
+            self.mutantes_testados += mutantes_testados
+            if segundos is not None:
+                self.duracoes.append(segundos)
+            falha = None
+            if repo.get("Erro"):
+                # Falha na preparação antecipada: a etapa é a última antes de o repositório ser consumido
+                estado = estado or {}
+                falha = estado.get('etapa') or estado.get('etapa_anterior') or 'desconhecida', repo.get("Categoria Erro") or "outro"
+                self.falhas[falha] += 1
+            self._registrar('concluido', repositorio=nome, segundos=segundos, posicao=self.concluidos, total=self.total,
+                            mutantes=mutantes_testados, falha=list(falha) if falha else None)
+
+    def _estado_eta(self):
+        """Cópia do que o ETA usa; quem chama precisa segurar `_lock`."""
+        # A campanha atual reflete melhor a máquina e o SDK em uso; o histórico cobre o começo
+        return (self.total, self.concluidos, self.paralelismo, self.duracoes[-200:] or list(self.historico),
+                [e['inicio'] for e in self.em_execucao.values()])
+
+    @staticmethod
+    def _calcular_eta(total, concluidos, paralelismo, amostra, inicios):
+        if not amostra or not total:
+            return None
+        media = statistics.mean(amostra)
+        restantes = max(0, total - concluidos - len(inicios))
+        agora = time.time()
+        em_andamento = sum(max(0.0, media - (agora - inicio)) for inicio in inicios)
+        return (restantes * media + em_andamento) / paralelismo
+
+    def eta(self):
+        """Segundos restantes estimados: repositórios pendentes × duração média (campanha atual e anteriores).
+
+        Não trava `_lock` (é chamado por `metricas`, que já o segura); de outras threads use `resumo`.
+        """
+        return self._calcular_eta(*self._estado_eta())
+
+    def resumo(self):
+        with self._lock:
+            estado = self._estado_eta()
+            concluidos, total = self.concluidos, self.total
+            falhas, mutantes = sum(self.falhas.values()), self.mutantes_testados
+        eta = self._calcular_eta(*estado)
+        if eta is None:
+            texto_eta = "?"
+        else:
+            texto_eta = f"{eta / 3600:.1f} h" if eta >= 3600 else f"{eta / 60:.0f} min"
+        return (f"[{concluidos}/{total}] falhas: {falhas}, "
+                f"mutantes testados: {mutantes}, ETA: {texto_eta}")
+
+    def metricas(self):
+        """Estado atual no formato texto do Prometheus."""
+        with self._lock:
+            linhas = []
+
+            def metrica(nome, tipo, ajuda, valores):
+                linhas.extend([f"# HELP {nome} {ajuda}", f"# TYPE {nome} {tipo}"])
+                linhas.extend(f"{nome}{rotulos} {valor}" for rotulos, valor in valores)
+
+            metrica("campanha_repositorios", "gauge", "Repositórios da campanha", [("", self.total)])
+            metrica("campanha_repositorios_concluidos_total", "counter", "Repositórios finalizados (com ou sem erro)",
+                    [("", self.concluidos)])
+            metrica("campanha_repositorios_em_execucao", "gauge", "Repositórios sendo processados",
+                    [("", len(self.em_execucao))])
+            metrica("campanha_repositorios_antecipados", "gauge", "Repositórios em preparação ou preparados à frente do Stryker",
+                    [("", len(self.antecipados))])
+            metrica("campanha_mutantes_testados_total", "counter", "Mutantes testados nos repositórios concluídos",
+                    [("", self.mutantes_testados)])
+            metrica("campanha_falhas_total", "counter", "Falhas por etapa e categoria",
+                    [(_rotulos(etapa=etapa, categoria=categoria), total) for (etapa, categoria), total in sorted(self.falhas.items())])
+            metrica("campanha_etapa_inicio_timestamp_segundos", "gauge",
+                    "Início da etapa atual de cada repositório (detecta travamentos)",
+                    [(_rotulos(repositorio=nome, etapa=e['etapa']), f"{e['inicio_etapa']:.3f}")
+                     for nome, e in self.em_execucao.items() if 'etapa' in e])
+            metrica("campanha_stryker_mutantes_testados", "gauge", "Progresso do Stryker no repositório em execução",
+                    [(_rotulos(repositorio=nome), e['mutantes']) for nome, e in self.em_execucao.items() if e['mutantes_total']])
+            metrica("campanha_stryker_mutantes", "gauge", "Mutantes a testar no repositório em execução",
+                    [(_rotulos(repositorio=nome), e['mutantes_total']) for nome, e in self.em_execucao.items() if e['mutantes_total']])
+            linhas.extend(["# HELP campanha_etapa_duracao_segundos Tempo gasto em cada etapa",
+                           "# TYPE campanha_etapa_duracao_segundos summary"])
+            for etapa in sorted(self.contagem_etapa):
+                linhas.append(f"campanha_etapa_duracao_segundos_sum{_rotulos(etapa=etapa)} {self.duracoes_etapa[etapa]:.3f}")
+                linhas.append(f"campanha_etapa_duracao_segundos_count{_rotulos(etapa=etapa)} {self.contagem_etapa[etapa]}")
+            eta = self.eta()
+            if eta is not None:
+                metrica("campanha_eta_segundos", "gauge", "Tempo restante estimado", [("", f"{eta:.0f}")])
+            metrica("campanha_ultimo_evento_timestamp_segundos", "gauge", "Momento do último evento de progresso",
+                    [("", f"{self.ultimo_evento:.3f}")])
+            return "\n".join(linhas) + "\n"
+
+    def servir(self, porta=PORTA_METRICAS, host="127.0.0.1"):
+        """Publica /metrics em uma thread de fundo. Retorna o servidor (use shutdown() para parar)."""
+        progresso = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                corpo = progresso.metricas().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *args):
+                pass  # Não polui o console com cada coleta
+
+        servidor = ThreadingHTTPServer((host, porta), Handler)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        print(f"Métricas disponíveis em http://{host}:{porta}/metrics")
+        return servidor
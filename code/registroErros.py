@@ -0,0 +1,212 @@
+import argparse
+import csv
+import gzip
+import hashlib
+import os
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from perfilamento import perfilar
+
+DIRETORIO_LOGS = "Instrumentos/Codigos/logs"
+LIMITE_INLINE = 200  # Mensagens até este tamanho (e de uma linha) ficam direto na coluna 'Erro'
+COLUNAS_ERRO = ["Categoria Erro", "Fingerprint Erro", "Log Erro"]
+# CSVs anteriores aos logs guardam a saída inteira das ferramentas na coluna 'Erro'; quem os lê precisa deste limite
+LIMITE_CAMPO_LEGADO = 100 * 1024 * 1024
+
+# Categoria normalizada: primeira regra que casar com a saída da etapa
+CATEGORIAS = [
+    ('pre_verificacao', r'^Pré-verificação: '),
+    ('sdk_ausente', r'A compatible \.NET SDK was not found|NETSDK1045|NETSDK1141'),
+    ('workload_ausente', r'NETSDK1147|workloads? must be installed'),
+    ('projeto_windows', r'NETSDK1100|Microsoft\.WindowsDesktop'),
+    ('pacote_nuget', r'\bNU1\d{3}\b'),
+    ('compilacao_csharp', r'error CS\d{4}'),
+    ('msbuild', r'error MSB\d{4}|\bMSB\d{4}\b'),
+    ('solucao_ausente', r'Diretório da solução não encontrado'),
+    ('stryker_sem_testes', r'[Nn]o test projects? (were )?found'),
+    ('stryker_falhou', r'Stryker\.NET failed|ERR\]'),
+    ('rede', r'Could not resolve host|unable to access|Connection (timed out|reset)'),
+]
+# Partes voláteis removidas antes do hash: a mesma falha em repositórios diferentes gera o mesmo fingerprint
+NORMALIZACOES = [
+    (r'\[\d{2}:\d{2}:\d{2}', '[<hora>'),
+    (r'\{?[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}\}?', '<guid>'),
+    (r'https?://\S+', '<url>'),
+    (r'[A-Za-z]:\\[^\s"\'\]\)]*|(?<![\w.])/[^\s"\'\]\)]+', '<caminho>'),
+    (r"'[^']*'", "'<nome>'"),
+    (r'\b\d+(\.\d+)*\b', '<n>'),
+    (r'\s+', ' '),
+]
+LINHAS_ASSINATURA = r'\berror\b|ERR\]|fatal:|failed|not found|could not|não'
+MAX_LINHAS_ASSINATURA = 20
+
+def normalizar(linha):
+    for padrao, substituto in NORMALIZACOES:
+        linha = re.sub(padrao, substituto, linha)
+    return linha.strip()
+
+def categorizar(texto, etapa):
+    for categoria, padrao in CATEGORIAS:
+        if re.search(padrao, texto, re.MULTILINE):
+            return categoria
+    return f"{etapa}_outro"
+
+def fingerprint(texto):
+    """Hash curto das linhas de erro normalizadas (ou das primeiras linhas, se nenhuma parecer erro)."""
+    linhas = [l for l in texto.splitlines() if l.strip()]
+    assinatura = [l for l in linhas if re.search(LINHAS_ASSINATURA, l, re.IGNORECASE)] or linhas[:5]
+    vistas = []
+    for linha in map(normalizar, assinatura):
+        if linha not in vistas:
+            vistas.append(linha)
+        if len(vistas) == MAX_LINHAS_ASSINATURA:
+            break
+    return hashlib.sha1("\n".join(vistas).encode('utf-8')).hexdigest()[:12]
+
+def gravar_log(owner, nome, etapa, texto, diretorio=None):
+    """Grava a saída completa da etapa em <diretorio>/<owner>__<nome>/<etapa>.log.gz e retorna o caminho.
+
+    Sem `diretorio`, usa DIRETORIO_LOGS do momento da chamada (quem embute os runners pode redirecioná-lo).
+    """
+    caminho = Path(diretorio or DIRETORIO_LOGS) / f"{owner}__{nome}" / f"{etapa}.log.gz"
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(caminho, 'wt', encoding='utf-8', compresslevel=6) as arquivo:
+        arquivo.write(texto)
+    return caminho.as_posix()
+
+def ler_log(caminho):
+    with gzip.open(caminho, 'rt', encoding='utf-8') as arquivo:
+        return arquivo.read()
+
+def registrar_erro(repo, etapa, erro, diretorio=None):
+    """Converte a mensagem de erro de uma etapa nas colunas do CSV, movendo a saída longa para um log comprimido.
+
+    'Erro' fica só com o resumo ("Erro ao compilar o projeto"); a saída completa vai para 'Log Erro'.
+    """
+    erro = erro or ""
+    resumo, separador, saida = erro.partition(": ")
+    colunas = {"Categoria Erro": categorizar(erro, etapa), "Fingerprint Erro": fingerprint(erro), "Log Erro": ""}
+    if len(erro) <= LIMITE_INLINE and "\n" not in erro:
+        colunas["Erro"] = erro
+    else:
+        colunas["Erro"] = resumo if separador else erro[:LIMITE_INLINE]
+        colunas["Log Erro"] = gravar_log(repo["Proprietário"], repo["Nome"], etapa, erro, diretorio)
+    return colunas
+
+# Etapa de origem deduzida pelo prefixo das mensagens do mutationTestRunnerV2 (para migrar CSVs antigos)
+PREFIXOS_ETAPA = [
+    ("Pré-verificação", "previa"), ("Erro ao clonar", "clone"), ("Diretório da solução", "clone"),
+    ("Erro ao restaurar", "restore"), ("Erro ao compilar", "build"), ("Erro ao executar Stryker", "stryker"),
+    ("Erro inesperado ao executar Stryker", "stryker"),
+]
+
+def etapa_da_mensagem(erro):
+    return next((etapa for prefixo, etapa in PREFIXOS_ETAPA if erro.startswith(prefixo)), "desconhecida")
+
+def migrar_csv(entrada, saida, diretorio=None):
+    """Reescreve um CSV de resultados antigo com o erro completo inline no formato novo. Retorna (linhas, erros)."""
+    csv.field_size_limit(LIMITE_CAMPO_LEGADO)
+    with open(entrada, mode='r', encoding='utf-8') as file:
+        reader = csv.DictReader(file)
+        fieldnames = list(reader.fieldnames)
+        linhas = list(reader)
+
+    if "Erro" in fieldnames:
+        posicao = fieldnames.index("Erro") + 1
+        fieldnames[posicao:posicao] = [c for c in COLUNAS_ERRO if c not in fieldnames]
+    erros = 0
+    for linha in linhas:
+        if linha.get("Erro") and not linha.get("Fingerprint Erro"):
+            linha.update(registrar_erro(linha, etapa_da_mensagem(linha["Erro"]), linha["Erro"], diretorio))
+            erros += 1
+
+    with open(saida, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, restval="")
+        writer.writeheader()
+        writer.writerows(linhas)
+    return len(linhas), erros
+
+def estender_cabecalho(csv_path, fieldnames):
+    """Cabeçalho para acrescentar linhas a um CSV de resultados existente.
+
+    Se faltam colunas atuais no arquivo, ele é reescrito com elas (vazias nas linhas antigas) em vez de as linhas
+    novas perderem esses campos; colunas que só o arquivo tem são mantidas ao final.
+    """
+    with open(csv_path, mode='r', encoding='utf-8') as file:
+        cabecalho = next(csv.reader(file), None)
+    if not cabecalho:
+        return fieldnames
+    if set(fieldnames) <= set(cabecalho):
+        return cabecalho
+
+    csv.field_size_limit(LIMITE_CAMPO_LEGADO)
+    with open(csv_path, mode='r', encoding='utf-8') as file:
+        linhas = list(csv.DictReader(file))
+    cabecalho = fieldnames + [campo for campo in cabecalho if campo not in fieldnames]
+    temporario = f"{csv_path}.tmp"
+    with open(temporario, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=cabecalho, restval="")
+        writer.writeheader()
+        writer.writerows(linhas)
+    os.replace(temporario, csv_path)
+    print(f"Cabeçalho de {csv_path} estendido com as colunas atuais ({len(linhas)} linhas preservadas).")
+    return cabecalho
+
+def agrupar(caminhos):
+    """Agrupa as falhas de uma ou mais campanhas por (categoria, fingerprint)."""
+    grupos = defaultdict(list)
+    for caminho in caminhos:
+        with open(caminho, mode='r', encoding='utf-8') as file:
+            for linha in csv.DictReader(file):
+                if linha.get("Fingerprint Erro"):
+                    grupos[(linha["Categoria Erro"], linha["Fingerprint Erro"])].append(linha)
+    return sorted(grupos.items(), key=lambda item: len(item[1]), reverse=True)
+
+def _exemplo(linhas, max_linhas=3):
+    """Primeiras linhas de erro do log de um representante do grupo."""
+    for linha in linhas:
+        if linha.get("Log Erro") and os.path.exists(linha["Log Erro"]):
+            texto = ler_log(linha["Log Erro"])
+            relevantes = [l.strip() for l in texto.splitlines() if re.search(LINHAS_ASSINATURA, l, re.IGNORECASE)]
+            return relevantes[:max_linhas] or texto.splitlines()[:max_linhas]
+    return [linhas[0].get("Erro", "")]
+
+def main():
+    parser = argparse.ArgumentParser(description="Logs de erro comprimidos e agrupamento de falhas por fingerprint.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_agrupar = sub.add_parser("agrupar", help="Agrupa as falhas dos CSVs de resultados por categoria e fingerprint")
+    p_agrupar.add_argument("csv", nargs="+")
+    p_agrupar.add_argument("--saida", help="Salva os grupos neste CSV")
+
+    p_migrar = sub.add_parser("migrar", help="Move os erros inline de um CSV antigo para logs comprimidos")
+    p_migrar.add_argument("entrada")
+    p_migrar.add_argument("saida")
+    p_migrar.add_argument("--logs", default=DIRETORIO_LOGS)
+    args = parser.parse_args()
+
+    if args.comando == "migrar":
+        total, erros = migrar_csv(args.entrada, args.saida, args.logs)
+        antes, depois = os.path.getsize(args.entrada), os.path.getsize(args.saida)
+        print(f"{total} linhas ({erros} com erro) salvas em {args.saida}: {antes / 1024:.0f} KB -> {depois / 1024:.0f} KB")
+        return
+
+    grupos = agrupar(args.csv)
+    for (categoria, impressao), linhas in grupos:
+        nomes = ", ".join(l["Nome"] for l in linhas[:5]) + (" ..." if len(linhas) > 5 else "")
+        print(f"\n[{len(linhas):>3}] {categoria} ({impressao}): {nomes}")
+        for trecho in _exemplo(linhas):
+            print(f"      {trecho[:160]}")
+
+    if args.saida:
+        with open(args.saida, mode='w', newline='', encoding='utf-8') as file:
+            writer = csv.writer(file)
+            writer.writerow(["Categoria Erro", "Fingerprint Erro", "Repositórios", "Nomes"])
+            for (categoria, impressao), linhas in grupos:
+                writer.writerow([categoria, impressao, len(linhas), ";".join(l["Nome"] for l in linhas)])
+        print(f"\nGrupos salvos em {args.saida}")
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,144 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from carregarDados import carregar_resultados
+from perfilamento import perfilar
+
+# Métricas comparadas duas a duas
+METRICAS = [
+    'Cobertura Linha (%)', 'Cobertura Método (%)', 'Mutation Score', 'Mutantes Erro Compilação (%)',
+    'Idade (anos)', 'Estrelas', 'Total Mutants', 'Time Elapsed (s)'
+]
+GRUPO_TODOS = 'TODOS'
+MINIMO_OBSERVACOES = 3
+
+def _expandir_grupos(df, coluna_grupo, incluir_todos):
+    """Repete as linhas no grupo TODOS para que ele seja calculado na mesma passada dos demais."""
+    grupos = df[coluna_grupo].astype(str)
+    if not incluir_todos:
+        return df, grupos
+    return pd.concat([df, df], ignore_index=True), pd.concat([grupos, pd.Series(GRUPO_TODOS, index=grupos.index)], ignore_index=True)
+
+def _momentos(X, M, G):
+    """Somas por (grupo, x, y) considerando apenas as linhas em que x e y são válidos."""
+    Xz = np.where(M, X, 0.0)
+    Mf = M.astype(float)
+    n = np.einsum('rg,ri,rj->gij', G, Mf, Mf, optimize=True)
+    sx = np.einsum('rg,ri,rj->gij', G, Xz, Mf, optimize=True)
+    sxx = np.einsum('rg,ri,rj->gij', G, Xz * Xz, Mf, optimize=True)
+    sxy = np.einsum('rg,ri,rj->gij', G, Xz, Xz, optimize=True)
+    sy = sx.transpose(0, 2, 1)
+    syy = sxx.transpose(0, 2, 1)
+    return n, sx, sy, sxx, syy, sxy
+
+def _pearson(X, M, G):
+    """Regressão de y (coluna j) sobre x (coluna i) e correlação de Pearson para todos os pares e grupos."""
+    # Centralizar pelas médias globais reduz o cancelamento numérico sem mudar covariâncias
+    deslocamento = np.nanmean(np.where(M, X, np.nan), axis=0)
+    deslocamento = np.nan_to_num(deslocamento)
+    n, sx, sy, sxx, syy, sxy = _momentos(X - deslocamento, M, G)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        media_x = sx / n
+        media_y = sy / n
+        ssx = sxx - sx * media_x
+        ssy = syy - sy * media_y
+        spxy = sxy - sx * media_y
+        slope = spxy / ssx
+        r = np.clip(spxy / np.sqrt(ssx * ssy), -1.0, 1.0)
+        gl = n - 2
+        t = r * np.sqrt(gl / ((1.0 - r) * (1.0 + r)))
+        p = 2 * stats.t.sf(np.abs(t), gl)
+        p = np.where(np.abs(r) == 1.0, 0.0, p)
+        std_err = np.sqrt((1 - r ** 2) * ssy / ssx / gl)
+        intercept = (media_y + deslocamento[None, None, :]) - slope * (media_x + deslocamento[None, :, None])
+        intercept_std_err = std_err * np.sqrt(ssx / n + (media_x + deslocamento[None, :, None]) ** 2)
+
+    invalido = n < MINIMO_OBSERVACOES
+    resultado = {'n': n, 'slope': slope, 'intercept': intercept, 'pearson_r': r, 'pearson_p': p,
+                 'std_err': std_err, 'intercept_std_err': intercept_std_err}
+    return {k: (v if k == 'n' else np.where(invalido, np.nan, v)) for k, v in resultado.items()}
+
+def _spearman(dados, metricas, grupos, M, G, n):
+    """Spearman = Pearson sobre postos. Os postos são calculados por grupo e coluna de uma vez;
+    só os pares cujo padrão de valores ausentes difere das colunas são reclassificados à parte."""
+    postos = dados[metricas].apply(pd.to_numeric, errors='coerce').groupby(grupos.to_numpy()).rank().reindex(dados.index).to_numpy(dtype=float)
+    pearson_postos = _pearson(postos, M, G)
+    rho, p = pearson_postos['pearson_r'], pearson_postos['pearson_p']
+
+    validos_por_coluna = np.einsum('rg,ri->gi', G, M.astype(float))
+    divergentes = (n != validos_por_coluna[:, :, None]) | (n != validos_por_coluna[:, None, :])
+    divergentes &= n >= MINIMO_OBSERVACOES
+    nomes_grupos = list(pd.Categorical(grupos).categories)
+    for g, i, j in zip(*np.nonzero(divergentes)):
+        if i >= j:
+            continue
+        linhas = (G[:, g] > 0) & M[:, i] & M[:, j]
+        resultado = stats.spearmanr(dados.loc[linhas, metricas[i]], dados.loc[linhas, metricas[j]])
+        rho[g, i, j] = rho[g, j, i] = resultado.statistic
+        p[g, i, j] = p[g, j, i] = resultado.pvalue
+    return rho, p, nomes_grupos
+
+def regressao_todos_pares(df, metricas=METRICAS, coluna_grupo='Arquitetura', incluir_todos=True):
+    """Calcula regressão linear, Pearson e Spearman para todos os pares de métricas em todos os grupos.
+
+    Retorna uma tabela longa com uma linha por (grupo, x, y), com y regredido sobre x.
+    """
+    metricas = [m for m in metricas if m in df.columns]
+    dados, grupos = _expandir_grupos(df, coluna_grupo, incluir_todos)
+    categorias = pd.Categorical(grupos)
+    G = np.eye(len(categorias.categories))[categorias.codes]
+    X = dados[metricas].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    M = ~np.isnan(X)
+
+    pearson = _pearson(X, M, G)
+    rho, p_spearman, nomes_grupos = _spearman(dados, metricas, grupos, M, G, pearson['n'])
+
+    g, i, j = np.meshgrid(np.arange(len(nomes_grupos)), np.arange(len(metricas)), np.arange(len(metricas)), indexing='ij')
+    fora_diagonal = (i != j).ravel()
+    indice = (g.ravel()[fora_diagonal], i.ravel()[fora_diagonal], j.ravel()[fora_diagonal])
+
+    tabela = pd.DataFrame({
+        'Grupo': np.asarray(nomes_grupos, dtype=object)[indice[0]],
+        'X': np.asarray(metricas, dtype=object)[indice[1]],
+        'Y': np.asarray(metricas, dtype=object)[indice[2]],
+        'n': pearson['n'][indice].astype(int),
+        'Slope': pearson['slope'][indice],
+        'Intercepto': pearson['intercept'][indice],
+        'Erro Padrão': pearson['std_err'][indice],
+        'Erro Padrão Intercepto': pearson['intercept_std_err'][indice],
+        'Pearson r': pearson['pearson_r'][indice],
+        'Pearson p': pearson['pearson_p'][indice],
+        'Spearman rho': rho[indice],
+        'Spearman p': p_spearman[indice],
+    })
+    return tabela
+
+def main():
+    parser = argparse.ArgumentParser(description="Regressão e correlação entre todos os pares de métricas, por grupo.")
+    parser.add_argument("--csv", type=Path, default=Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv'))
+    parser.add_argument("--metricas", nargs="+", default=METRICAS)
+    parser.add_argument("--grupo", default='Arquitetura', help="Coluna usada para agrupar")
+    parser.add_argument("--saida", type=Path, help="Salva a tabela completa neste CSV")
+    parser.add_argument("--alfa", type=float, default=0.05, help="Nível de significância para o resumo impresso")
+    args = parser.parse_args()
+
+    df = carregar_resultados(args.csv)
+    tabela = regressao_todos_pares(df, args.metricas, args.grupo)
+
+    if args.saida:
+        tabela.to_csv(args.saida, index=False)
+        print(f"Tabela salva em {args.saida} ({len(tabela)} linhas)")
+
+    print(f"\n=== PARES COM CORRELAÇÃO SIGNIFICATIVA (p < {args.alfa}) ===")
+    significativos = tabela[(tabela['X'] < tabela['Y']) & ((tabela['Pearson p'] < args.alfa) | (tabela['Spearman p'] < args.alfa))]
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(significativos[['Grupo', 'X', 'Y', 'n', 'Slope', 'Pearson r', 'Pearson p', 'Spearman rho', 'Spearman p']]
+              .to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,222 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from perfilamento import perfilar
+
+# Especificação padrão: reproduz teste_normalidade, teste_maanWhitney e as estatísticas do generateCharts
+ESPECIFICACAO_PADRAO = {
+    "csv": "Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv",
+    "coluna_grupo": "Arquitetura",
+    "grupos": ["MVC", "MVVM"],
+    "metricas": ["Mutation Score", "Cobertura Linha (%)", "Mutantes Erro Compilação (%)"],
+    "testes": ["descritivas", "shapiro", "mannwhitney", "permutacao", "regressao"],
+    "regressoes": [
+        ["Cobertura Linha (%)", "Mutation Score"],
+        ["Idade (anos)", "Mutation Score"]
+    ],
+    "parametros": {
+        "alfa": 0.05,
+        "permutacao": {"n_permutacoes": 50000, "n_bootstrap": 20000, "semente": 42}
+    }
+}
+
+# Incrementar quando o cálculo de algum teste mudar, para invalidar o cache
+VERSAO_CALCULO = 1
+DIRETORIO_CACHE = '.cache_relatorio'
+MINIMO_OBSERVACOES = 3
+
+# 1. TESTES (cada função recebe apenas listas/valores simples e importa o que precisa)
+def _descritivas(unidade):
+    import numpy as np
+    dados = np.asarray(unidade['valores'][0], dtype=float)
+    q1, mediana, q3 = np.quantile(dados, [0.25, 0.5, 0.75])
+    return {'n': len(dados), 'q1': float(q1), 'mediana': float(mediana), 'q3': float(q3), 'iqr': float(q3 - q1)}
+
+def _shapiro(unidade):
+    from scipy.stats import shapiro
+    dados = unidade['valores'][0]
+    stat, p = shapiro(dados)
+    return {'n': len(dados), 'W': float(stat), 'p_valor': float(p),
+            'normal': bool(p > unidade['parametros']['alfa'])}
+
+def _mannwhitney(unidade):
+    from scipy.stats import mannwhitneyu
+    x, y = unidade['valores']
+    stat, p = mannwhitneyu(x, y, alternative='two-sided')
+    return {'n': [len(x), len(y)], 'U': float(stat), 'p_valor': float(p),
+            'significativo': bool(p < unidade['parametros']['alfa'])}
+
+def _permutacao(unidade):
+    import pandas as pd
+    from testesReamostragem import comparar_grupos
+    x, y = unidade['valores']
+    g1, g2 = unidade['grupos']
+    df = pd.DataFrame({'grupo': [g1] * len(x) + [g2] * len(y), 'valor': list(x) + list(y)})
+    parametros = unidade['parametros']['permutacao']
+    resultado = comparar_grupos(df, ['valor'], (g1, g2), parametros['n_permutacoes'], parametros['n_bootstrap'],
+                                parametros['semente'], workers=1, coluna_grupo='grupo')[0]
+    resultado.pop('metrica')
+    return resultado
+
+def _regressao(unidade):
+    from scipy.stats import linregress
+    x, y = unidade['valores']
+    r = linregress(x, y)
+    return {'n': len(x), 'slope': float(r.slope), 'intercepto': float(r.intercept), 'r': float(r.rvalue),
+            'p_valor': float(r.pvalue), 'erro_padrao': float(r.stderr)}
+
+TESTES = {
+    'descritivas': _descritivas,
+    'shapiro': _shapiro,
+    'mannwhitney': _mannwhitney,
+    'permutacao': _permutacao,
+    'regressao': _regressao,
+}
+# Parâmetros que cada teste lê: só eles entram na unidade e na chave do cache
+PARAMETROS_TESTE = {
+    'shapiro': ['alfa'],
+    'mannwhitney': ['alfa'],
+    'permutacao': ['permutacao'],
+}
+
+# 2. PLANEJAMENTO
+def _valores(df, coluna_grupo, grupo, colunas):
+    """Valores válidos (sem N/A em nenhuma das colunas) de um grupo."""
+    dados = df[df[coluna_grupo] == grupo].dropna(subset=colunas)
+    return [dados[c].astype(float).tolist() for c in colunas]
+
+def planejar(df, espec):
+    """Expande a especificação em unidades independentes de cálculo."""
+    coluna_grupo, grupos = espec['coluna_grupo'], espec['grupos']
+    parametros = espec['parametros']
+    unidades = []
+
+    for teste in espec['testes']:
+        if teste in ('descritivas', 'shapiro'):
+            for metrica in espec['metricas']:
+                for grupo in grupos:
+                    unidades.append({'teste': teste, 'metrica': metrica, 'grupos': [grupo],
+                                     'valores': _valores(df, coluna_grupo, grupo, [metrica])})
+        elif teste in ('mannwhitney', 'permutacao'):
+            for metrica in espec['metricas']:
+                valores = [_valores(df, coluna_grupo, grupo, [metrica])[0] for grupo in grupos[:2]]
+                unidades.append({'teste': teste, 'metrica': metrica, 'grupos': grupos[:2], 'valores': valores})
+        elif teste == 'regressao':
+            for x, y in espec['regressoes']:
+                for grupo in grupos:
+                    unidades.append({'teste': teste, 'metrica': f"{y} ~ {x}", 'grupos': [grupo],
+                                     'valores': _valores(df, coluna_grupo, grupo, [x, y])})
+        else:
+            raise ValueError(f"Teste desconhecido na especificação: {teste}")
+
+    for unidade in unidades:
+        unidade['parametros'] = {nome: parametros[nome] for nome in PARAMETROS_TESTE.get(unidade['teste'], [])}
+        unidade['chave'] = chave_unidade(unidade)
+    return unidades
+
+def chave_unidade(unidade):
+    """Hash de tudo que determina o resultado de uma unidade: teste, parâmetros que ele usa e dados de entrada."""
+    conteudo = {k: unidade[k] for k in ('teste', 'grupos', 'valores', 'parametros')}
+    conteudo['versao'] = VERSAO_CALCULO
+    return hashlib.sha256(json.dumps(conteudo, sort_keys=True).encode('utf-8')).hexdigest()
+
+# 3. EXECUÇÃO
+def _executar_unidade(unidade):
+    if any(len(v) < MINIMO_OBSERVACOES for v in unidade['valores']):
+        return {'erro': 'Dados insuficientes', 'n': [len(v) for v in unidade['valores']]}
+    return TESTES[unidade['teste']](unidade)
+
+def executar(unidades, diretorio_cache, workers=None):
+    """Executa as unidades que não estão no cache, em paralelo, e devolve os resultados na ordem do plano."""
+    diretorio_cache = Path(diretorio_cache)
+    diretorio_cache.mkdir(parents=True, exist_ok=True)
+    resultados = {}
+    pendentes = []
+
+    for unidade in unidades:
+        arquivo = diretorio_cache / f"{unidade['chave']}.json"
+        if arquivo.exists():
+            resultados[unidade['chave']] = json.loads(arquivo.read_text(encoding='utf-8'))
+        elif unidade['chave'] not in {u['chave'] for u in pendentes}:
+            pendentes.append(unidade)
+
+    print(f"Unidades de cálculo: {len(unidades)} (em cache: {len(unidades) - len(pendentes)}, a calcular: {len(pendentes)})")
+    if pendentes:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for unidade, resultado in zip(pendentes, executor.map(_executar_unidade, pendentes)):
+                resultados[unidade['chave']] = resultado
+                (diretorio_cache / f"{unidade['chave']}.json").write_text(json.dumps(resultado, ensure_ascii=False), encoding='utf-8')
+
+    return [{'teste': u['teste'], 'metrica': u['metrica'], 'grupos': u['grupos'], 'resultado': resultados[u['chave']]}
+            for u in unidades]
+
+# 4. RELATÓRIO
+def _formatar(valor):
+    if isinstance(valor, float):
+        return f"{valor:.4f}"
+    if isinstance(valor, list):
+        return "; ".join(_formatar(v) for v in valor)
+    return str(valor)
+
+def gerar_markdown(espec, itens):
+    linhas = ["# Relatório estatístico", "", f"Fonte: `{espec['csv']}`", ""]
+    for teste in espec['testes']:
+        do_teste = [item for item in itens if item['teste'] == teste]
+        colunas = []
+        for item in do_teste:
+            colunas.extend(c for c in item['resultado'] if c not in colunas)
+        linhas += [f"## {teste}", "", "| Métrica | Grupos | " + " | ".join(colunas) + " |",
+                   "|---|---|" + "---|" * len(colunas)]
+        for item in do_teste:
+            celulas = [_formatar(item['resultado'].get(c, "")) for c in colunas]
+            linhas.append(f"| {item['metrica']} | {' vs '.join(item['grupos'])} | " + " | ".join(celulas) + " |")
+        linhas.append("")
+    return "\n".join(linhas)
+
+def _mesclar(base, sobreposicao):
+    """Sobrepõe chave a chave, descendo nos dicionários aninhados (listas e valores são substituídos)."""
+    for chave, valor in sobreposicao.items():
+        if isinstance(valor, dict) and isinstance(base.get(chave), dict):
+            _mesclar(base[chave], valor)
+        else:
+            base[chave] = valor
+    return base
+
+def carregar_especificacao(caminho):
+    """Especificação padrão com a do arquivo por cima; um bloco `parametros` parcial mantém os demais padrões."""
+    espec = json.loads(json.dumps(ESPECIFICACAO_PADRAO))
+    if caminho:
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            _mesclar(espec, json.load(arquivo))
+    return espec
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório estatístico declarativo (métricas × grupos × testes).")
+    parser.add_argument("--espec", type=Path, help="Arquivo JSON com a especificação (sobrepõe a padrão)")
+    parser.add_argument("--saida", type=Path, default=Path('relatorio'), help="Prefixo dos arquivos .json e .md")
+    parser.add_argument("--cache", type=Path, default=Path(DIRETORIO_CACHE))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    from carregarDados import carregar_resultados
+
+    inicio = time.perf_counter()
+    espec = carregar_especificacao(args.espec)
+    df = carregar_resultados(Path(espec['csv']))
+    itens = executar(planejar(df, espec), args.cache, args.workers)
+
+    args.saida.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.saida.with_suffix('.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump({'especificacao': espec, 'resultados': itens}, arquivo, indent=2, ensure_ascii=False)
+    args.saida.with_suffix('.md').write_text(gerar_markdown(espec, itens), encoding='utf-8')
+
+    print(f"Relatório salvo em {args.saida.with_suffix('.json')} e {args.saida.with_suffix('.md')} "
+          f"({time.perf_counter() - inicio:.2f}s)")
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,134 @@
+import argparse
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from arquivoSaidas import DIRETORIO_ARQUIVO, ArquivoSaidas, ler_indice
+from coverletRunner import extract_coverage
+from mutationTestRunnerV2 import extract_stryker_metrics
+from perfilamento import perfilar
+from registroErros import LIMITE_CAMPO_LEGADO
+from strykerPorProjeto import somar_metricas
+
+def agrupar_resultados(registros):
+    """[(ferramenta, csv, nome, linha, etapas)] com o último resultado de cada repositório por CSV.
+
+    As etapas de um resultado são as registradas na mesma sessão, para o mesmo repositório, desde o resultado anterior.
+    Forks e projetos de template repetem o nome: entre resultados, o repositório é identificado também pelo proprietário.
+    """
+    pendentes = {}
+    resultados = {}
+    for registro in registros:
+        chave = (registro['sessao'], registro['nome'])
+        if registro['etapa'] != 'resultado':
+            pendentes.setdefault(chave, []).append(registro)
+            continue
+        etapas = pendentes.pop(chave, [])
+        resultados[(registro['csv'], _chave(registro['linha']))] = (registro['ferramenta'], registro['csv'], registro['nome'],
+                                                           registro['linha'], etapas)
+    return list(resultados.values())
+
+def _chave(linha):
+    return linha.get("Proprietário"), linha["Nome"]
+
+def _texto(arquivo, etapa, saida='stdout'):
+    sha = etapa['saidas'].get(saida)
+    return arquivo.ler(sha) if sha else ""
+
+def reprocessar_stryker(linha, etapas, arquivo):
+    """Recalcula as métricas do Stryker a partir das saídas arquivadas (a linha volta inalterada se não há como)."""
+    if linha.get("Amostragem"):
+        return linha  # A estimativa por amostragem combina várias rodadas e relatórios: fica como foi gravada
+    execucoes = [e for e in etapas if e['etapa'] == 'stryker']
+    partes = {e['parte']: e for e in execucoes if e['parte'] is not None}
+    if partes:
+        if any(e['codigo'] != 0 for e in partes.values()):
+            return linha
+        metricas = somar_metricas([extract_stryker_metrics(_texto(arquivo, e)) for e in partes.values()], 0)
+        metricas["Time Elapsed"] = linha.get("Time Elapsed", metricas["Time Elapsed"])  # Tempo de parede da solução
+        return {**linha, **metricas}
+    # A última execução é a da solução; as anteriores (se houver) são as medições do ajuste do Stryker
+    completas = [e for e in execucoes if e['parte'] is None]
+    if not completas or completas[-1]['codigo'] != 0:
+        return linha
+    return {**linha, **extract_stryker_metrics(_texto(arquivo, completas[-1]))}
+
+def reprocessar_coverlet(linha, etapas, arquivo):
+    """Recalcula a cobertura a partir da saída arquivada do Coverlet."""
+    execucoes = [e for e in etapas if e['etapa'] == 'coverlet']
+    if not execucoes:
+        return linha
+    line_cov, method_cov = extract_coverage(_texto(arquivo, execucoes[-1]))
+    if line_cov is None or method_cov is None:
+        return {**linha, "Cobertura Linha (%)": "Erro", "Cobertura Método (%)": "Erro", "Status": "Erro no Coverlet"}
+    return {**linha, "Cobertura Linha (%)": f"{line_cov:.2f}%", "Cobertura Método (%)": f"{method_cov:.2f}%",
+            "Status": "Sucesso"}
+
+REPROCESSADORES = {
+    'stryker': reprocessar_stryker,
+    'coverlet': reprocessar_coverlet,
+}
+
+def _reprocessar_resultado(tarefa):
+    diretorio, (ferramenta, _, _, linha, etapas) = tarefa
+    return REPROCESSADORES[ferramenta](linha, etapas, ArquivoSaidas(diretorio))
+
+def reprocessar(diretorio=DIRETORIO_ARQUIVO, workers=None):
+    """{csv: {(proprietário, nome): linha recalculada}} para todos os resultados do arquivo, em paralelo entre os núcleos."""
+    resultados = agrupar_resultados(ler_indice(diretorio))
+    linhas = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        tarefas = [(str(diretorio), resultado) for resultado in resultados]
+        for (_, caminho_csv, _, original, _), linha in zip(resultados, executor.map(_reprocessar_resultado, tarefas, chunksize=8)):
+            linhas.setdefault(caminho_csv, {})[_chave(original)] = linha
+    return linhas
+
+def gravar_csv(caminho_csv, linhas, destino):
+    """Grava o CSV com as linhas recalculadas no lugar das originais (as que não estão no arquivo são mantidas).
+
+    Retorna (linhas gravadas, linhas alteradas).
+    """
+    originais, cabecalho = [], list(next(iter(linhas.values())).keys())
+    if os.path.exists(caminho_csv):
+        csv.field_size_limit(LIMITE_CAMPO_LEGADO)
+        with open(caminho_csv, mode='r', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            cabecalho, originais = list(reader.fieldnames), list(reader)
+
+    alteradas = 0
+    saida = []
+    for original in originais:
+        nova = linhas.pop(_chave(original), None)
+        if nova is not None:
+            nova = {coluna: "" if nova.get(coluna) is None else str(nova.get(coluna)) for coluna in cabecalho}
+            alteradas += nova != {coluna: original.get(coluna) or "" for coluna in cabecalho}
+        saida.append(nova or original)
+    saida += linhas.values()  # Resultados arquivados que não estão no CSV original
+
+    Path(destino).parent.mkdir(parents=True, exist_ok=True)
+    with open(destino, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=cabecalho, restval="", extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(saida)
+    return len(saida), alteradas + len(saida) - len(originais)
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstrói os CSVs de resultados recalculando as métricas a partir das saídas arquivadas.")
+    parser.add_argument("--diretorio", default=DIRETORIO_ARQUIVO, help="Diretório do arquivo de saídas")
+    parser.add_argument("--saida", help="Diretório dos CSVs reconstruídos (padrão: <diretorio>/reprocessado)")
+    parser.add_argument("--sobrescrever", action="store_true", help="Regrava os CSVs de resultados originais")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    por_csv = reprocessar(args.diretorio, args.workers)
+    if not por_csv:
+        print(f"Nenhum resultado arquivado em {args.diretorio}")
+        return
+    for caminho_csv, linhas in por_csv.items():
+        destino = caminho_csv if args.sobrescrever else Path(args.saida or Path(args.diretorio) / "reprocessado") / Path(caminho_csv).name
+        total, alteradas = gravar_csv(caminho_csv, linhas, destino)
+        print(f"{destino}: {total} linhas, {alteradas} com métricas alteradas")
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,413 @@
+"""Simulador de git, dotnet (restore/build/test/stryker) e coverlet para testes de carga sem rede nem .NET.
+
+O comportamento de cada etapa vem do JSON apontado por SIMULADOR_CONFIG:
+
+    {"padrao": {"build": {"duracao": 0.5, "cpu": 0.3}, ...},
+     "repos": {"MeuRepo": {"build": {"codigo_saida": 1}, "diretorio_sln": "src"}}}
+
+Parâmetros de uma etapa: duracao (s com um núcleo), fracao_serial (parte da duração que não diminui com
+--concurrency/-maxcpucount), cpu (fração de 0 a 1 do tempo em laço ocupado), memoria_mb, linhas_ruido,
+codigo_saida, probabilidade_falha, travar e tempo_travamento. Para o Stryker também
+mutantes e pontuacao (0 a 1); para o Coverlet linha e metodo (%). Por repositório, projetos e arquivos
+definem quantos projetos de código e arquivos .cs por projeto (número ou lista) o clone cria; o projeto de
+testes referencia todos eles. O Stryker executado no diretório de um projeto (--test-project) só muta esse projeto. Com --mutate ou --reporter json
+o Stryker sorteia mutantes por arquivo (determinísticos), só dos arquivos filtrados, e grava o relatório em
+--output/reports/mutation-report.json. A stryker-config.json de --config-file é respeitada: coverage-analysis
+multiplica a duração por fatores_cobertura[modo] (e troca resultados nos modos de cobertura_divergente) e
+ignore-mutations remove mutadores; os de mutadores_invalidos sempre dão CompileError. Cada execução é registrada como uma linha JSON no arquivo apontado
+por SIMULADOR_EVENTOS, se definido.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ARQUIVO_MARCADOR = '.simulador_repo'
+VERSAO_SDK = '8.0.100'
+TFM = 'net8.0'
+FATIA = 0.05  # Granularidade (s) da alternância entre CPU ocupada e espera
+MUTADORES = ['Arithmetic operator', 'Equality mutation', 'Boolean mutation', 'Logical mutation',
+             'String mutation', 'Statement mutation', 'Block removal mutation', 'Linq method mutation']
+
+ETAPA_PADRAO = {
+    'duracao': 0.0, 'fracao_serial': 1.0, 'cpu': 0.0, 'memoria_mb': 0, 'linhas_ruido': 0, 'codigo_saida': 0,
+    'probabilidade_falha': 0.0, 'travar': False, 'tempo_travamento': 86400,
+    'mutantes': 400, 'pontuacao': 0.6, 'linha': 70.0, 'metodo': 75.0,
+    'fatores_cobertura': {'perTest': 1.0, 'all': 1.6, 'perTestInIsolation': 2.5, 'off': 3.0},
+    'cobertura_divergente': [], 'mutadores_invalidos': [],
+}
+NOMES_CONFIG = {'Arithmetic operator': 'arithmetic', 'Equality mutation': 'equality', 'Boolean mutation': 'boolean',
+                'Logical mutation': 'logical', 'String mutation': 'string', 'Statement mutation': 'statement',
+                'Block removal mutation': 'block', 'Linq method mutation': 'linq'}
+
+def carregar_config():
+    caminho = os.environ.get('SIMULADOR_CONFIG')
+    if caminho and os.path.exists(caminho):
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    return {}
+
+def parametros(config, repo, etapa):
+    """Parâmetros da etapa: padrão do simulador < padrão do config < específico do repositório."""
+    valores = dict(ETAPA_PADRAO)
+    valores.update(config.get('padrao', {}).get(etapa, {}))
+    valores.update(config.get('repos', {}).get(repo, {}).get(etapa, {}))
+    return valores
+
+def encontrar_repo(inicio):
+    """Sobe a partir de `inicio` até achar o marcador gravado pelo git clone simulado."""
+    caminho = Path(inicio).resolve()
+    for diretorio in [caminho, *caminho.parents]:
+        marcador = diretorio / ARQUIVO_MARCADOR
+        if marcador.is_file():
+            return marcador.read_text(encoding='utf-8').strip(), diretorio
+    return None, None
+
+def simular_custo(p):
+    """Consome tempo, CPU e memória conforme os parâmetros (ou trava, se pedido)."""
+    memoria = bytearray(int(p['memoria_mb'] * 2 ** 20))
+    for i in range(0, len(memoria), 4096):
+        memoria[i] = 1  # Toca as páginas para que a memória seja de fato alocada
+
+    if p['travar']:
+        time.sleep(p['tempo_travamento'])
+
+    fim = time.monotonic() + p['duracao']
+    while time.monotonic() < fim:
+        fatia = min(FATIA, fim - time.monotonic())
+        ocupado_ate = time.monotonic() + fatia * p['cpu']
+        while time.monotonic() < ocupado_ate:
+            pass
+        time.sleep(max(0.0, fatia * (1 - p['cpu'])))
+    return len(memoria)
+
+def nucleos_pedidos(args):
+    """Núcleos pedidos por --concurrency (Stryker) ou -maxcpucount (build); None se não limitados."""
+    for i, arg in enumerate(args):
+        if arg == '--concurrency' and i + 1 < len(args):
+            return int(args[i + 1])
+        if arg.startswith('-maxcpucount:'):
+            return int(arg.split(':', 1)[1])
+    return None
+
+def ajustar_duracao(p, nucleos):
+    """Lei de Amdahl: só a parte paralelizável da duração diminui com mais núcleos."""
+    nucleos = nucleos or os.cpu_count() or 1
+    p['duracao'] *= p['fracao_serial'] + (1 - p['fracao_serial']) / nucleos
+
+def codigo_saida(p):
+    if p['codigo_saida']:
+        return p['codigo_saida']
+    if p['probabilidade_falha'] and random.random() < p['probabilidade_falha']:
+        return 1
+    return 0
+
+def imprimir_ruido(p, etapa):
+    for i in range(p['linhas_ruido']):
+        print(f"[{time.strftime('%H:%M:%S')} DBG] {etapa}: mensagem de diagnóstico {i}")
+
+def _hora():
+    return time.strftime('%H:%M:%S')
+
+def _duracao_formatada(segundos):
+    horas, resto = divmod(segundos, 3600)
+    minutos, resto = divmod(resto, 60)
+    return f"{int(horas):02d}:{int(minutos):02d}:{resto:010.7f}"
+
+def registrar_evento(ferramenta, etapa, repo, inicio, codigo, memoria):
+    caminho = os.environ.get('SIMULADOR_EVENTOS')
+    if not caminho:
+        return
+    evento = {'ferramenta': ferramenta, 'etapa': etapa, 'repo': repo, 'inicio': inicio, 'fim': time.time(),
+              'codigo': codigo, 'memoria_mb': memoria / 2 ** 20, 'pid': os.getpid()}
+    # Linhas curtas em modo append são atômicas: vários processos podem gravar no mesmo arquivo
+    with open(caminho, 'a', encoding='utf-8') as arquivo:
+        arquivo.write(json.dumps(evento) + "\n")
+
+# GIT
+def _csproj(projeto, tfm, teste, referencias=()):
+    pacotes = ('<ItemGroup><PackageReference Include="Microsoft.NET.Test.Sdk" Version="17.9.0" />'
+               '<PackageReference Include="xunit" Version="2.7.0" /></ItemGroup>') if teste else ''
+    if referencias:
+        pacotes += '<ItemGroup>' + ''.join(f'<ProjectReference Include="..\\{r}\\{r}.csproj" />' for r in referencias) + '</ItemGroup>'
+    return (f'<Project Sdk="Microsoft.NET.Sdk"><PropertyGroup><TargetFramework>{tfm}</TargetFramework>'
+            f'</PropertyGroup>{pacotes}</Project>\n')
+
+def git_clone(config, args):
+    url, destino = args[-2], Path(args[-1])
+    repo = url.rstrip('/').split('/')[-1].removesuffix('.git')
+    etapa = 'clone_esparso' if '--filter=blob:none' in args else 'clone'
+    p = parametros(config, repo, etapa)
+    memoria = simular_custo(p)
+    codigo = codigo_saida(p)
+    if codigo:
+        print(f"fatal: unable to access '{url}/': Could not resolve host: github.com", file=sys.stderr)
+        return etapa, repo, codigo, memoria
+
+    print(f"Cloning into '{destino}'...", file=sys.stderr)
+    ajustes = config.get('repos', {}).get(repo, {})
+    raiz = destino / ajustes.get('diretorio_sln', '')
+    linhas_sln = ["Microsoft Visual Studio Solution File, Format Version 12.00"]
+    projetos = [repo] + [f"{repo}.Modulo{k}" for k in range(2, ajustes.get('projetos', 1) + 1)]
+    arquivos = ajustes.get('arquivos', 1)
+    arquivos = dict(zip(projetos, arquivos if isinstance(arquivos, list) else [arquivos] * len(projetos)))
+    for projeto in (*projetos, f"{repo}.Tests"):
+        (raiz / projeto).mkdir(parents=True, exist_ok=True)
+        teste = projeto.endswith('.Tests') and ajustes.get('testes', True)
+        (raiz / projeto / f"{projeto}.csproj").write_text(
+            _csproj(projeto, ajustes.get('tfm', TFM), teste, projetos if projeto.endswith('.Tests') else ()), encoding='utf-8')
+        for i in range(1, arquivos.get(projeto, 1) + 1):
+            (raiz / projeto / f"Class{i}.cs").write_text(
+                f"namespace {projeto.replace('.', '_')} {{ public class Class{i} {{ }} }}\n", encoding='utf-8')
+        linhas_sln.append(f'Project("{{FAE04EC0-301F-11D3-BF4B-00C04F79EFBC}}") = "{projeto}", "{projeto}\\{projeto}.csproj", '
+                          f'"{{{hashlib.md5(projeto.encode()).hexdigest().upper()}}}"')
+    (raiz / f"{repo}.sln").write_text("\n".join(linhas_sln) + "\n", encoding='utf-8')
+    if ajustes.get('global_json'):
+        (destino / 'global.json').write_text(json.dumps({'sdk': {'version': ajustes['global_json']}}), encoding='utf-8')
+    if ajustes.get('tamanho_mb') and etapa == 'clone':
+        (destino / 'dados.bin').write_bytes(os.urandom(int(ajustes['tamanho_mb'] * 2 ** 20)))
+    (destino / ARQUIVO_MARCADOR).write_text(repo, encoding='utf-8')
+    return etapa, repo, 0, memoria
+
+def git(config, args):
+    diretorio = os.getcwd()
+    if args[:1] == ['-C'] and len(args) > 1:
+        diretorio, args = args[1], args[2:]
+    if args and args[0] == 'clone':
+        return git_clone(config, args)
+    repo, _ = encontrar_repo(diretorio)
+    if args and args[0] == 'rev-parse':
+        print(hashlib.sha1((repo or '').encode('utf-8')).hexdigest())
+    return 'git', repo, 0, 0
+
+# DOTNET
+def _saida_projeto(raiz, projeto):
+    dll = raiz / projeto / 'bin' / 'Debug' / TFM / f"{projeto}.dll"
+    dll.parent.mkdir(parents=True, exist_ok=True)
+    dll.write_bytes(b'MZ')
+    return dll
+
+def _projetos(cwd):
+    """Projetos da solução simulada no diretório atual (o clone cria <repo> e <repo>.Tests)."""
+    return sorted(p.parent.name for p in Path(cwd).glob('*/*.csproj'))
+
+def dotnet_restore(p, repo, cwd, segundos):
+    if p['codigo']:
+        print(f"{cwd}/{repo}/{repo}.csproj : error NU1101: Unable to find package Simulado.Pacote. "
+              f"No packages exist with this id in source(s): nuget.org", file=sys.stderr)
+        return
+    print("  Determining projects to restore...")
+    for projeto in _projetos(cwd):
+        print(f"  Restored {cwd}/{projeto}/{projeto}.csproj (in 120 ms).")
+
+def dotnet_build(p, repo, cwd, segundos):
+    if p['codigo']:
+        print(f"{cwd}/{repo}/Class1.cs(12,5): error CS0246: The type or namespace name 'Simulado' could not be "
+              f"found (are you missing a using directive or an assembly reference?) [{cwd}/{repo}/{repo}.csproj]",
+              file=sys.stderr)
+        return
+    for projeto in _projetos(cwd):
+        print(f"  {projeto} -> {_saida_projeto(cwd, projeto)}")
+    print("\nBuild succeeded.\n    0 Warning(s)\n    0 Error(s)")
+
+def dotnet_test(p, repo, cwd, segundos):
+    if p['codigo']:
+        print(f"{cwd}/{repo}.Tests/Class1.cs(3,1): error CS0103: The name 'Assert' does not exist in the current context")
+        return
+    for projeto in _projetos(cwd):
+        dll = _saida_projeto(cwd, projeto)
+        print(f"  {projeto} -> {dll}")
+    dll = cwd / f"{repo}.Tests" / 'bin' / 'Debug' / TFM / f"{repo}.Tests.dll"
+    print(f"Execução de teste para {dll} (.NETCoreApp,Version=v8.0)")
+    print("Iniciando execução de teste, espere...")
+    print(f"Aprovado!  – Com falha:     0, Aprovado:    42, Ignorado:     0, Total:    42, Duração: 180 ms - {repo}.Tests.dll ({TFM})")
+
+def _opcoes(args, nome):
+    return [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == nome]
+
+def _modo_projeto(cwd):
+    return any(Path(cwd).glob('*.csproj'))
+
+def _arquivos_filtrados(cwd, args):
+    """(arquivos mutados nesta execução, total de arquivos mutáveis da solução).
+
+    No diretório da solução são os arquivos de todos os projetos de código; no de um projeto, só os dele.
+    """
+    cwd = Path(cwd)
+    raiz = cwd.parent if _modo_projeto(cwd) else cwd
+    todos = sorted(a for a in raiz.glob('*/*.cs') if not a.parent.name.endswith('.Tests'))
+    arquivos = [a for a in todos if a.parent == cwd] if _modo_projeto(cwd) else todos
+    padroes = _opcoes(args, '--mutate')
+    if padroes:
+        arquivos = [a for a in arquivos if any(fnmatch.fnmatch(str(a), padrao) for padrao in padroes)]
+    return arquivos, len(todos)
+
+def _config_stryker(args):
+    """Conteúdo de 'stryker-config' do arquivo passado em --config-file (vazio sem a opção)."""
+    caminhos = _opcoes(args, '--config-file')
+    if not caminhos:
+        return {}
+    with open(caminhos[-1], 'r', encoding='utf-8') as arquivo:
+        return json.load(arquivo).get('stryker-config', {})
+
+def _mutantes_arquivo(p, repo, arquivo, media):
+    """Mutantes de um arquivo, sempre os mesmos para o mesmo repositório e caminho: [(mutador, status)]."""
+    rng = random.Random(f"{repo}:{arquivo.parent.name}/{arquivo.name}")
+    pontuacao = min(1.0, max(0.0, rng.gauss(p['pontuacao'], 0.15)))  # Arquivos variam em torno da média
+    mutantes = []
+    for _ in range(rng.randint(0, max(1, int(2 * media)))):
+        sorteio = rng.random()
+        mutador = rng.choice(MUTADORES)
+        if mutador in p['mutadores_invalidos']:
+            status = 'CompileError'
+        elif sorteio < 0.10:
+            status = 'CompileError'
+        elif sorteio < 0.18:
+            status = 'Ignored'
+        elif sorteio < 0.30:
+            status = 'NoCoverage'
+        elif rng.random() < pontuacao:
+            status = 'Timeout' if rng.random() < 0.02 else 'Killed'
+        else:
+            status = 'Survived'
+        mutantes.append((mutador, status))
+    return mutantes
+
+def _relatorio_json(p, repo, cwd, args):
+    """Sorteia os mutantes dos arquivos filtrados e grava o relatório JSON; retorna as contagens por status."""
+    arquivos, total_arquivos = _arquivos_filtrados(cwd, args)
+    media = p['mutantes'] / max(1, total_arquivos)
+    config = _config_stryker(args)
+    ignorados = set(config.get('ignore-mutations', []))
+    divergente = config.get('coverage-analysis', 'perTest') in p['cobertura_divergente']
+    arquivos_relatorio, contagem, proximo_id = {}, {}, 0
+    for arquivo in arquivos:
+        relatorio = []
+        for linha, (mutador, status) in enumerate(_mutantes_arquivo(p, repo, arquivo, media), 1):
+            if NOMES_CONFIG.get(mutador) in ignorados:
+                continue
+            if divergente and linha % 3 == 0 and status in ('Killed', 'Survived'):
+                status = 'Survived' if status == 'Killed' else 'Killed'
+            relatorio.append({'id': str(proximo_id), 'mutatorName': mutador, 'status': status,
+                              'location': {'start': {'line': linha, 'column': 1}, 'end': {'line': linha, 'column': 9}}})
+            proximo_id += 1
+            contagem[status] = contagem.get(status, 0) + 1
+        arquivos_relatorio[str(arquivo)] = {'language': 'cs', 'source': '', 'mutants': relatorio}
+    saida = Path(_opcoes(args, '--output')[-1] if _opcoes(args, '--output') else cwd / 'StrykerOutput') / 'reports'
+    saida.mkdir(parents=True, exist_ok=True)
+    (saida / 'mutation-report.json').write_text(json.dumps(
+        {'schemaVersion': '1', 'thresholds': {'high': 80, 'low': 60}, 'projectRoot': str(cwd), 'files': arquivos_relatorio}),
+        encoding='utf-8')
+    return contagem
+
+def dotnet_stryker(p, repo, cwd, segundos):
+    print(f"\nVersion: 4.5.1\n\n[{_hora()} INF] Analysis starting.")
+    print(f"[{_hora()} INF] Identifying projects to mutate in {cwd}/{repo}.sln. This can take a while.")
+    if p['codigo']:
+        print(f"[{_hora()} ERR] Stryker.NET failed to mutate your project. For more information see the logs.")
+        return
+    print(f"[{_hora()} INF] Found project {cwd}/{repo}/{repo}.csproj to mutate.")
+    print(f"[{_hora()} INF] Number of tests found: 42 for project {cwd}/{repo}/{repo}.csproj. Initial test run started.")
+
+    if '--mutate' in p['args'] or 'json' in _opcoes(p['args'], '--reporter') or _modo_projeto(cwd):
+        contagem = _relatorio_json(p, repo, cwd, p['args'])
+        compile_error, ignored, no_coverage = (contagem.get(s, 0) for s in ('CompileError', 'Ignored', 'NoCoverage'))
+        killed, survived, timeout = (contagem.get(s, 0) for s in ('Killed', 'Survived', 'Timeout'))
+        total = sum(contagem.values())
+        testados, detectados = killed + survived + timeout, killed + timeout
+        pulados = total - testados
+    else:
+        total = int(p['mutantes'])
+        compile_error, ignored, no_coverage = total // 10, total // 12, total // 8
+        pulados = compile_error + ignored + no_coverage
+        testados = total - pulados
+        detectados = int(round(p['pontuacao'] * (testados + no_coverage)))
+        detectados = min(detectados, testados)
+        timeout = detectados // 50
+        killed, survived = detectados - timeout, testados - detectados
+    score = 100 * detectados / max(1, testados + no_coverage)
+
+    print(f"[{_hora()} INF] {total} mutants created")
+    print(f"[{_hora()} INF] {compile_error}     mutants got status CompileError. Reason: Mutant caused compile errors")
+    print(f"[{_hora()} INF] {ignored}     mutants got status Ignored.      Reason: Removed by block already covered filter")
+    print(f"[{_hora()} INF] {no_coverage}     mutants got status NoCoverage.   Reason: Not covered by any test")
+    print(f"[{_hora()} INF] {pulados}     total mutants are skipped for the above mentioned reasons")
+    print(f"[{_hora()} INF] {testados}     total mutants will be tested")
+    for passo in range(1, 11):
+        feitos = testados * passo // 10
+        print(f"Tests progress | {'█' * passo}{' ' * (10 - passo)} | {feitos} / {testados} | {passo * 10} % | ~0m 00s |")
+    print(f"\nKilled:   {killed}\nSurvived: {survived}\nTimeout:  {timeout}\n")
+    print(f"[{_hora()} INF] Time Elapsed {_duracao_formatada(segundos)}")
+    print(f"[{_hora()} INF] The final mutation score is {score:.2f} %")
+
+SUBCOMANDOS_DOTNET = {
+    'restore': dotnet_restore,
+    'build': dotnet_build,
+    'test': dotnet_test,
+    'stryker': dotnet_stryker,
+}
+
+def dotnet(config, args):
+    if args[:1] == ['--version']:
+        print(VERSAO_SDK)
+        return 'dotnet', None, 0, 0
+    if args[:1] == ['--list-sdks']:
+        for sdk in config.get('sdks', [VERSAO_SDK]):
+            print(f"{sdk} [/usr/share/dotnet/sdk]")
+        return 'dotnet', None, 0, 0
+
+    etapa = args[0] if args else ''
+    cwd = Path(os.getcwd()).resolve()
+    repo, _ = encontrar_repo(cwd)
+    if etapa not in SUBCOMANDOS_DOTNET:
+        return 'dotnet', repo, 0, 0
+
+    p = parametros(config, repo, etapa)
+    p['args'] = args
+    if etapa == 'stryker':
+        selecionados, total = _arquivos_filtrados(cwd, args)
+        p['duracao'] *= len(selecionados) / max(1, total)  # Só os arquivos filtrados são mutados
+        config = _config_stryker(args)
+        p['duracao'] *= p['fatores_cobertura'].get(config.get('coverage-analysis', 'perTest'), 1.0)
+        p['duracao'] *= 1 - len(set(config.get('ignore-mutations', [])) & set(NOMES_CONFIG.values())) / len(MUTADORES)
+    ajustar_duracao(p, nucleos_pedidos(args))
+    inicio = time.monotonic()
+    memoria = simular_custo(p)
+    imprimir_ruido(p, etapa)
+    p['codigo'] = codigo_saida(p)
+    SUBCOMANDOS_DOTNET[etapa](p, repo, cwd, time.monotonic() - inicio)
+    return etapa, repo, p['codigo'], memoria
+
+# COVERLET
+def coverlet(config, args):
+    dll = Path(args[0]) if args else Path(os.getcwd())
+    repo, _ = encontrar_repo(dll.parent)
+    p = parametros(config, repo, 'coverlet')
+    memoria = simular_custo(p)
+    imprimir_ruido(p, 'coverlet')
+    codigo = codigo_saida(p)
+    if codigo:
+        print("Calculating coverage result...\nNo coverage information was collected.")
+        return 'coverlet', repo, codigo, memoria
+
+    print(f"Calculating coverage result...\n  Generating report '{dll.parent}/coverage.json'\n")
+    linha, metodo = p['linha'], p['metodo']
+    print("+---------+--------+--------+--------+")
+    print("|         | Line   | Branch | Method |")
+    print("+---------+--------+--------+--------+")
+    print(f"| Total   | {linha:.2f}% | {linha * 0.8:.2f}% | {metodo:.2f}%  |")
+    print("+---------+--------+--------+--------+")
+    return 'coverlet', repo, 0, memoria
+
+FERRAMENTAS = {'git': git, 'dotnet': dotnet, 'coverlet': coverlet}
+
+def main(ferramenta, args):
+    inicio = time.time()
+    etapa, repo, codigo, memoria = FERRAMENTAS[ferramenta](carregar_config(), args)
+    sys.stdout.flush()
+    registrar_evento(ferramenta, etapa, repo, inicio, codigo, memoria)
+    sys.exit(codigo)
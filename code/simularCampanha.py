@@ -0,0 +1,265 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import statistics
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import coordenadorCampanha
+from coordenadorCampanha import FilaLeases
+from perfilamento import perfilar
+
+DIRETORIO_SIMULADOR = Path(__file__).resolve().parent / 'simuladorToolchain'
+
+# Custo simulado padrão de cada etapa (segundos e fração de CPU)
+CUSTOS_PADRAO = {
+    'clone': {'duracao': 0.05},
+    'clone_esparso': {'duracao': 0.02},
+    'restore': {'duracao': 0.1},
+    'build': {'duracao': 0.2, 'cpu': 0.5},
+    'stryker': {'duracao': 0.5, 'cpu': 0.8, 'memoria_mb': 20, 'linhas_ruido': 200},
+    'test': {'duracao': 0.2, 'cpu': 0.5},
+    'coverlet': {'duracao': 0.2, 'cpu': 0.5},
+}
+# Fração de repositórios que falham em cada etapa, por pipeline
+FALHAS_PADRAO = {
+    'mutacao': {'clone': 0.02, 'sem_sln': 0.02, 'previa': 0.05, 'restore': 0.05, 'build': 0.08, 'stryker': 0.05},
+    'cobertura': {'clone': 0.02, 'test': 0.08, 'coverlet': 0.05},
+}
+# Como cada resultado esperado aparece na linha gravada pelo pipeline
+ASSINATURAS = {
+    'mutacao': {
+        'clone': ('Erro', 'Erro ao clonar'),
+        'sem_sln': ('Erro', 'Diretório da solução não encontrado'),
+        'previa': ('Erro', 'Pré-verificação: SDK'),
+        'restore': ('Erro', 'Erro ao restaurar dependências'),
+        'build': ('Erro', 'Erro ao compilar o projeto'),
+        'stryker': ('Erro', 'Erro ao executar Stryker'),
+    },
+    'cobertura': {
+        'clone': ('Status', 'Erro ao clonar'),
+        'test': ('Status', 'Nenhum teste encontrado'),
+        'coverlet': ('Status', 'Erro no Coverlet'),
+        'sucesso': ('Status', 'Sucesso'),
+    },
+}
+
+def gerar_cenario(n, pipeline, semente=0, falhas=None, fracao_travamento=0.0):
+    """Cria `n` repositórios sintéticos, o config do simulador e o resultado esperado de cada um."""
+    rng = random.Random(semente)
+    falhas = FALHAS_PADRAO[pipeline] if falhas is None else falhas
+    repos, esperado = [], {}
+    config = {'padrao': CUSTOS_PADRAO, 'repos': {}}
+
+    for i in range(n):
+        nome = f"repo{i:05d}"
+        diretorio_sln = rng.choice(["", "", "src"])
+        ajustes = {'diretorio_sln': diretorio_sln,
+                   'stryker': {'mutantes': rng.randint(50, 2000), 'pontuacao': round(rng.uniform(0.2, 0.95), 2)},
+                   'coverlet': {'linha': round(rng.uniform(5, 99), 2), 'metodo': round(rng.uniform(5, 99), 2)}}
+
+        # Cada repositório recebe no máximo uma falha (ou um travamento)
+        sorteio, acumulado, resultado = rng.random(), 0.0, 'sucesso'
+        for etapa, fracao in list(falhas.items()) + [('travamento', fracao_travamento)]:
+            acumulado += fracao
+            if sorteio < acumulado:
+                resultado = etapa
+                break
+        if resultado == 'sem_sln':
+            ajustes['diretorio_sln'] = ""
+            diretorio_sln = "src"
+        elif resultado == 'previa':
+            ajustes['global_json'] = '99.0.100'  # SDK inexistente: deve ser barrado antes do clone completo
+        elif resultado == 'travamento':
+            ajustes['stryker' if pipeline == 'mutacao' else 'coverlet']['travar'] = True
+        elif resultado != 'sucesso':
+            ajustes.setdefault(resultado, {})['codigo_saida'] = 1
+
+        config['repos'][nome] = ajustes
+        esperado[nome] = resultado
+        repos.append({"Nome": nome, "Proprietário": f"owner{i % 97}", "Estrelas": str(rng.randint(100, 5000)),
+                      "SDK": "8.0.x", "Arquitetura": rng.choice(["MVC", "MVVM"]), "Diretório SLN": diretorio_sln})
+    return repos, config, esperado
+
+def _worker(db, pipeline, base_dir, duracao_lease, pausa, eventos):
+    """Processo worker: mede o tempo total de cada repositório e consome a fila como um worker real."""
+    os.setpgrp()  # Permite encerrar o worker junto com as ferramentas simuladas que ele iniciou
+    import mutationTestRunnerV2
+    import registroErros
+    from arquivoSaidas import ArquivoSaidas
+    from cacheBuild import CacheBuild
+    # Cache de build, saídas arquivadas e logs de erro ficam no diretório do worker, não nos da campanha real
+    raiz = Path(base_dir)
+    mutationTestRunnerV2.PAUSA_APOS_REPOSITORIO = pausa
+    mutationTestRunnerV2.VERIFICACAO_PREVIA = True  # O cenário 'previa' exercita o checkout esparso
+    mutationTestRunnerV2.CACHE_BUILD = CacheBuild(raiz / '.cache_build')
+    mutationTestRunnerV2.ARQUIVO_SAIDAS = ArquivoSaidas(raiz / 'arquivo_saidas')
+    registroErros.DIRETORIO_LOGS = str(raiz / 'logs')
+    original = coordenadorCampanha.PIPELINES[pipeline]
+
+    def medido(repo, diretorio, *args):
+        inicio = time.time()
+        linhas = original(repo, diretorio, *args)
+        with open(eventos, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(json.dumps({'ferramenta': 'pipeline', 'etapa': pipeline, 'repo': repo['Nome'],
+                                      'inicio': inicio, 'fim': time.time(), 'pid': os.getpid()}) + "\n")
+        return linhas
+
+    coordenadorCampanha.PIPELINES[pipeline] = medido
+    fila = FilaLeases(db, duracao_lease)
+    with open(os.devnull, 'w') as nulo:
+        os.dup2(nulo.fileno(), 1)  # A saída dos runners é descartada para não medir o terminal
+    coordenadorCampanha.executar_worker(fila, pipeline, base_dir, duracao_lease / 3)
+
+def executar_carga(repos, config, pipeline, diretorio, workers=1, duracao_lease=30, tempo_maximo=600, pausa=0):
+    """Executa a campanha simulada com `workers` processos. Retorna (fila, eventos, segundos, interrompidos)."""
+    diretorio = Path(diretorio).resolve()
+    diretorio.mkdir(parents=True, exist_ok=True)
+    db, eventos = diretorio / 'fila.db', diretorio / 'eventos.jsonl'
+    for arquivo in (db, eventos):
+        if arquivo.exists():
+            arquivo.unlink()
+    caminho_config = diretorio / 'simulador.json'
+    caminho_config.write_text(json.dumps(config), encoding='utf-8')
+
+    # Os workers (e os runners dentro deles) herdam o PATH com as ferramentas simuladas na frente
+    os.environ['PATH'] = f"{DIRETORIO_SIMULADOR}{os.pathsep}{os.environ['PATH']}"
+    os.environ['SIMULADOR_CONFIG'] = str(caminho_config)
+    os.environ['SIMULADOR_EVENTOS'] = str(eventos)
+
+    fila = FilaLeases(str(db), duracao_lease)
+    fila.carregar(repos)
+
+    for i in range(workers):
+        shutil.rmtree(diretorio / f"w{i}", ignore_errors=True)  # Cache de build de uma execução anterior falsearia a vazão
+
+    inicio = time.perf_counter()
+    processos = [multiprocessing.Process(target=_worker, args=(str(db), pipeline, str(diretorio / f"w{i}"),
+                                                               duracao_lease, pausa, str(eventos)))
+                 for i in range(workers)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join(max(0.0, tempo_maximo - (time.perf_counter() - inicio)))
+
+    interrompidos = 0
+    for processo in processos:
+        if processo.is_alive():
+            os.killpg(processo.pid, signal.SIGKILL)
+            processo.join()
+            interrompidos += 1
+    return fila, _ler_eventos(eventos), time.perf_counter() - inicio, interrompidos
+
+def _ler_eventos(caminho):
+    if not caminho.exists():
+        return []
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return [json.loads(linha) for linha in arquivo if linha.strip()]
+
+def _confere(linha, esperado_repo, pipeline, config_repo):
+    """Verifica se a linha gravada pelo pipeline corresponde ao comportamento simulado."""
+    if esperado_repo == 'sucesso' and pipeline == 'mutacao':
+        stryker = config_repo['stryker']
+        return not linha.get('Erro') and linha.get('Total Mutants') == str(stryker['mutantes'])
+    coluna, trecho = ASSINATURAS[pipeline][esperado_repo]
+    if trecho not in str(linha.get(coluna) or ''):
+        return False
+    if esperado_repo == 'sucesso':
+        return linha['Cobertura Linha (%)'] == f"{config_repo['coverlet']['linha']:.2f}%"
+    return True
+
+def _percentil(valores, q):
+    return statistics.quantiles(valores, n=100)[q - 1] if len(valores) > 1 else (valores[0] if valores else 0.0)
+
+def analisar(fila, eventos, segundos, repos, config, esperado, pipeline):
+    """Resume vazão, sobrecarga de orquestração e a correção do tratamento de falhas."""
+    linhas = {linha['Nome']: linha for linha in fila.resultados()}
+    resumo_fila = fila.resumo()
+
+    tempo_ferramentas = defaultdict(float)
+    tempo_pipeline = {}
+    memoria_por_etapa = defaultdict(float)
+    for evento in eventos:
+        duracao = evento['fim'] - evento['inicio']
+        if evento['ferramenta'] == 'pipeline':
+            tempo_pipeline[evento['repo']] = duracao
+        elif evento.get('repo'):
+            tempo_ferramentas[evento['repo']] += duracao
+            memoria_por_etapa[evento['etapa']] = max(memoria_por_etapa[evento['etapa']], evento.get('memoria_mb', 0))
+
+    sobrecarga = [tempo_pipeline[nome] - tempo_ferramentas[nome] for nome in tempo_pipeline]
+    divergentes = []
+    desfechos = Counter()
+    for repo in repos:
+        nome = repo['Nome']
+        if esperado[nome] == 'travamento':
+            conferencia = 'ok' if nome not in linhas else 'divergente'  # Um travamento só termina pelo tempo máximo
+        elif nome not in linhas:
+            conferencia = 'nao_concluido'
+        else:
+            conferencia = 'ok' if _confere(linhas[nome], esperado[nome], pipeline, config['repos'][nome]) else 'divergente'
+        desfechos[f"{esperado[nome]}:{conferencia}"] += 1
+        if conferencia == 'divergente':
+            divergentes.append(nome)
+
+    return {
+        'repositorios': len(repos),
+        'concluidos': len(linhas),
+        'fila': resumo_fila,
+        'segundos': segundos,
+        'vazao_por_minuto': 60 * len(linhas) / segundos if segundos else 0.0,
+        'tempo_ferramentas_s': sum(tempo_ferramentas.values()),
+        'sobrecarga_media_s': statistics.mean(sobrecarga) if sobrecarga else 0.0,
+        'sobrecarga_p95_s': _percentil(sobrecarga, 95),
+        'memoria_pico_mb': dict(memoria_por_etapa),
+        'desfechos': dict(sorted(desfechos.items())),
+        'divergentes': divergentes,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga dos runners com git/dotnet/coverlet simulados (sem rede e sem .NET).")
+    parser.add_argument("--repositorios", type=int, default=200)
+    parser.add_argument("--pipeline", choices=sorted(coordenadorCampanha.PIPELINES), default="mutacao")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--fracao-travamento", type=float, default=0.0, help="Fração de repositórios cuja ferramenta trava")
+    parser.add_argument("--pausa", type=float, default=0.0,
+                        help="Pausa após cada repositório (o runner real usa PAUSA_APOS_REPOSITORIO)")
+    parser.add_argument("--duracao-lease", type=float, default=30)
+    parser.add_argument("--tempo-maximo", type=float, default=600, help="Encerra os workers após este tempo (s)")
+    parser.add_argument("--diretorio", type=Path, default=Path('simulacao_campanha'))
+    parser.add_argument("--saida", type=Path, help="Salva o resumo neste arquivo JSON")
+    args = parser.parse_args()
+
+    repos, config, esperado = gerar_cenario(args.repositorios, args.pipeline, args.semente,
+                                            fracao_travamento=args.fracao_travamento)
+    print(f"Simulando {len(repos)} repositórios ({args.pipeline}) com {args.workers} workers...")
+    fila, eventos, segundos, interrompidos = executar_carga(repos, config, args.pipeline, args.diretorio, args.workers,
+                                                            args.duracao_lease, args.tempo_maximo, args.pausa)
+    resumo = analisar(fila, eventos, segundos, repos, config, esperado, args.pipeline)
+    resumo['workers_interrompidos'] = interrompidos
+
+    print(f"Concluídos: {resumo['concluidos']}/{resumo['repositorios']} em {segundos:.1f}s "
+          f"({resumo['vazao_por_minuto']:.1f} repositórios/min); fila: {resumo['fila']}")
+    print(f"Tempo nas ferramentas simuladas: {resumo['tempo_ferramentas_s']:.1f}s; sobrecarga por repositório: "
+          f"média {resumo['sobrecarga_media_s']:.3f}s, p95 {resumo['sobrecarga_p95_s']:.3f}s")
+    print(f"Pico de memória por etapa (MB): {resumo['memoria_pico_mb']}")
+    print("Desfechos (esperado:conferência):")
+    for chave, total in resumo['desfechos'].items():
+        print(f"  {chave:<28} {total}")
+    if interrompidos:
+        print(f"Workers interrompidos pelo tempo máximo: {interrompidos}")
+
+    if args.saida:
+        args.saida.write_text(json.dumps(resumo, indent=2, ensure_ascii=False), encoding='utf-8')
+    if resumo['divergentes']:
+        print(f"Repositórios com resultado divergente: {', '.join(resumo['divergentes'][:20])}")
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    perfilar(main)()
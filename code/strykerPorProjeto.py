@@ -0,0 +1,132 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from amostragemMutacao import PASTAS_IGNORADAS, formatar_duracao
+from verificacaoPrevia import ler_projeto, projetos_da_solucao
+
+PROJECT_REFERENCE_PATTERN = r'<ProjectReference\s+Include="([^"]+\.csproj)"'
+DIRETORIO_SAIDA = "StrykerOutput"
+
+# Colunas de contagem que são somadas entre os projetos; a pontuação é recalculada a partir das somas
+COLUNAS_SOMA = ["Killed", "Survived", "Timeout", "Total Mutants", "Mutants Compile Error",
+                "Mutants No Coverage", "Mutants Ignored", "Mutants Tested"]
+
+def _referencias(projeto):
+    """Projetos referenciados diretamente pelo .csproj (ProjectReference)."""
+    texto = projeto.read_text(encoding='utf-8-sig', errors='replace')
+    return [(projeto.parent / referencia.replace('\\', '/')).resolve()
+            for referencia in re.findall(PROJECT_REFERENCE_PATTERN, texto)]
+
+def pares_projetos(caminho_sln):
+    """{projeto de código: [projetos de teste que o alcançam]} para os projetos da solução.
+
+    As referências são seguidas transitivamente (teste → A → B também testa B), como na execução da solução
+    inteira: um projeto alcançado só por outro não pode perder os seus mutantes sem cobertura.
+    """
+    projetos = [p.resolve() for p in projetos_da_solucao(Path(caminho_sln)) if p.is_file()]
+    testes = [p for p in projetos if ler_projeto(p, Path(caminho_sln))['teste']]
+    codigo = set(projetos) - set(testes)
+    pares = {}
+    for teste in testes:
+        visitados, pendentes = set(), _referencias(teste)
+        while pendentes:
+            alvo = pendentes.pop()
+            if alvo in visitados or not alvo.is_file():
+                continue
+            visitados.add(alvo)
+            pendentes += _referencias(alvo)
+            if alvo in codigo:
+                pares.setdefault(alvo, []).append(teste)
+    return pares
+
+def grupos_independentes(pares):
+    """Projetos de código agrupados para que execuções simultâneas não compartilhem projeto de teste.
+
+    O Stryker compila o projeto de teste no lugar e grava cada assembly mutado no bin dele; execuções que
+    compartilham um projeto de teste (ou um projeto alcançado por ele) colidem em bin/obj e na ativação dos
+    mutantes, então ficam no mesmo grupo e rodam uma depois da outra.
+    """
+    grupo_do_teste = {}
+    grupos = []
+    for projeto, testes in pares.items():
+        unidos = {id(grupo_do_teste[t]): grupo_do_teste[t] for t in testes if t in grupo_do_teste}
+        grupo = {'projetos': [projeto], 'testes': set(testes)}
+        for outro in unidos.values():
+            grupo['projetos'] += outro['projetos']
+            grupo['testes'] |= outro['testes']
+            grupos.remove(outro)
+        grupos.append(grupo)
+        for teste in grupo['testes']:
+            grupo_do_teste[teste] = grupo
+    return [grupo['projetos'] for grupo in grupos]
+
+def tamanho_projeto(projeto):
+    """Arquivos .cs do projeto: aproxima o custo do Stryker para ordenar os maiores primeiro."""
+    return sum(1 for arquivo in projeto.parent.rglob('*.cs')
+               if not PASTAS_IGNORADAS.intersection(arquivo.relative_to(projeto.parent).parts))
+
+def argumentos_par(projeto, testes, saida):
+    """Argumentos do Stryker executado no diretório do projeto de código com os seus projetos de teste."""
+    argumentos = []
+    for teste in testes:
+        argumentos += ["--test-project", os.path.relpath(teste, projeto.parent)]
+    return argumentos + ["--output", str(saida)]
+
+def somar_metricas(metricas, segundos):
+    """Uma linha de métricas para a solução a partir das linhas de cada projeto."""
+    soma = {}
+    for coluna in COLUNAS_SOMA:
+        valores = [int(m[coluna]) for m in metricas if str(m.get(coluna, '')).isdigit()]
+        soma[coluna] = sum(valores) if valores else "N/A"
+    contagens = [soma[c] for c in ("Killed", "Timeout", "Survived", "Mutants No Coverage")]
+    if all(isinstance(c, int) for c in contagens) and sum(contagens):
+        killed, timeout, survived, no_coverage = contagens
+        soma["Mutation Score"] = f"{100 * (killed + timeout) / (killed + timeout + survived + no_coverage):.2f}"
+    else:
+        soma["Mutation Score"] = "N/A"
+    soma["Time Elapsed"] = formatar_duracao(segundos)
+    return soma
+
+def executar_por_projeto(caminho_sln, executar, nucleos=None):
+    """Executa um Stryker por projeto de código, em paralelo entre grupos independentes, e soma as métricas.
+
+    `executar(diretorio, concurrency, argumentos, parte)` roda o Stryker e retorna (métricas, erro). Os projetos
+    de um mesmo grupo (ver `grupos_independentes`) rodam em sequência; os maiores grupos começam primeiro e os
+    núcleos são divididos entre os grupos simultâneos, para que a solução termine perto do tempo do grupo mais
+    lento. Retorna None quando há menos de dois grupos (não há o que paralelizar: a solução roda inteira).
+    """
+    caminho_sln = Path(caminho_sln).resolve()
+    pares = pares_projetos(caminho_sln)
+    grupos = grupos_independentes(pares)
+    if len(grupos) < 2:
+        return None
+
+    tamanhos = {projeto: tamanho_projeto(projeto) for projeto in pares}
+    ordem = sorted((sorted(grupo, key=tamanhos.get, reverse=True) for grupo in grupos),
+                   key=lambda grupo: sum(map(tamanhos.get, grupo)), reverse=True)
+    nucleos = nucleos or os.cpu_count() or 1
+    simultaneos = min(len(ordem), nucleos)
+    base, resto = divmod(nucleos, simultaneos)
+
+    def executar_grupo(grupo, concurrency):
+        resultados = {}
+        for projeto in grupo:
+            saida = caminho_sln / DIRETORIO_SAIDA / projeto.stem
+            resultados[projeto] = executar(projeto.parent, concurrency, argumentos_par(projeto, pares[projeto], saida),
+                                           projeto.stem)
+        return resultados
+
+    inicio = time.monotonic()
+    with ThreadPoolExecutor(max_workers=simultaneos) as executor:
+        futuros = [executor.submit(executar_grupo, grupo, base + (1 if i % simultaneos < resto else 0))
+                   for i, grupo in enumerate(ordem)]
+        resultados = {projeto: resultado for futuro in futuros for projeto, resultado in futuro.result().items()}
+
+    # "Erro ao executar Stryker: ..." vira "Erro ao executar Stryker (Projeto): ...", mantendo o prefixo da etapa
+    erros = [erro.replace(": ", f" ({projeto.stem}): ", 1) for projeto, (_, erro) in resultados.items() if erro]
+    if erros:
+        return None, "\n".join(erros)
+    return somar_metricas([metricas for metricas, _ in resultados.values()], time.monotonic() - inicio), None
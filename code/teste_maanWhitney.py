@@ -1,36 +1,22 @@
-import pandas as pd
-import numpy as np
 from pathlib import Path
 from scipy.stats import mannwhitneyu
+from carregarDados import carregar_resultados
+from perfilamento import iniciar
+
+if __name__ == "__main__":
+    iniciar()  # Perfilamento opcional (--perfil ou PERFILAMENTO); importado, não mexe em sys.argv
 
 # 1. CONFIGURAÇÃO INICIAL
 caminho_csv = Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv')
 
-# 2. LER CSV COM TRATAMENTO DE CAMPOS VAZIOS
+# 2. CARREGAR DADOS TIPADOS (PORCENTAGENS, N/A E ERRO DE COMPILAÇÃO JÁ TRATADOS)
 try:
-    df = pd.read_csv(caminho_csv, keep_default_na=True, na_values=['', ' ', 'NA', 'N/A'])
+    df = carregar_resultados(caminho_csv)
 except Exception as e:
     print(f"Erro ao ler o arquivo CSV: {e}")
     exit()
 
-# 3. NORMALIZAR COLUNA 'Arquitetura'
-df['Arquitetura'] = df['Arquitetura'].astype(str).str.strip().str.upper()
-
-# 4. CONVERTER COLUNAS DE PORCENTAGEM
-def converter_porcentagem(valor):
-    if pd.isna(valor) or str(valor).strip() in ['', 'NAN', 'N/A']:
-        return np.nan
-    if isinstance(valor, str):
-        return float(valor.replace('%', '').strip()) / 100
-    return float(valor)
-
-df['Cobertura Linha (%)'] = df['Cobertura Linha (%)'].apply(converter_porcentagem)
-df['Mutation Score'] = df['Mutation Score'].apply(converter_porcentagem)
-
-# 5. CALCULAR MÉTRICA DE ERRO DE COMPILAÇÃO
-df['Mutantes Erro Compilação (%)'] = (df['Mutants Compile Error'] / df['Total Mutants']) * 100
-
-# 6. TESTE DE MANN-WHITNEY
+# 3. TESTE DE MANN-WHITNEY
 metricas = ['Mutation Score', 'Cobertura Linha (%)', 'Mutantes Erro Compilação (%)']
 
 print("\n=== TESTE DE MANN-WHITNEY U ===")
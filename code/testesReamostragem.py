@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice
+from math import comb
+from pathlib import Path
+
+import numpy as np
+from scipy.stats import rankdata
+
+from carregarDados import carregar_resultados
+from perfilamento import perfilar
+
+# Configurações padrão
+METRICAS = ['Mutation Score', 'Cobertura Linha (%)', 'Mutantes Erro Compilação (%)']
+GRUPOS = ('MVC', 'MVVM')
+N_PERMUTACOES = 50_000
+N_BOOTSTRAP = 20_000
+TAMANHO_BLOCO = 2_000  # Reamostragens por bloco: limita a memória de cada tarefa
+MAX_ELEMENTOS_BLOCO = 4_000_000  # Em amostras grandes o bloco encolhe para caber neste número de elementos
+LIMITE_EXATO = 200_000  # Até quantas combinações o teste de permutação é feito por enumeração completa
+NIVEL_CONFIANCA = 0.95
+
+def _estatistica_u(postos_x, nx):
+    """U de Mann-Whitney do grupo x a partir da soma dos seus postos (aceita lotes no último eixo)."""
+    return postos_x.sum(axis=-1) - nx * (nx + 1) / 2
+
+def _bloco_permutacao(postos, nx, u_observado, tamanho, semente):
+    """Conta, em um bloco de permutações aleatórias, quantas têm |U - E[U]| >= o observado."""
+    rng = np.random.default_rng(semente)
+    n = len(postos)
+    centro = nx * (n - nx) / 2
+    # argsort de uniformes gera `tamanho` permutações independentes de uma vez
+    indices = np.argsort(rng.random((tamanho, n)), axis=1)[:, :nx]
+    u = _estatistica_u(postos[indices], nx)
+    return int(np.count_nonzero(np.abs(u - centro) >= abs(u_observado - centro) - 1e-9))
+
+def _bloco_exato(postos, nx, u_observado, inicio, tamanho):
+    """Conta as combinações [inicio, inicio+tamanho) da enumeração completa que são tão extremas quanto a observada."""
+    n = len(postos)
+    centro = nx * (n - nx) / 2
+    gerador = islice(combinations(range(n), nx), inicio, inicio + tamanho)
+    indices = np.array(list(gerador), dtype=np.intp)
+    u = _estatistica_u(postos[indices], nx)
+    return int(np.count_nonzero(np.abs(u - centro) >= abs(u_observado - centro) - 1e-9))
+
+def _bloco_bootstrap(x, y, tamanho, semente):
+    """Reamostra os dois grupos com reposição e devolve mediana e IQR de cada um por reamostragem."""
+    rng = np.random.default_rng(semente)
+    resultado = {}
+    for nome, dados in (('x', x), ('y', y)):
+        amostras = dados[rng.integers(0, len(dados), size=(tamanho, len(dados)))]
+        q1, mediana, q3 = np.quantile(amostras, [0.25, 0.5, 0.75], axis=1)
+        resultado[f'mediana_{nome}'] = mediana
+        resultado[f'iqr_{nome}'] = q3 - q1
+    return resultado
+
+def _executar_tarefa(tarefa):
+    tipo, metrica, args = tarefa
+    funcoes = {'permutacao': _bloco_permutacao, 'exato': _bloco_exato, 'bootstrap': _bloco_bootstrap}
+    return tipo, metrica, funcoes[tipo](*args)
+
+def cliffs_delta(x, y):
+    """Delta de Cliff: P(X > Y) - P(X < Y).
+
+    Calculado pelos postos (delta = 2U / (nx * ny) - 1), sem montar a matriz de todos os pares.
+    """
+    postos = rankdata(np.concatenate([x, y]))
+    u = _estatistica_u(postos[:len(x)], len(x))
+    return float(2 * u / (len(x) * len(y)) - 1)
+
+def _intervalo(valores, nivel=NIVEL_CONFIANCA):
+    alfa = (1 - nivel) / 2
+    inferior, superior = np.quantile(valores, [alfa, 1 - alfa])
+    return [float(inferior), float(superior)]
+
+def _blocos(total, n, tamanho=TAMANHO_BLOCO):
+    """Divide `total` reamostragens de `n` elementos em blocos de memória limitada."""
+    tamanho = max(1, min(tamanho, MAX_ELEMENTOS_BLOCO // max(1, n)))
+    return [min(tamanho, total - inicio) for inicio in range(0, total, tamanho)]
+
+def comparar_grupos(df, metricas=METRICAS, grupos=GRUPOS, n_permutacoes=N_PERMUTACOES,
+                    n_bootstrap=N_BOOTSTRAP, semente=42, workers=None, coluna_grupo='Arquitetura'):
+    """Roda permutação, tamanhos de efeito e bootstrap para todas as métricas de uma só vez.
+
+    As sementes de cada bloco são derivadas de `semente` na ordem das tarefas, então o
+    resultado é o mesmo independentemente do número de workers.
+    """
+    sementes = np.random.SeedSequence(semente)
+    tarefas = []
+    preparados = {}
+
+    for metrica in metricas:
+        x = df.loc[df[coluna_grupo] == grupos[0], metrica].dropna().to_numpy(dtype=float)
+        y = df.loc[df[coluna_grupo] == grupos[1], metrica].dropna().to_numpy(dtype=float)
+        if len(x) < 3 or len(y) < 3:
+            preparados[metrica] = {'n': [len(x), len(y)], 'erro': 'Dados insuficientes'}
+            continue
+
+        postos = rankdata(np.concatenate([x, y]))  # Postos médios em caso de empate
+        nx = len(x)
+        u_observado = float(_estatistica_u(postos[:nx], nx))
+        total_combinacoes = comb(len(postos), nx)
+        exato = total_combinacoes <= LIMITE_EXATO
+        preparados[metrica] = {'x': x, 'y': y, 'u': u_observado, 'exato': exato,
+                               'total': total_combinacoes if exato else n_permutacoes}
+
+        if exato:
+            for inicio in range(0, total_combinacoes, TAMANHO_BLOCO):
+                tamanho = min(TAMANHO_BLOCO, total_combinacoes - inicio)
+                tarefas.append(('exato', metrica, (postos, nx, u_observado, inicio, tamanho)))
+        else:
+            blocos = _blocos(n_permutacoes, len(postos))
+            for tamanho, filha in zip(blocos, sementes.spawn(len(blocos))):
+                tarefas.append(('permutacao', metrica, (postos, nx, u_observado, tamanho, filha)))
+        blocos = _blocos(n_bootstrap, len(postos))
+        for tamanho, filha in zip(blocos, sementes.spawn(len(blocos))):
+            tarefas.append(('bootstrap', metrica, (x, y, tamanho, filha)))
+
+    extremos = {metrica: 0 for metrica in preparados}
+    bootstrap = {metrica: [] for metrica in preparados}
+
+    def acumular(saidas):
+        for tipo, metrica, valor in saidas:
+            if tipo == 'bootstrap':
+                bootstrap[metrica].append(valor)
+            else:
+                extremos[metrica] += valor
+
+    if workers == 1:
+        # Execução no próprio processo (ex.: quando já se está dentro de um pool)
+        acumular(map(_executar_tarefa, tarefas))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            acumular(executor.map(_executar_tarefa, tarefas, chunksize=4))
+
+    resultados = []
+    for metrica in metricas:
+        dados = preparados[metrica]
+        if 'erro' in dados:
+            resultados.append({'metrica': metrica, 'n': dados['n'], 'erro': dados['erro']})
+            continue
+
+        x, y = dados['x'], dados['y']
+        nx, ny = len(x), len(y)
+        if dados['exato']:
+            p_valor = extremos[metrica] / dados['total']
+        else:
+            p_valor = (extremos[metrica] + 1) / (dados['total'] + 1)
+        blocos = {chave: np.concatenate([b[chave] for b in bootstrap[metrica]]) for chave in bootstrap[metrica][0]}
+        delta = cliffs_delta(x, y)
+
+        resultados.append({
+            'metrica': metrica,
+            'grupos': list(grupos),
+            'n': [nx, ny],
+            'U': dados['u'],
+            'p_valor': float(p_valor),
+            'metodo_p': 'exato' if dados['exato'] else f"permutacao ({dados['total']} reamostragens)",
+            'cliffs_delta': delta,
+            'rank_biserial': float(2 * dados['u'] / (nx * ny) - 1),
+            'mediana': [float(np.median(x)), float(np.median(y))],
+            'mediana_ic': [_intervalo(blocos['mediana_x']), _intervalo(blocos['mediana_y'])],
+            'iqr': [float(np.subtract(*np.quantile(x, [0.75, 0.25]))), float(np.subtract(*np.quantile(y, [0.75, 0.25])))],
+            'iqr_ic': [_intervalo(blocos['iqr_x']), _intervalo(blocos['iqr_y'])],
+            'diferenca_medianas_ic': _intervalo(blocos['mediana_x'] - blocos['mediana_y']),
+        })
+    return resultados
+
+def imprimir_resultados(resultados):
+    print("\n=== TESTES DE PERMUTAÇÃO E BOOTSTRAP ===")
+    for r in resultados:
+        print(f"\n Métrica: {r['metrica']}")
+        if 'erro' in r:
+            print(f"🔸 {r['erro']} (n = {r['n']})")
+            continue
+        g1, g2 = r['grupos']
+        resultado = 'Diferença significativa' if r['p_valor'] < 0.05 else 'Sem diferença significativa'
+        print(f"🔹 U = {r['U']:.2f}, p-value ({r['metodo_p']}) = {r['p_valor']:.4f} → {resultado}")
+        print(f"🔹 Cliff's delta = {r['cliffs_delta']:.3f}, rank-biserial = {r['rank_biserial']:.3f}")
+        for i, grupo in enumerate((g1, g2)):
+            ic_med, ic_iqr = r['mediana_ic'][i], r['iqr_ic'][i]
+            print(f"   {grupo} (n={r['n'][i]}): mediana = {r['mediana'][i]:.3f} [{ic_med[0]:.3f}; {ic_med[1]:.3f}], "
+                  f"IQR = {r['iqr'][i]:.3f} [{ic_iqr[0]:.3f}; {ic_iqr[1]:.3f}]")
+        ic = r['diferenca_medianas_ic']
+        print(f"   Diferença de medianas ({g1} - {g2}): IC {NIVEL_CONFIANCA:.0%} = [{ic[0]:.3f}; {ic[1]:.3f}]")
+
+def main():
+    parser = argparse.ArgumentParser(description="Permutação, tamanhos de efeito e bootstrap MVC vs MVVM.")
+    parser.add_argument("--csv", type=Path, default=Path('Instrumentos/Codigos/repositoriosTestadosCoverletV2.csv'))
+    parser.add_argument("--permutacoes", type=int, default=N_PERMUTACOES)
+    parser.add_argument("--bootstrap", type=int, default=N_BOOTSTRAP)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--json", type=Path, help="Também salva os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    df = carregar_resultados(args.csv)
+    inicio = time.perf_counter()
+    resultados = comparar_grupos(df, n_permutacoes=args.permutacoes, n_bootstrap=args.bootstrap,
+                                 semente=args.semente, workers=args.workers)
+    imprimir_resultados(resultados)
+    print(f"\nTempo total: {time.perf_counter() - inicio:.2f}s")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as arquivo:
+            json.dump(resultados, arquivo, indent=2, ensure_ascii=False)
+
+if __name__ == "__main__":
+    perfilar(main)()
@@ -0,0 +1,274 @@
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import stat
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+from perfilamento import perfilar
+
+# Arquivos baixados pelo checkout esparso: o suficiente para prever se o build vai falhar
+PADROES_ESPARSOS = ['*.sln', '*.csproj', 'global.json', 'Directory.Build.props']
+PREFIXO_MOTIVO = "Pré-verificação: "
+ROLL_FORWARD_PADRAO = 'latestPatch'
+PACOTES_TESTE = ['Microsoft.NET.Test.Sdk', 'xunit', 'nunit', 'MSTest.TestFramework', 'MSTest.Sdk']
+# Plataformas de TFM (net8.0-android etc.) que exigem workloads instaladas
+PLATAFORMAS_WORKLOAD = ['android', 'ios', 'maccatalyst', 'macos', 'tvos', 'tizen']
+WINDOWS = sys.platform.startswith('win')
+
+PROJETO_SLN_PATTERN = r'Project\("\{[^}]+\}"\)\s*=\s*"[^"]*",\s*"([^"]+\.csproj)"'
+TFM_PATTERN = r'<TargetFrameworks?>\s*([^<]+?)\s*</TargetFrameworks?>'
+
+# 1. AMBIENTE LOCAL
+@lru_cache(maxsize=None)
+def sdks_instalados():
+    """Versões listadas por `dotnet --list-sdks` (None se o dotnet não estiver disponível)."""
+    try:
+        saida = subprocess.run(["dotnet", "--list-sdks"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return tuple(linha.split()[0] for linha in saida.splitlines() if linha.strip())
+
+@lru_cache(maxsize=None)
+def workloads_instaladas():
+    """Identificadores das workloads instaladas (None se não for possível consultar)."""
+    try:
+        saida = subprocess.run(["dotnet", "workload", "list"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return tuple(linha.split()[0] for linha in saida.splitlines()
+                 if linha.strip() and not linha.startswith(('-', ' ', 'Installed', 'Workload', 'Use ')))
+
+def _versao(texto):
+    """'9.0.101-preview.1' -> (9, 0, 101). Componentes ausentes viram 0."""
+    numeros = re.match(r'(\d+)(?:\.(\d+))?(?:\.(\d+))?', texto.strip())
+    return tuple(int(n or 0) for n in numeros.groups()) if numeros else None
+
+def sdk_compativel(requerida, roll_forward, instalados):
+    """Aplica as regras de rollForward do global.json à lista de SDKs instalados."""
+    alvo = _versao(requerida)
+    if alvo is None:
+        return True
+    politica = (roll_forward or ROLL_FORWARD_PADRAO).lower().removeprefix('latest')
+    for instalada in filter(None, map(_versao, instalados)):
+        if instalada < alvo:
+            continue
+        if politica == 'disable' and instalada != alvo:
+            continue
+        if politica == 'patch' and (instalada[:2] != alvo[:2] or instalada[2] // 100 != alvo[2] // 100):
+            continue  # Mesma faixa de recursos (ex.: 8.0.1xx)
+        if politica == 'feature' and instalada[:2] != alvo[:2]:
+            continue
+        if politica == 'minor' and instalada[0] != alvo[0]:
+            continue
+        return True
+    return False
+
+# 2. CHECKOUT ESPARSO
+def checkout_esparso(owner, nome, destino):
+    """Baixa só a ponta do branch padrão e apenas os arquivos de solução/projeto. Retorna (ok, erro)."""
+    url = f"https://github.com/{owner}/{nome}.git"
+    comandos = [
+        ["git", "clone", "--depth", "1", "--filter=blob:none", "--no-checkout", url, str(destino)],
+        ["git", "-C", str(destino), "sparse-checkout", "set", "--no-cone", *PADROES_ESPARSOS],
+        ["git", "-C", str(destino), "checkout"],
+    ]
+    for comando in comandos:
+        try:
+            subprocess.run(comando, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        except subprocess.CalledProcessError as e:
+            return False, f"Erro no checkout esparso de {nome}: {e.stderr}"
+    return True, None
+
+def remover_checkout(destino):
+    def on_error(func, path, exc_info):
+        os.chmod(path, stat.S_IWRITE)  # Arquivos de .git são somente leitura no Windows
+        func(path)
+    if os.path.exists(destino):
+        shutil.rmtree(destino, onerror=on_error)
+
+# 3. ANÁLISE DOS ARQUIVOS
+def ler_global_json(raiz, caminho_sln):
+    """Procura o global.json do diretório da solução até a raiz, como o dotnet faz. Retorna (versão, rollForward)."""
+    for diretorio in [caminho_sln, *caminho_sln.parents]:
+        arquivo = diretorio / 'global.json'
+        if arquivo.is_file():
+            try:
+                sdk = json.loads(arquivo.read_text(encoding='utf-8-sig')).get('sdk', {})
+            except ValueError:
+                return None, None
+            return sdk.get('version'), sdk.get('rollForward')
+        if diretorio == raiz:
+            break
+    return None, None
+
+def projetos_da_solucao(caminho_sln):
+    """Projetos C# que o `dotnet build` do diretório vai compilar."""
+    solucoes = list(caminho_sln.glob('*.sln'))
+    if not solucoes:
+        return list(caminho_sln.glob('*.csproj'))
+    texto = solucoes[0].read_text(encoding='utf-8-sig', errors='replace')
+    return [caminho_sln / caminho.replace('\\', '/') for caminho in re.findall(PROJETO_SLN_PATTERN, texto)]
+
+def _props_herdados(arquivo, raiz):
+    """Conteúdo dos Directory.Build.props acima do projeto, do mais próximo até a raiz."""
+    for diretorio in arquivo.parents:
+        props = diretorio / 'Directory.Build.props'
+        if props.is_file():
+            yield props.read_text(encoding='utf-8-sig', errors='replace')
+        if diretorio == raiz:
+            break
+
+def _tfms_herdados(arquivo, raiz):
+    """TargetFramework(s) definidos em um Directory.Build.props acima do projeto."""
+    for texto in _props_herdados(arquivo, raiz):
+        match = re.search(TFM_PATTERN, texto)
+        if match:
+            return match.group(1)
+    return ""
+
+def projeto_de_teste(texto):
+    """Indica, pelo conteúdo do .csproj (ou de um .props), se é um projeto de testes."""
+    return (any(pacote.lower() in texto.lower() for pacote in PACOTES_TESTE)
+            or re.search(r'<IsTestProject>\s*true', texto, re.IGNORECASE) is not None)
+
+def ler_projeto(arquivo, raiz):
+    """Resume um .csproj: TFMs, formato SDK, dependência de Windows e se é projeto de testes."""
+    texto = arquivo.read_text(encoding='utf-8-sig', errors='replace')
+    match = re.search(TFM_PATTERN, texto)
+    tfms = [tfm.strip().lower() for tfm in (match.group(1) if match else _tfms_herdados(arquivo, raiz)).split(';') if tfm.strip()]
+    return {
+        'tfms': tfms,
+        'formato_sdk': bool(re.search(r'<Project[^>]*\sSdk=', texto)) or '<Sdk ' in texto,
+        'windows': ('Microsoft.NET.Sdk.WindowsDesktop' in texto
+                    or re.search(r'<(UseWPF|UseWindowsForms)>\s*true', texto, re.IGNORECASE) is not None),
+        # Pacotes de teste e IsTestProject costumam vir de um tests/Directory.Build.props
+        'teste': projeto_de_teste(texto) or any(map(projeto_de_teste, _props_herdados(arquivo, raiz))),
+    }
+
+def _tfm_executavel(tfm, maior_sdk, workloads):
+    """Indica se um TFM pode ser compilado e testado nesta máquina."""
+    base, _, plataforma = tfm.partition('-')
+    if re.fullmatch(r'net\d{2,3}', base):  # .NET Framework (net48, net472...)
+        return WINDOWS
+    versao = re.fullmatch(r'net(\d+)\.\d+', base)
+    if versao and maior_sdk is not None and int(versao.group(1)) > maior_sdk:
+        return False
+    if plataforma.startswith('windows') and not WINDOWS:
+        return False
+    exige_workload = next((p for p in PLATAFORMAS_WORKLOAD if plataforma.startswith(p)), None)
+    if exige_workload:
+        return workloads is None or any(exige_workload in workload for workload in workloads)
+    return True
+
+def motivos_inviabilidade(raiz, diretorio_sln, instalados=None, workloads=None, avisos=None):
+    """Lista os motivos pelos quais o build/Stryker do repositório certamente vai falhar (vazia se viável).
+
+    Suspeitas que não justificam pular o repositório vão para `avisos`, se informada.
+    """
+    caminho_sln = raiz / diretorio_sln
+    if not caminho_sln.is_dir():
+        return ["Diretório da solução não encontrado"]
+
+    arquivos_build = list(caminho_sln.glob('*.sln')) + list(caminho_sln.glob('*.csproj'))
+    if not arquivos_build:
+        return ["Nenhum .sln ou .csproj no diretório da solução"]
+    if len(arquivos_build) > 1:  # Um .sln e um .csproj juntos também deixam o dotnet sem saber qual usar
+        return ["Mais de um arquivo de solução/projeto no diretório (MSB1011)"]
+
+    motivos = []
+    if instalados is not None:
+        versao, roll_forward = ler_global_json(raiz, caminho_sln)
+        if versao and not sdk_compativel(versao, roll_forward, instalados):
+            motivos.append(f"SDK {versao} exigido pelo global.json não está instalado (rollForward: {roll_forward or ROLL_FORWARD_PADRAO})")
+
+    maior_sdk = max((_versao(v)[0] for v in instalados or [] if _versao(v)), default=None)
+    projetos = projetos_da_solucao(caminho_sln)
+    ausentes = [p for p in projetos if not p.is_file()]
+    if ausentes:
+        motivos.append(f"Projeto referenciado na solução não existe: {ausentes[0].relative_to(raiz)}")
+
+    dados = {p: ler_projeto(p, raiz) for p in projetos if p.is_file()}
+    for projeto, info in dados.items():
+        nome = projeto.relative_to(raiz)
+        if not info['formato_sdk'] and not WINDOWS:
+            motivos.append(f"{nome}: projeto no formato antigo (não SDK) só compila no Windows")
+        elif info['windows'] and not WINDOWS:
+            motivos.append(f"{nome}: projeto WPF/Windows Forms só compila no Windows")
+        elif info['tfms'] and not any(_tfm_executavel(tfm, maior_sdk, workloads) for tfm in info['tfms']):
+            motivos.append(f"{nome}: nenhum target framework compilável aqui ({';'.join(info['tfms'])})")
+
+    if dados and not any(info['teste'] for info in dados.values()) and avisos is not None:
+        # O MSBuild ainda pode trazer o projeto de testes por um .props/.targets fora do checkout esparso
+        avisos.append("Nenhum projeto de testes identificado na solução")
+    return motivos
+
+# 4. VERIFICAÇÃO DE UM REPOSITÓRIO
+def motivo_sem_clone(repo, instalados):
+    """Checagem que usa só a coluna SDK do CSV (ex.: '6.0.x'), antes de qualquer acesso à rede."""
+    requerida = _versao(repo.get("SDK") or "")
+    if requerida is None or instalados is None:
+        return None
+    if not any(v and v[0] >= requerida[0] for v in map(_versao, instalados)):
+        return f"Nenhum SDK instalado compila net{requerida[0]}.{requerida[1]} (instalados: {', '.join(instalados) or 'nenhum'})"
+    return None
+
+def verificar_repositorio(repo, base_dir):
+    """Retorna None se o repositório parece viável ou o motivo (texto) para pulá-lo."""
+    motivo = motivo_sem_clone(repo, sdks_instalados())
+    if motivo:
+        return motivo
+
+    destino = Path(base_dir) / '.verificacao' / repo["Nome"]
+    remover_checkout(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+
+    ok, erro = checkout_esparso(repo["Proprietário"], repo["Nome"], destino)
+    if not ok:
+        return None  # Na dúvida o repositório segue para o pipeline completo, que registra o erro real
+    avisos = []
+    try:
+        motivos = motivos_inviabilidade(destino, repo.get("Diretório SLN", ""), sdks_instalados(), workloads_instaladas(), avisos)
+    finally:
+        remover_checkout(destino)
+    for aviso in avisos:
+        print(f"Aviso: {repo['Nome']}: {aviso}")
+    return "; ".join(motivos) if motivos else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Prevê, sem clonar nem compilar, quais repositórios vão falhar no pipeline de mutação.")
+    parser.add_argument("--csv", default="Instrumentos/Codigos/repositorios.csv")
+    parser.add_argument("--saida", default="Instrumentos/Codigos/repositoriosVerificados.csv")
+    parser.add_argument("--base-dir", default="Instrumentos/Codigos/repositoriosClonados")
+    parser.add_argument("--workers", type=int, default=8, help="Checkouts esparsos simultâneos")
+    args = parser.parse_args()
+
+    with open(args.csv, mode='r', encoding='utf-8') as file:
+        repositorios = list(csv.DictReader(file))
+    print(f"SDKs instalados: {', '.join(sdks_instalados() or ['(dotnet não encontrado)'])}")
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        motivos = list(executor.map(lambda repo: verificar_repositorio(repo, args.base_dir), repositorios))
+
+    fieldnames = (list(repositorios[0]) if repositorios else []) + ["Viável", "Motivo"]
+    with open(args.saida, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        for repo, motivo in zip(repositorios, motivos):
+            writer.writerow({**repo, "Viável": "Não" if motivo else "Sim", "Motivo": motivo or ""})
+            if motivo:
+                print(f"{repo['Nome']}: {motivo}")
+
+    inviaveis = sum(1 for motivo in motivos if motivo)
+    print(f"{len(repositorios) - inviaveis} viáveis e {inviaveis} inviáveis de {len(repositorios)}. Resultado salvo em {args.saida}")
+
+if __name__ == "__main__":
+    perfilar(main)()